@@ -13,6 +13,33 @@ from datetime import datetime
 # Get base URL from environment
 BASE_URL = "https://ios-attendance.preview.emergentagent.com/api"
 
+# Request payloads shared with load_test.py
+VALID_LOGIN = {
+    "email": "joao@ios.org.br",
+    "password": "123456"
+}
+
+TEST_CLASS_ID = "class1"
+
+ATTENDANCE_PAYLOAD = {
+    "classId": TEST_CLASS_ID,
+    "date": "2025-01-15",
+    "attendanceData": {
+        "student1": {
+            "status": "presente",
+            "observation": ""
+        },
+        "student2": {
+            "status": "falta",
+            "observation": "Não compareceu"
+        },
+        "student3": {
+            "status": "justificada",
+            "observation": "Atestado médico"
+        }
+    }
+}
+
 class AttendanceAPITester:
     def __init__(self):
         self.base_url = BASE_URL
@@ -59,12 +86,7 @@ class AttendanceAPITester:
     def test_auth_valid_login(self):
         """Test POST /api/auth/login with valid credentials"""
         try:
-            payload = {
-                "email": "joao@ios.org.br",
-                "password": "123456"
-            }
-            
-            response = self.session.post(f"{self.base_url}/auth/login", json=payload)
+            response = self.session.post(f"{self.base_url}/auth/login", json=VALID_LOGIN)
             
             if response.status_code == 200:
                 data = response.json()
@@ -174,7 +196,7 @@ class AttendanceAPITester:
     def test_get_class_students_valid(self):
         """Test GET /api/classes/class1/students - Get students for valid class"""
         try:
-            response = self.session.get(f"{self.base_url}/classes/class1/students")
+            response = self.session.get(f"{self.base_url}/classes/{TEST_CLASS_ID}/students")
             
             if response.status_code == 200:
                 data = response.json()
@@ -232,26 +254,7 @@ class AttendanceAPITester:
     def test_save_attendance_valid(self):
         """Test POST /api/attendance - Save attendance with valid data"""
         try:
-            payload = {
-                "classId": "class1",
-                "date": "2025-01-15",
-                "attendanceData": {
-                    "student1": {
-                        "status": "presente",
-                        "observation": ""
-                    },
-                    "student2": {
-                        "status": "falta",
-                        "observation": "Não compareceu"
-                    },
-                    "student3": {
-                        "status": "justificada",
-                        "observation": "Atestado médico"
-                    }
-                }
-            }
-            
-            response = self.session.post(f"{self.base_url}/attendance", json=payload)
+            response = self.session.post(f"{self.base_url}/attendance", json=ATTENDANCE_PAYLOAD)
             
             if response.status_code == 200:
                 data = response.json()
@@ -361,12 +364,7 @@ class AttendanceAPITester:
         """Test authentication with different user roles"""
         try:
             # Test admin role (using existing user)
-            payload = {
-                "email": "joao@ios.org.br",
-                "password": "123456"
-            }
-            
-            response = self.session.post(f"{self.base_url}/auth/login", json=payload)
+            response = self.session.post(f"{self.base_url}/auth/login", json=VALID_LOGIN)
             
             if response.status_code == 200:
                 data = response.json()
@@ -0,0 +1,54 @@
+"""
+Cache por processo das turmas de cada professor, para conferir se a turma de uma
+rota pertence ao usuário logado sem ir ao banco a cada requisição.
+
+turma_do_usuario(user_id, turma_id) responde pelas turmas ativas cujo professor
+está vinculado ao usuário, como o JOIN turmas/professores que as rotas faziam.
+Cada usuário é carregado com uma consulta e guardado por Config.AUTORIZACAO_TTL
+segundos. Qualquer tabela_alterada('turmas' | 'professores') descarta o cache
+inteiro: criação de turma, troca de professor e mudanças vindas de outros
+workers pelo canal NOTIFY (ver notificacoes.py).
+"""
+import notificacoes
+from cache import CacheTTL, depende_de, etag_atual
+from config import Config
+from db_pool import get_db_connection
+
+TABELAS = ('turmas', 'professores')
+
+cache_turmas = CacheTTL(ttl=Config.AUTORIZACAO_TTL)
+depende_de(cache_turmas, None, *TABELAS)
+
+
+class AutorizacaoIndisponivel(Exception):
+    """Sem conexão com o banco para carregar as turmas do usuário"""
+
+
+def _carregar(usuario_id):
+    with get_db_connection() as conn:
+        if not conn:
+            raise AutorizacaoIndisponivel("Sem conexão com o banco")
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT t.id, t.nome, p.id
+            FROM turmas t
+            JOIN professores p ON t.professor_id = p.id
+            WHERE p.usuario_id = %s AND t.ativo = TRUE
+        ''', (usuario_id,))
+        turmas = {turma_id: (nome, professor_id) for turma_id, nome, professor_id in cursor.fetchall()}
+        cursor.close()
+    return turmas
+
+
+def turmas_do_usuario(usuario_id):
+    """{turma_id: (nome, professor_id)} das turmas ativas do usuário"""
+    notificacoes.iniciar_escuta()
+    # A versão na chave faz uma carga iniciada antes de uma alteração ficar
+    # guardada numa chave que ninguém mais consulta
+    chave = (usuario_id, etag_atual(*TABELAS))
+    return cache_turmas.obter(chave, lambda: _carregar(usuario_id))
+
+
+def turma_do_usuario(usuario_id, turma_id):
+    """(nome, professor_id) se a turma for do usuário; senão None"""
+    return turmas_do_usuario(usuario_id).get(turma_id)
@@ -0,0 +1,326 @@
+"""
+Backup em streaming (COPY TO STDOUT + gzip) e restauração com COPY FROM.
+
+O arquivo é texto no formato do pg_dump, comprimido com gzip: para cada tabela,
+em ordem de dependência, uma linha "COPY tabela (colunas) FROM stdin;", as
+linhas no formato texto do COPY e o terminador "\\.". Nada é montado em
+memória: a exportação comprime os blocos conforme o PostgreSQL os envia e a
+restauração entrega ao COPY FROM blocos do arquivo descomprimido.
+
+Uso:
+    python backup.py exportar backup.sql.gz
+    python backup.py restaurar backup.sql.gz [--limpar]
+
+A restauração exige o banco de destino na mesma versão de migrações do backup.
+Com --limpar as tabelas do backup são esvaziadas antes (TRUNCATE).
+"""
+import gzip
+import queue
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from db_pool import get_db_connection
+
+# Ordem de dependência (chaves estrangeiras); tabelas derivadas no fim
+TABELAS_BACKUP = [
+    'usuarios', 'unidades', 'cursos', 'professores', 'turmas', 'alunos',
+    'chamadas', 'faltas', 'parametros',
+    'frequencia_alunos', 'alertas_frequencia', 'sequencias_faltas',
+]
+
+# Colunas que o banco de destino preenche sozinho
+COLUNAS_IGNORADAS = {'txid_sync'}
+
+# Tamanho dos blocos comprimidos na resposta HTTP e dos blocos lidos na restauração
+TAMANHO_BLOCO = 64 * 1024
+# Blocos em espera entre a thread do COPY e a resposta (limita a memória)
+BLOCOS_NA_FILA = 16
+
+RE_SECAO = re.compile(r'^COPY (\w+) \(([\w, ]+)\) FROM stdin;$')
+RE_VERSAO = re.compile(r'^-- versao_esquema: (\d+)$')
+
+
+class ErroBackup(Exception):
+    """Arquivo de backup inválido ou incompatível com o banco"""
+
+
+def _versao_esquema(cursor):
+    cursor.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_migrations")
+    return cursor.fetchone()[0]
+
+
+def _colunas(cursor, tabela):
+    cursor.execute('''
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+        ORDER BY ordinal_position
+    ''', (tabela,))
+    return [nome for (nome,) in cursor.fetchall() if nome not in COLUNAS_IGNORADAS]
+
+
+def exportar(conn, destino):
+    """Escreve o backup (texto, ainda sem compressão) em destino.write(bytes)"""
+    conn.rollback()
+    cursor = conn.cursor()
+    # Snapshot único: todas as tabelas no mesmo instante
+    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+    cabecalho = ("-- Backup Sistema de Chamada IOS\n"
+                 f"-- versao_esquema: {_versao_esquema(cursor)}\n"
+                 f"-- gerado_em: {datetime.now().isoformat(timespec='seconds')}\n")
+    destino.write(cabecalho.encode('utf-8'))
+    for tabela in TABELAS_BACKUP:
+        colunas = ', '.join(_colunas(cursor, tabela))
+        destino.write(f"COPY {tabela} ({colunas}) FROM stdin;\n".encode('utf-8'))
+        cursor.copy_expert(f"COPY {tabela} ({colunas}) TO STDOUT", destino)
+        destino.write(b"\\.\n")
+    cursor.close()
+    conn.rollback()
+
+
+class _CompressorEmFila:
+    """Recebe o texto do COPY, comprime em gzip e entrega blocos por uma fila limitada"""
+
+    def __init__(self):
+        self.fila = queue.Queue(maxsize=BLOCOS_NA_FILA)
+        self.cancelado = threading.Event()
+        self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+        self._pendente = []
+        self._tamanho = 0
+
+    def _entregar(self, bloco):
+        while True:
+            if self.cancelado.is_set():
+                # Cliente desconectou: interrompe o COPY na thread de exportação
+                raise IOError("Exportação cancelada")
+            try:
+                self.fila.put(bloco, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, dados):
+        if isinstance(dados, str):
+            dados = dados.encode('utf-8')
+        comprimido = self._zlib.compress(dados)
+        if comprimido:
+            self._pendente.append(comprimido)
+            self._tamanho += len(comprimido)
+        if self._tamanho >= TAMANHO_BLOCO:
+            self._entregar(b''.join(self._pendente))
+            self._pendente, self._tamanho = [], 0
+
+    def finalizar(self):
+        self._pendente.append(self._zlib.flush())
+        self._entregar(b''.join(self._pendente))
+        self._pendente, self._tamanho = [], 0
+
+
+def exportacao_gzip():
+    """Gera o backup comprimido em blocos, para uma resposta HTTP em streaming"""
+    compressor = _CompressorEmFila()
+    FIM = object()
+
+    def produzir():
+        try:
+            with get_db_connection() as conn:
+                if not conn:
+                    raise RuntimeError("Erro na conexão com o banco de dados")
+                exportar(conn, compressor)
+            compressor.finalizar()
+            compressor._entregar(FIM)
+        except Exception as e:
+            if not compressor.cancelado.is_set():
+                print(f"Erro ao exportar backup: {e}")
+                compressor._entregar(e)
+
+    threading.Thread(target=produzir, daemon=True, name='backup').start()
+    try:
+        while True:
+            bloco = compressor.fila.get()
+            if bloco is FIM:
+                return
+            if isinstance(bloco, Exception):
+                # O status 200 já foi enviado; o gzip truncado é detectado pelo cliente
+                raise RuntimeError(f"Erro ao exportar backup: {bloco}")
+            yield bloco
+    finally:
+        compressor.cancelado.set()
+
+
+class _LeitorBackup:
+    """Lê o backup descomprimido em blocos, entregando linhas de cabeçalho e seções"""
+
+    def __init__(self, arquivo):
+        self._arquivo = arquivo
+        self.buffer = b''
+
+    def encher(self):
+        bloco = self._arquivo.read(TAMANHO_BLOCO)
+        self.buffer += bloco
+        return bool(bloco)
+
+    def linha(self):
+        while b'\n' not in self.buffer and self.encher():
+            pass
+        linha, _, self.buffer = self.buffer.partition(b'\n')
+        return linha.decode('utf-8')
+
+
+class _LeitorSecao:
+    """Entrega ao COPY FROM os dados de uma seção, em blocos de linhas inteiras,
+    até o terminador \\. (o resto do buffer fica para a próxima seção)"""
+
+    def __init__(self, leitor):
+        self._leitor = leitor
+        self._fim = False
+
+    def read(self, tamanho=-1):
+        leitor = self._leitor
+        while not self._fim:
+            buffer = leitor.buffer
+            # O buffer sempre começa no início de uma linha
+            if buffer.startswith(b'\\.\n'):
+                leitor.buffer = buffer[3:]
+                self._fim = True
+                break
+            fim_secao = buffer.find(b'\n\\.\n')
+            if fim_secao < 0:
+                fim_secao = buffer.rfind(b'\n')
+            if fim_secao >= 0:
+                dados, leitor.buffer = buffer[:fim_secao + 1], buffer[fim_secao + 1:]
+                return dados
+            if not leitor.encher():
+                raise ErroBackup("Arquivo terminou no meio de uma tabela")
+        return b''
+
+
+def _chaves_estrangeiras(cursor, tabelas):
+    cursor.execute('''
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND conrelid::regclass::text = ANY(%s)
+        ORDER BY conrelid::regclass::text, conname
+    ''', (tabelas,))
+    return cursor.fetchall()
+
+
+def suspender_restricoes(cursor, tabelas=TABELAS_BACKUP):
+    """Prepara uma carga com COPY: tira as chaves estrangeiras e desliga os
+    triggers de usuário das tabelas; retorna as chaves para religar_restricoes"""
+    # Como no pg_restore: as chaves voltam no fim, validadas de uma vez (em vez
+    # de uma consulta por linha). Triggers de usuário (resumos, txid_sync) ficam
+    # desligados: as tabelas derivadas são carregadas ou recalculadas à parte.
+    chaves = _chaves_estrangeiras(cursor, tabelas)
+    for tabela, nome, _definicao in chaves:
+        cursor.execute(f'ALTER TABLE {tabela} DROP CONSTRAINT "{nome}"')
+    for tabela in tabelas:
+        cursor.execute(f"ALTER TABLE {tabela} DISABLE TRIGGER USER")
+    return chaves
+
+
+def religar_restricoes(cursor, chaves, tabelas=TABELAS_BACKUP):
+    """Desfaz suspender_restricoes e ajusta as sequências dos ids ao maior id carregado"""
+    for tabela in tabelas:
+        cursor.execute(f"ALTER TABLE {tabela} ENABLE TRIGGER USER")
+    for tabela, nome, definicao in chaves:
+        cursor.execute(f'ALTER TABLE {tabela} ADD CONSTRAINT "{nome}" {definicao}')
+    for tabela in tabelas:
+        if 'id' not in _colunas(cursor, tabela):
+            continue
+        cursor.execute(f'''
+            SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL)
+            FROM {tabela}
+        ''', (tabela,))
+
+
+def analisar(conn, tabelas=TABELAS_BACKUP):
+    """Atualiza as estatísticas do planejador depois de uma carga (fora de transação)"""
+    conn.autocommit = True
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"ANALYZE {', '.join(tabelas)}")
+        cursor.close()
+    finally:
+        conn.autocommit = False
+
+
+def restaurar(conn, origem, limpar=False):
+    """Restaura um backup lido de origem (binário, já descomprimido); retorna {tabela: linhas}"""
+    leitor = _LeitorBackup(origem)
+    cursor = conn.cursor()
+    versao = None
+    linhas = {}
+    try:
+        if limpar:
+            cursor.execute(f"TRUNCATE {', '.join(TABELAS_BACKUP)} RESTART IDENTITY CASCADE")
+        # As tabelas derivadas vêm do próprio backup; tudo na mesma transação
+        chaves = suspender_restricoes(cursor)
+
+        while True:
+            texto = leitor.linha()
+            if not texto and not leitor.buffer and not leitor.encher():
+                break
+            m = RE_VERSAO.match(texto)
+            if m:
+                versao = int(m.group(1))
+                if versao != _versao_esquema(cursor):
+                    raise ErroBackup(f"Backup da versão {versao}, banco na versão {_versao_esquema(cursor)}")
+                continue
+            if not texto or texto.startswith('--'):
+                continue
+            m = RE_SECAO.match(texto)
+            if not m or m.group(1) not in TABELAS_BACKUP:
+                raise ErroBackup(f"Linha inesperada no backup: {texto[:80]}")
+            if versao is None:
+                raise ErroBackup("Backup sem versão do esquema")
+            tabela, colunas = m.groups()
+            cursor.copy_expert(f"COPY {tabela} ({colunas}) FROM STDIN", _LeitorSecao(leitor))
+            linhas[tabela] = cursor.rowcount
+
+        religar_restricoes(cursor, chaves)
+        # Os triggers de aviso (0010-0012) estavam desligados: sem isto os
+        # caches e ETags dos workers seguiriam com os dados de antes da carga
+        for tabela in linhas:
+            cursor.execute("SELECT pg_notify('tabelas_alteradas', %s)", (tabela,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    analisar(conn)
+    return linhas
+
+
+def main(argv):
+    if len(argv) < 3 or argv[1] not in ('exportar', 'restaurar'):
+        print(__doc__)
+        return 2
+    comando, caminho = argv[1], argv[2]
+    with get_db_connection() as conn:
+        if not conn:
+            print("Erro na conexão com o banco de dados")
+            return 1
+
+        inicio = time.perf_counter()
+        if comando == 'exportar':
+            with gzip.open(caminho, 'wb') as arquivo:
+                exportar(conn, arquivo)
+            print(f"Backup gravado em {caminho} ({time.perf_counter() - inicio:.1f}s)")
+            return 0
+
+        with gzip.open(caminho, 'rb') as arquivo:
+            linhas = restaurar(conn, arquivo, limpar='--limpar' in argv)
+        for tabela, total in linhas.items():
+            print(f"{tabela}: {total} linha(s)")
+        print(f"Backup restaurado ({time.perf_counter() - inicio:.1f}s)")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
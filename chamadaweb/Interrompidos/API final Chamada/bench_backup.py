@@ -0,0 +1,95 @@
+# bench_backup.py
+# Mede o backup em streaming (backup.py) e a restauração com COPY FROM.
+# Exporta o banco de DATABASE_URL para um arquivo temporário, mostrando tempo,
+# tamanho e memória máxima do processo, e restaura em BENCH_RESTAURAR_URL (um
+# banco de rascunho: as tabelas dele são esvaziadas). Para comparação, as
+# faltas também são inseridas em lotes de INSERT (execute_values).
+import gzip
+import os
+import resource
+import tempfile
+import time
+
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+from backup import exportar, restaurar
+from migracoes import aplicar_migracoes
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+BENCH_RESTAURAR_URL = os.getenv("BENCH_RESTAURAR_URL")
+LOTE_INSERT = 1000
+
+
+def memoria_maxima_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def insert_em_lotes(conn, caminho):
+    """Restaura só a seção de faltas com INSERTs em lote, para comparar com o COPY"""
+    cursor = conn.cursor()
+    cursor.execute("TRUNCATE faltas, frequencia_alunos, sequencias_faltas CASCADE")
+    cursor.execute("ALTER TABLE faltas DISABLE TRIGGER USER")
+    with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            if linha.startswith('COPY faltas '):
+                colunas = linha[len('COPY faltas ('):linha.index(')')]
+                break
+        lote = []
+        inicio = time.perf_counter()
+        for linha in arquivo:
+            if linha == '\\.\n':
+                break
+            lote.append([None if v == '\\N' else v for v in linha.rstrip('\n').split('\t')])
+            if len(lote) == LOTE_INSERT:
+                execute_values(cursor, f"INSERT INTO faltas ({colunas}) VALUES %s", lote)
+                lote = []
+        if lote:
+            execute_values(cursor, f"INSERT INTO faltas ({colunas}) VALUES %s", lote)
+        tempo = time.perf_counter() - inicio
+    conn.rollback()
+    cursor.close()
+    return tempo
+
+
+try:
+    if not BENCH_RESTAURAR_URL:
+        raise RuntimeError("Defina BENCH_RESTAURAR_URL com um banco de rascunho")
+
+    origem = psycopg2.connect(DATABASE_URL)
+    with origem.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM faltas")
+        total_faltas = cursor.fetchone()[0]
+    origem.rollback()
+
+    caminho = os.path.join(tempfile.gettempdir(), 'bench_backup.sql.gz')
+    memoria_antes = memoria_maxima_mb()
+    inicio = time.perf_counter()
+    with gzip.open(caminho, 'wb') as arquivo:
+        exportar(origem, arquivo)
+    tempo_exportacao = time.perf_counter() - inicio
+    origem.close()
+    print(f"Exportação: {tempo_exportacao:.2f}s, {os.path.getsize(caminho) / 1e6:.1f} MB gzip, "
+          f"{total_faltas} faltas, memória máxima +{memoria_maxima_mb() - memoria_antes:.1f} MB")
+
+    destino = psycopg2.connect(BENCH_RESTAURAR_URL)
+    aplicar_migracoes(destino)
+    inicio = time.perf_counter()
+    with gzip.open(caminho, 'rb') as arquivo:
+        linhas = restaurar(destino, arquivo, limpar=True)
+    tempo_restauracao = time.perf_counter() - inicio
+    total = sum(linhas.values())
+    print(f"Restauração (COPY FROM): {tempo_restauracao:.2f}s, {total} linhas "
+          f"({total / tempo_restauracao:,.0f} linhas/s)")
+
+    tempo_insert = insert_em_lotes(destino, caminho)
+    print(f"Só faltas com INSERT em lotes de {LOTE_INSERT}: {tempo_insert:.2f}s "
+          f"({linhas['faltas'] / tempo_insert:,.0f} linhas/s)")
+    destino.close()
+    os.remove(caminho)
+
+except Exception as e:
+    print(f"Erro no benchmark: {e}")
@@ -0,0 +1,98 @@
+# bench_chamada.py
+# Compara o registro de chamada antigo (um INSERT por falta) com o comando único
+# de registro_chamada.py, variando o número de faltas de 5 a 60.
+# As tabelas chamadas/faltas são criadas como TEMP nesta sessão, então nada é
+# gravado nas tabelas reais: a função registrar_chamada também as enxerga
+# primeiro, e precisa da coluna chave_idempotencia (ON CONFLICT).
+import os
+import statistics
+import time
+from datetime import datetime
+
+import psycopg2
+from dotenv import load_dotenv
+
+from db_pool import montar_dsn
+from registro_chamada import inserir_chamada_com_faltas
+
+load_dotenv()
+
+DATABASE_URL = montar_dsn(os.getenv("DATABASE_URL"),
+                          os.getenv("DB_USE_POOLER", "false").lower() in ("1", "true", "sim"))
+TAMANHOS = [5, 10, 20, 40, 60]
+REPETICOES = int(os.getenv("BENCH_REPETICOES", 20))
+
+
+def criar_tabelas_temporarias(cursor):
+    cursor.execute('''
+        CREATE TEMP TABLE chamadas (
+            id SERIAL PRIMARY KEY,
+            turma_id INTEGER,
+            data_chamada DATE NOT NULL,
+            hora_chamada TIME NOT NULL,
+            professor_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            chave_idempotencia TEXT UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TEMP TABLE faltas (
+            id SERIAL PRIMARY KEY,
+            chamada_id INTEGER REFERENCES chamadas(id),
+            aluno_id INTEGER,
+            data_falta DATE NOT NULL,
+            hora_falta TIME NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def chamada_um_insert_por_falta(cursor, faltas_ids, data, hora):
+    """Fluxo antigo do fazer_chamada: 1 + N comandos"""
+    cursor.execute('''
+        INSERT INTO chamadas (turma_id, data_chamada, hora_chamada, professor_id)
+        VALUES (%s, %s, %s, %s)
+        RETURNING id
+    ''', (1, data, hora, 1))
+    chamada_id = cursor.fetchone()[0]
+    for aluno_id in faltas_ids:
+        cursor.execute('''
+            INSERT INTO faltas (chamada_id, aluno_id, data_falta, hora_falta)
+            VALUES (%s, %s, %s, %s)
+        ''', (chamada_id, aluno_id, data, hora))
+
+
+def chamada_em_lote(cursor, faltas_ids, data, hora):
+    inserir_chamada_com_faltas(cursor, 1, 1, faltas_ids, data, hora)
+
+
+def medir(conn, funcao, n_faltas):
+    agora = datetime.now()
+    faltas_ids = list(range(1, n_faltas + 1))
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        with conn.cursor() as cursor:
+            funcao(cursor, faltas_ids, agora.date(), agora.time())
+        conn.commit()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), max(tempos)
+
+
+try:
+    connection = psycopg2.connect(DATABASE_URL)
+    with connection.cursor() as cursor:
+        criar_tabelas_temporarias(cursor)
+    connection.commit()
+
+    print(f"{REPETICOES} repetições por cenário (mediana / máximo em ms)")
+    print(f"{'faltas':>6} | {'1 INSERT por falta':>22} | {'comando único':>18}")
+    for n in TAMANHOS:
+        antigo = medir(connection, chamada_um_insert_por_falta, n)
+        lote = medir(connection, chamada_em_lote, n)
+        print(f"{n:>6} | {antigo[0]:>10.1f} / {antigo[1]:>9.1f} | {lote[0]:>8.1f} / {lote[1]:>7.1f}")
+
+    connection.close()
+
+except Exception as e:
+    print(f"Erro no benchmark: {e}")
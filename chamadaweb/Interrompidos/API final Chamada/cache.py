@@ -0,0 +1,188 @@
+"""
+Cache em memória (por processo) com TTL e stale-while-revalidate.
+
+Um valor vencido há menos de `stale` segundos ainda é entregue na hora,
+enquanto uma thread recarrega em segundo plano; depois disso a recarga é
+feita na própria requisição.
+
+As rotas que escrevem chamam tabela_alterada('<tabela>') (ou registram o
+blueprint com invalidar_ao_escrever) para descartar os valores que dependem
+daquela tabela. A mesma chamada incrementa o contador de versão da tabela (ou
+de um escopo dela, como os alunos de uma turma), usado nos ETags das
+listagens: com If-None-Match igual à versão atual a rota responde 304 sem ir
+ao banco nem ao Supabase.
+
+Escritas de outros workers ou feitas fora da aplicação chegam pelo canal
+NOTIFY tabelas_alteradas (ver notificacoes.py). Sem a escuta conectada os
+contadores só enxergam este processo, e as rotas não respondem 304.
+"""
+import threading
+import time
+import uuid
+from functools import wraps
+
+from flask import request, session, make_response, Response
+
+
+class CacheTTL:
+    def __init__(self, ttl, stale=0):
+        self.ttl = ttl
+        self.stale = stale
+        self._valores = {}
+        self._recarregando = set()
+        # Geração por chave (e uma para invalidar tudo): uma carga iniciada
+        # antes de invalidar() não grava o valor que leu
+        self._geracoes = {}
+        self._geracao_geral = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave, carregar):
+        """Devolve o valor em cache ou chama carregar() para obtê-lo"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._valores.get(chave)
+        if item is not None:
+            valor, gravado_em = item
+            idade = agora - gravado_em
+            if idade < self.ttl:
+                return valor
+            if idade < self.ttl + self.stale:
+                self._recarregar_em_segundo_plano(chave, carregar)
+                return valor
+        return self._carregar(chave, carregar)
+
+    def _geracao(self, chave):
+        return self._geracao_geral, self._geracoes.get(chave, 0)
+
+    def _carregar(self, chave, carregar):
+        with self._lock:
+            geracao = self._geracao(chave)
+        valor = carregar()
+        with self._lock:
+            if self._geracao(chave) == geracao:
+                self._valores[chave] = (valor, time.monotonic())
+        return valor
+
+    def _recarregar_em_segundo_plano(self, chave, carregar):
+        with self._lock:
+            if chave in self._recarregando:
+                return
+            self._recarregando.add(chave)
+
+        def recarregar():
+            try:
+                self._carregar(chave, carregar)
+            except Exception as e:
+                print(f"Erro ao recarregar cache '{chave}': {e}")
+            finally:
+                with self._lock:
+                    self._recarregando.discard(chave)
+
+        threading.Thread(target=recarregar, daemon=True).start()
+
+    def invalidar(self, chave=None):
+        """Remove uma chave (ou todas, se chave for None)"""
+        with self._lock:
+            if chave is None:
+                self._valores.clear()
+                self._geracoes.clear()
+                self._geracao_geral += 1
+            else:
+                self._valores.pop(chave, None)
+                self._geracoes[chave] = self._geracoes.get(chave, 0) + 1
+
+
+# tabela -> lista de (cache, chave) que dependem dela
+_dependencias = {}
+
+# (tabela, escopo) -> versão; escopo None conta as escritas sem escopo
+_versoes = {}
+# tabela -> versão, incrementada por qualquer escrita (com ou sem escopo)
+_totais = {}
+_versoes_lock = threading.Lock()
+# Contadores são por processo: ETags de outro processo (ou de antes de um
+# restart) nunca coincidem com os deste
+_EPOCA = uuid.uuid4().hex[:12]
+
+
+def depende_de(cache, chave, *tabelas):
+    """Declara que cache[chave] deve ser descartado quando alguma das tabelas mudar"""
+    for tabela in tabelas:
+        _dependencias.setdefault(tabela, []).append((cache, chave))
+
+
+def tabela_alterada(tabela, escopo=None):
+    """Invalida tudo que depende da tabela; chamado após escritas bem-sucedidas.
+
+    Com escopo (ex.: tabela_alterada('alunos', turma_id)) só a versão daquele
+    escopo é incrementada, mantendo válidos os ETags das outras turmas.
+    """
+    with _versoes_lock:
+        _versoes[(tabela, escopo)] = _versoes.get((tabela, escopo), 0) + 1
+        _totais[tabela] = _totais.get(tabela, 0) + 1
+    for cache, chave in _dependencias.get(tabela, []):
+        cache.invalidar(chave)
+
+
+def etag_atual(*chaves):
+    """ETag forte a partir das versões de tabelas ('alunos') ou escopos (('alunos', 7)).
+
+    A versão de um escopo também muda com as escritas sem escopo na tabela.
+    """
+    with _versoes_lock:
+        versoes = []
+        for chave in chaves:
+            if isinstance(chave, tuple):
+                tabela, escopo = chave
+                versoes.append(f"{_versoes.get((tabela, escopo), 0)}:{_versoes.get((tabela, None), 0)}")
+            else:
+                versoes.append(str(_totais.get(chave, 0)))
+    return f"{_EPOCA}-{'.'.join(versoes)}"
+
+
+def nao_modificado(etag):
+    """Resposta 304 se o cliente já tem a versão atual; senão None"""
+    # Importado aqui: notificacoes importa este módulo
+    import notificacoes
+    if not notificacoes.escuta_conectada():
+        return None
+    # Mensagens flash pendentes precisam ser renderizadas numa resposta nova
+    if etag in request.if_none_match and not session.get('_flashes'):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return None
+
+
+def com_etag(response, etag):
+    """Anota ETag em respostas 200 (a versão deve ter sido lida antes dos dados)"""
+    response = make_response(response)
+    if response.status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def get_condicional(*chaves):
+    """Decorator para GETs de listagem: ETag pelas versões das tabelas e 304 direto"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = etag_atual(*chaves)
+            resposta_304 = nao_modificado(etag)
+            if resposta_304 is not None:
+                return resposta_304
+            return com_etag(view(*args, **kwargs), etag)
+        return wrapper
+    return decorator
+
+
+def invalidar_ao_escrever(bp, *tabelas):
+    """Invalida as tabelas após qualquer POST/PATCH/PUT/DELETE bem-sucedido no blueprint"""
+    @bp.after_request
+    def _invalidar_cache(response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            for tabela in tabelas:
+                tabela_alterada(tabela)
+        return response
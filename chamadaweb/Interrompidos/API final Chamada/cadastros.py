@@ -0,0 +1,377 @@
+"""
+Regras dos cadastros administrativos (unidades, cursos, professores, turmas e
+alunos) e gravação em lote pela API REST do Supabase.
+
+As rotas de um registro (POST /alunos, PATCH /alunos/<id>, ...) e as de lote
+(POST /alunos/lote, registradas com registrar_rota_lote) validam com as mesmas
+regras de CAMPOS. O lote recebe uma lista: itens sem "id" são criados num único
+INSERT de várias linhas e itens com "id" são alterados com PATCH id=in.(...),
+um por conjunto de valores enviados (um só quando todos os itens mudam os
+mesmos campos para os mesmos valores). O PATCH só toca os campos enviados:
+edições concorrentes de outros campos não são desfeitas, e um registro apagado
+no meio do caminho não volta. Como o banco rejeita o lote inteiro na primeira
+restrição violada, CPFs repetidos, chaves estrangeiras e ids inexistentes são
+conferidos antes, com uma consulta por coluna, e cada item recebe o próprio
+resultado.
+"""
+from flask import jsonify, request, session
+
+import supabase_client
+from config import Config
+from cpf import validar_cpf, formatar_cpf
+
+TIPOS_PROFESSOR = ('instrutor', 'monitor', 'pedagoga')
+
+# Valores por consulta id=in.(...) nas conferências do lote (limite de tamanho da URL)
+CONSULTA_BLOCO = 500
+
+
+def _texto(valor):
+    if not isinstance(valor, str) or not valor.strip():
+        raise ValueError("deve ser um texto não vazio")
+    if len(valor.strip()) > 255:
+        raise ValueError("deve ter no máximo 255 caracteres")
+    return valor.strip()
+
+
+def _texto_livre(valor):
+    if not isinstance(valor, str):
+        raise ValueError("deve ser um texto")
+    return valor
+
+
+def _id(valor):
+    # Formulários costumam mandar o id como texto; bool é subclasse de int
+    if isinstance(valor, str) and valor.isdigit():
+        valor = int(valor)
+    if isinstance(valor, bool) or not isinstance(valor, int) or valor <= 0:
+        raise ValueError("deve ser um id inteiro positivo")
+    return valor
+
+
+def _booleano(valor):
+    if not isinstance(valor, bool):
+        raise ValueError("deve ser true ou false")
+    return valor
+
+
+def _cpf(valor):
+    if not isinstance(valor, str) or not validar_cpf(valor):
+        raise ValueError("CPF inválido")
+    return formatar_cpf(valor)
+
+
+def _tipo_professor(valor):
+    if valor not in TIPOS_PROFESSOR:
+        raise ValueError(f"deve ser um de: {', '.join(TIPOS_PROFESSOR)}")
+    return valor
+
+
+# campo: (validador, obrigatório na criação). Campos opcionais aceitam null.
+CAMPOS = {
+    'unidades': {
+        'nome': (_texto, True),
+        'endereco': (_texto_livre, False),
+        'ativo': (_booleano, False),
+    },
+    'cursos': {
+        'nome': (_texto, True),
+        'unidade_id': (_id, False),
+        'ativo': (_booleano, False),
+    },
+    'professores': {
+        'nome': (_texto, True),
+        'cpf': (_cpf, True),
+        'tipo': (_tipo_professor, False),
+        'unidade_id': (_id, False),
+        'curso_id': (_id, False),
+        'usuario_id': (_id, False),
+        'ativo': (_booleano, False),
+    },
+    'turmas': {
+        'nome': (_texto, True),
+        'curso_id': (_id, False),
+        'professor_id': (_id, False),
+        'ativo': (_booleano, False),
+    },
+    'alunos': {
+        'nome': (_texto, True),
+        'cpf': (_cpf, True),
+        'turma_id': (_id, False),
+        'ativo': (_booleano, False),
+        'editado': (_booleano, False),
+    },
+}
+
+# Colunas que referenciam outra tabela
+REFERENCIAS = {
+    'unidade_id': 'unidades',
+    'curso_id': 'cursos',
+    'usuario_id': 'usuarios',
+    'professor_id': 'professores',
+    'turma_id': 'turmas',
+}
+
+# Coluna UNIQUE além do id
+UNICOS = {'professores': 'cpf', 'alunos': 'cpf'}
+
+
+def validar(tabela, dados, parcial=False):
+    """Confere e normaliza um registro de `tabela`.
+
+    Retorna (dados_limpos, erros), com erros no formato {campo: mensagem}.
+    Com parcial=True (PATCH) os campos obrigatórios podem faltar.
+    """
+    if not isinstance(dados, dict):
+        return None, {'_': 'esperado um objeto JSON'}
+    campos = CAMPOS[tabela]
+    limpos, erros = {}, {}
+    for campo, valor in dados.items():
+        if campo not in campos:
+            erros[campo] = 'campo desconhecido'
+            continue
+        validador, obrigatorio = campos[campo]
+        if valor is None and not obrigatorio:
+            limpos[campo] = None
+            continue
+        try:
+            limpos[campo] = validador(valor)
+        except ValueError as e:
+            erros[campo] = str(e)
+    if not parcial:
+        for campo, (_, obrigatorio) in campos.items():
+            if obrigatorio and campo not in dados:
+                erros[campo] = 'obrigatório'
+    elif not dados:
+        erros['_'] = 'nenhum campo para alterar'
+    return limpos, erros
+
+
+def resposta_invalida(erros):
+    return jsonify({"success": False, "message": "Dados inválidos", "erros": erros}), 400
+
+
+class _FalhaSupabase(Exception):
+    def __init__(self, resp):
+        super().__init__(resp.status_code)
+        self.resp = resp
+
+
+def _mensagem(resp):
+    try:
+        return resp.json().get('message') or resp.text
+    except (ValueError, AttributeError):
+        return resp.text
+
+
+def _buscar_em(tabela, coluna, valores, colunas):
+    """Linhas de `tabela` com `coluna` em `valores`, em blocos de CONSULTA_BLOCO"""
+    valores = list(valores)
+    linhas = []
+    for inicio in range(0, len(valores), CONSULTA_BLOCO):
+        lista = ','.join(f'"{v}"' for v in valores[inicio:inicio + CONSULTA_BLOCO])
+        resp = supabase_client.get(f"{tabela}?{coluna}=in.({lista})&select={colunas}")
+        if resp.status_code >= 400:
+            raise _FalhaSupabase(resp)
+        linhas.extend(resp.json())
+    return linhas
+
+
+class _Lote:
+    """Itens pendentes de um lote e o resultado de cada um"""
+
+    def __init__(self, tamanho):
+        self.resultados = [None] * tamanho
+        self.novos = {}        # indice -> dados
+        self.alteracoes = {}   # indice -> (id, dados)
+
+    def pendentes(self):
+        for indice, dados in self.novos.items():
+            yield indice, None, dados
+        for indice, (id_item, dados) in self.alteracoes.items():
+            yield indice, id_item, dados
+
+    def recusar(self, indice, erros):
+        self.novos.pop(indice, None)
+        self.alteracoes.pop(indice, None)
+        self.resultados[indice] = {"indice": indice, "status": "erro", "erros": erros}
+
+    def gravado(self, indice, status, id_item):
+        self.resultados[indice] = {"indice": indice, "status": status, "id": id_item}
+
+
+def _conferir_ids(tabela, lote):
+    """Os ids a alterar precisam existir"""
+    if not lote.alteracoes:
+        return
+    ids = {id_item for id_item, _ in lote.alteracoes.values()}
+    existentes = {linha['id'] for linha in _buscar_em(tabela, 'id', ids, 'id')}
+    for indice, (id_item, _) in list(lote.alteracoes.items()):
+        if id_item not in existentes:
+            lote.recusar(indice, {'id': 'não encontrado'})
+
+
+def _conferir_unicos(tabela, lote):
+    coluna = UNICOS.get(tabela)
+    if not coluna:
+        return
+    vistos = {}
+    for indice, id_item, dados in sorted(lote.pendentes()):
+        valor = dados.get(coluna)
+        if valor is None:
+            continue
+        if valor in vistos:
+            lote.recusar(indice, {coluna: f'repetido no lote (item {vistos[valor]})'})
+        else:
+            vistos[valor] = indice
+    if not vistos:
+        return
+    existentes = {linha[coluna]: linha['id'] for linha in _buscar_em(tabela, coluna, vistos, f'id,{coluna}')}
+    for indice, id_item, dados in list(lote.pendentes()):
+        dono = existentes.get(dados.get(coluna))
+        if dono is not None and dono != id_item:
+            lote.recusar(indice, {coluna: 'já cadastrado'})
+
+
+def _conferir_referencias(tabela, lote):
+    for coluna in CAMPOS[tabela]:
+        referencia = REFERENCIAS.get(coluna)
+        if not referencia:
+            continue
+        valores = {dados[coluna] for _, _, dados in lote.pendentes() if dados.get(coluna) is not None}
+        if not valores:
+            continue
+        encontrados = {linha['id'] for linha in _buscar_em(referencia, 'id', valores, 'id')}
+        for indice, _, dados in list(lote.pendentes()):
+            if dados.get(coluna) is not None and dados[coluna] not in encontrados:
+                lote.recusar(indice, {coluna: 'não encontrado'})
+
+
+def _inserir(tabela, lote):
+    """Um INSERT por conjunto de campos (normalmente um só para o lote todo).
+
+    Campos ausentes não são completados com null, para valerem os DEFAULTs
+    do banco (ativo = TRUE, por exemplo).
+    """
+    grupos = {}
+    for indice, dados in lote.novos.items():
+        grupos.setdefault(tuple(sorted(dados)), []).append(indice)
+    falha = None
+    for colunas, indices in grupos.items():
+        resp = supabase_client.post(f"{tabela}?columns={','.join(colunas)}",
+                                    json=[lote.novos[i] for i in indices],
+                                    headers={"Prefer": "return=representation"})
+        if resp.status_code >= 400:
+            falha = resp
+            for indice in indices:
+                lote.recusar(indice, {'_': _mensagem(resp)})
+            continue
+        # O PostgREST devolve as linhas inseridas na ordem enviada
+        for indice, linha in zip(indices, resp.json()):
+            lote.gravado(indice, 'criado', linha['id'])
+    return falha
+
+
+def _atualizar(tabela, lote):
+    """Um PATCH id=in.(...) por conjunto de valores enviados (campo e valor).
+
+    Só os campos enviados são gravados; ids apagados desde a conferência não
+    voltam na resposta e o item fica como não encontrado.
+    """
+    grupos = {}
+    for indice, (_, dados) in lote.alteracoes.items():
+        grupos.setdefault(tuple(sorted(dados.items())), []).append(indice)
+    falha = None
+    for valores, indices in grupos.items():
+        ids = [lote.alteracoes[i][0] for i in indices]
+        gravados, erro = set(), None
+        for inicio in range(0, len(ids), CONSULTA_BLOCO):
+            lista = ','.join(str(id_item) for id_item in ids[inicio:inicio + CONSULTA_BLOCO])
+            resp = supabase_client.patch(f"{tabela}?id=in.({lista})&select=id", json=dict(valores),
+                                         headers={"Prefer": "return=representation"})
+            if resp.status_code >= 400:
+                falha = erro = resp
+                continue
+            gravados.update(linha['id'] for linha in resp.json())
+        for indice in indices:
+            id_item = lote.alteracoes[indice][0]
+            if id_item in gravados:
+                lote.gravado(indice, 'atualizado', id_item)
+            elif erro is not None:
+                lote.recusar(indice, {'_': _mensagem(erro)})
+            else:
+                lote.recusar(indice, {'id': 'não encontrado'})
+    return falha
+
+
+def gravar_lote(tabela, itens):
+    """Cria (itens sem "id") e altera (itens com "id") registros de `tabela`.
+
+    Itens com "id" seguem a validação parcial do PATCH. Retorna (corpo, status):
+    200 se tudo foi gravado, 207 se só parte e 400 (ou o status do Supabase)
+    se nada foi gravado. corpo['resultados'] traz um resultado por item, na
+    ordem recebida.
+    """
+    if not isinstance(itens, list) or not itens:
+        return {"success": False, "message": "Envie uma lista de registros"}, 400
+    if len(itens) > Config.LOTE_MAXIMO:
+        return {"success": False, "message": f"No máximo {Config.LOTE_MAXIMO} registros por lote"}, 400
+
+    lote = _Lote(len(itens))
+    ids_vistos = {}
+    for indice, item in enumerate(itens):
+        item = dict(item) if isinstance(item, dict) else item
+        id_item = item.pop('id', None) if isinstance(item, dict) else None
+        dados, erros = validar(tabela, item, parcial=id_item is not None)
+        if id_item is not None:
+            try:
+                id_item = _id(id_item)
+            except ValueError as e:
+                erros['id'] = str(e)
+            else:
+                if id_item in ids_vistos:
+                    erros['id'] = f'repetido no lote (item {ids_vistos[id_item]})'
+                ids_vistos.setdefault(id_item, indice)
+        if erros:
+            lote.recusar(indice, erros)
+        elif id_item is None:
+            lote.novos[indice] = dados
+        else:
+            lote.alteracoes[indice] = (id_item, dados)
+
+    try:
+        _conferir_ids(tabela, lote)
+        _conferir_unicos(tabela, lote)
+        _conferir_referencias(tabela, lote)
+    except _FalhaSupabase as e:
+        return {"success": False, "message": _mensagem(e.resp)}, e.resp.status_code
+
+    falhas = [resp for resp in (_inserir(tabela, lote), _atualizar(tabela, lote)) if resp is not None]
+
+    criados = sum(1 for r in lote.resultados if r['status'] == 'criado')
+    atualizados = sum(1 for r in lote.resultados if r['status'] == 'atualizado')
+    recusados = len(itens) - criados - atualizados
+    corpo = {
+        "success": recusados == 0,
+        "criados": criados,
+        "atualizados": atualizados,
+        "recusados": recusados,
+        "resultados": lote.resultados,
+    }
+    if recusados == 0:
+        return corpo, 200
+    if criados or atualizados:
+        return corpo, 207
+    return corpo, (falhas[-1].status_code if falhas else 400)
+
+
+def registrar_rota_lote(bp, tabela):
+    """POST /<tabela>/lote no blueprint, só para o master (ver gravar_lote)"""
+    def gravar_em_lote():
+        # Lista JSON: itens sem "id" são criados, itens com "id" têm os campos
+        # enviados alterados. Responde um resultado por item
+        if 'user_id' not in session or session.get('user_type') != 'master':
+            return jsonify({"success": False, "message": "Acesso negado"}), 403
+        corpo, status = gravar_lote(tabela, request.get_json(silent=True))
+        return jsonify(corpo), status
+    bp.add_url_rule(f'/{tabela}/lote', f'gravar_{tabela}_lote', gravar_em_lote, methods=['POST'])
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,6 +7,57 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'sua-chave-secreta-super-segura-aqui')
     DATABASE_URL = os.getenv('DATABASE_URL')
+
+    # Pool de conexões PostgreSQL (ver db_pool.py)
+    DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 1))
+    DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+    DB_POOL_HEALTHCHECK = float(os.getenv('DB_POOL_HEALTHCHECK', 30))
+    DB_USE_POOLER = os.getenv('DB_USE_POOLER', 'false').lower() in ('1', 'true', 'sim')
+    # Escuta do canal NOTIFY tabelas_alteradas (ver notificacoes.py)
+    DB_LISTEN = os.getenv('DB_LISTEN', 'true').lower() in ('1', 'true', 'sim')
+
+    # Log de consultas lentas (ver consultas_lentas.py): limite em ms, fração das
+    # lentas com EXPLAIN (ANALYZE, BUFFERS) e intervalo mínimo entre planos da mesma consulta
+    DB_SLOW_MS = float(os.getenv('DB_SLOW_MS', 200))
+    DB_EXPLAIN_AMOSTRA = float(os.getenv('DB_EXPLAIN_AMOSTRA', 0.1))
+    DB_EXPLAIN_INTERVALO = float(os.getenv('DB_EXPLAIN_INTERVALO', 300))
+
+    # API REST do Supabase (ver supabase_client.py)
+    SUPABASE_URL = os.getenv('SUPABASE_URL')
+    SUPABASE_API_KEY = os.getenv('SUPABASE_API_KEY')
+    SUPABASE_CONNECT_TIMEOUT = float(os.getenv('SUPABASE_CONNECT_TIMEOUT', 3.05))
+    SUPABASE_READ_TIMEOUT = float(os.getenv('SUPABASE_READ_TIMEOUT', 10))
+    SUPABASE_RETRIES = int(os.getenv('SUPABASE_RETRIES', 3))
+    SUPABASE_BACKOFF = float(os.getenv('SUPABASE_BACKOFF', 0.3))
+    SUPABASE_POOL_SIZE = int(os.getenv('SUPABASE_POOL_SIZE', 20))
+    SUPABASE_SLOW_MS = float(os.getenv('SUPABASE_SLOW_MS', 1000))
+
+    # Cache das estatísticas do dashboard master (segundos)
+    DASHBOARD_CACHE_TTL = float(os.getenv('DASHBOARD_CACHE_TTL', 30))
+    DASHBOARD_CACHE_STALE = float(os.getenv('DASHBOARD_CACHE_STALE', 300))
+
+    # Caches em memória de unidades/cursos/professores (referencias.py) e das
+    # turmas de cada professor (autorizacao.py): validade máxima em segundos
+    REFERENCIAS_TTL = float(os.getenv('REFERENCIAS_TTL', 600))
+    AUTORIZACAO_TTL = float(os.getenv('AUTORIZACAO_TTL', 300))
+
+    # Paginação das listagens (?limit=)
+    PAGINA_LIMITE_PADRAO = int(os.getenv('PAGINA_LIMITE_PADRAO', 100))
+    PAGINA_LIMITE_MAXIMO = int(os.getenv('PAGINA_LIMITE_MAXIMO', 1000))
+
+    # Registros por requisição nas rotas de lote (POST /<cadastro>/lote)
+    LOTE_MAXIMO = int(os.getenv('LOTE_MAXIMO', 5000))
+
+    # Relatórios gerados em segundo plano (ver tarefas.py)
+    RELATORIOS_DIR = os.getenv('RELATORIOS_DIR', os.path.join(tempfile.gettempdir(), 'chamada_relatorios'))
+    RELATORIOS_WORKERS = int(os.getenv('RELATORIOS_WORKERS', 2))
+    RELATORIOS_EXPIRACAO = float(os.getenv('RELATORIOS_EXPIRACAO', 24 * 3600))
+    # Tarefas na fila ou em andamento; além disso POST /reports/generate responde 429
+    RELATORIOS_PENDENTES_MAXIMO = int(os.getenv('RELATORIOS_PENDENTES_MAXIMO', 20))
+
+    # GET /metrics (ver metricas.py); com token, exige Authorization: Bearer <token>
+    METRICAS_TOKEN = os.getenv('METRICAS_TOKEN')
     
     # Configurações específicas do IOS
     MAX_TURMAS_POR_PROFESSOR = 4
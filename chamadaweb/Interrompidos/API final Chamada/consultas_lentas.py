@@ -0,0 +1,189 @@
+"""
+Registro de consultas lentas, por impressão digital do SQL.
+
+Todo comando executado pelos cursores do pool (CursorMedido em db_pool.py)
+passa por registrar(): o SQL é normalizado (literais, parâmetros e listas
+viram ?, espaços e comentários somem) e acumulado por impressão digital, como
+no pg_stat_statements. Comandos acima de DB_SLOW_MS são impressos com o nome
+da função que os executou e o formato dos parâmetros (tipos e tamanhos, nunca
+os valores: CPFs e senhas não vão para o log).
+
+Uma amostra dos comandos lentos (DB_EXPLAIN_AMOSTRA, no máximo um plano por
+impressão digital a cada DB_EXPLAIN_INTERVALO segundos) tem o plano registrado.
+Leituras (SELECT, WITH sem escrita) são executadas de novo com EXPLAIN
+(ANALYZE, BUFFERS), num savepoint somente leitura desfeito em seguida: um
+SELECT que chama função que grava fica só com o plano estimado. INSERT, UPDATE e
+DELETE não rodam de novo (ids, triggers e locks de uma segunda execução): só
+EXPLAIN, com o plano estimado.
+
+estatisticas() devolve o acumulado (GET /metrics/consultas).
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+
+from psycopg2 import errors, extensions
+
+import metricas
+from config import Config
+
+# Impressões digitais distintas guardadas (as demais só contam nas métricas)
+MAXIMO_IMPRESSOES = 500
+
+RE_COMENTARIO = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+RE_TEXTO = re.compile(r"'(?:[^']|'')*'")
+RE_PARAMETRO = re.compile(r'%\(\w+\)s|%s')
+RE_NUMERO = re.compile(r'\b\d+(?:\.\d+)?\b')
+RE_LISTA = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+RE_ESPACOS = re.compile(r'\s+')
+RE_EXPLICAVEL = re.compile(r'^\(?\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b', re.I)
+# No SQL normalizado (sem literais); inclui SELECT ... FOR UPDATE, que trava linhas
+RE_ESCRITA = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE)\b', re.I)
+
+CONSULTAS_LENTAS = metricas.Contador('chamada_db_consultas_lentas_total',
+                                     'Consultas acima de DB_SLOW_MS', ('consulta',))
+
+
+@lru_cache(maxsize=2048)
+def normalizar(sql):
+    """SQL sem literais nem parâmetros: 'WHERE id = 5' e 'WHERE id = %s' viram 'WHERE id = ?'"""
+    sql = RE_COMENTARIO.sub(' ', sql)
+    sql = RE_TEXTO.sub('?', sql)
+    sql = RE_PARAMETRO.sub('?', sql)
+    sql = RE_NUMERO.sub('?', sql)
+    sql = RE_LISTA.sub('(?+)', sql)
+    return RE_ESPACOS.sub(' ', sql).strip()
+
+
+@lru_cache(maxsize=2048)
+def impressao_digital(sql):
+    return hashlib.md5(normalizar(sql).encode('utf-8')).hexdigest()[:12]
+
+
+def _formato(valor):
+    if valor is None:
+        return 'null'
+    if isinstance(valor, (str, bytes, list, tuple)):
+        return f"{type(valor).__name__}[{len(valor)}]"
+    return type(valor).__name__
+
+
+def formato_parametros(params):
+    """Tipos (e tamanhos) dos parâmetros, sem os valores"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {chave: _formato(valor) for chave, valor in params.items()}
+    return [_formato(valor) for valor in params]
+
+
+_estatisticas = {}
+_estatisticas_lock = threading.Lock()
+
+
+def _acumular(impressao, sql, nome, duracao_ms, lenta):
+    with _estatisticas_lock:
+        item = _estatisticas.get(impressao)
+        if item is None:
+            if len(_estatisticas) >= MAXIMO_IMPRESSOES:
+                return None
+            item = _estatisticas[impressao] = {
+                'sql': normalizar(sql), 'consultas': set(), 'chamadas': 0, 'lentas': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'ultimo_plano': None, 'plano_em': 0.0,
+            }
+        item['consultas'].add(nome)
+        item['chamadas'] += 1
+        item['total_ms'] += duracao_ms
+        item['max_ms'] = max(item['max_ms'], duracao_ms)
+        if lenta:
+            item['lentas'] += 1
+        return item
+
+
+def _reservar_plano(item):
+    """Sorteia a amostra e respeita o intervalo mínimo entre planos da mesma consulta"""
+    if Config.DB_EXPLAIN_AMOSTRA <= 0 or random.random() >= Config.DB_EXPLAIN_AMOSTRA:
+        return False
+    agora = time.monotonic()
+    with _estatisticas_lock:
+        if item['plano_em'] and agora - item['plano_em'] < Config.DB_EXPLAIN_INTERVALO:
+            return False
+        item['plano_em'] = agora
+    return True
+
+
+def explicar(conn, sql, params, analisar=True):
+    """Plano em texto: com analisar, executa de novo com EXPLAIN (ANALYZE, BUFFERS)
+    somente leitura e desfaz; senão só EXPLAIN, sem executar"""
+    status = conn.info.transaction_status
+    if status not in (extensions.TRANSACTION_STATUS_IDLE, extensions.TRANSACTION_STATUS_INTRANS):
+        return None
+    # Cursor comum: o EXPLAIN não passa de novo pelo CursorMedido
+    cursor = conn.cursor(cursor_factory=extensions.cursor)
+    if status == extensions.TRANSACTION_STATUS_IDLE:
+        # Fora de transação (conexão em autocommit)
+        inicio, desfazer = "BEGIN", "ROLLBACK"
+    else:
+        inicio = "SAVEPOINT explain_lento"
+        desfazer = "ROLLBACK TO SAVEPOINT explain_lento; RELEASE SAVEPOINT explain_lento"
+    try:
+        cursor.execute(inicio)
+        try:
+            if analisar:
+                cursor.execute("SET LOCAL transaction_read_only = on")
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+            else:
+                cursor.execute("EXPLAIN " + sql, params)
+            return '\n'.join(linha for (linha,) in cursor.fetchall())
+        finally:
+            cursor.execute(desfazer)
+    finally:
+        cursor.close()
+
+
+def registrar(cursor, nome, sql, params, duracao_ms, explicavel=True):
+    """Chamado pelo CursorMedido depois de cada comando bem-sucedido"""
+    if not isinstance(sql, str):
+        sql = sql.as_string(cursor) if hasattr(sql, 'as_string') else sql.decode('utf-8')
+    impressao = impressao_digital(sql)
+    lenta = duracao_ms >= Config.DB_SLOW_MS
+    item = _acumular(impressao, sql, nome, duracao_ms, lenta)
+    if not lenta:
+        return
+
+    CONSULTAS_LENTAS.inc(nome)
+    print(f"Consulta lenta: {nome} [{impressao}] {duracao_ms:.0f}ms "
+          f"parametros={formato_parametros(params)} sql={normalizar(sql)[:200]}")
+
+    # Cursores nomeados só medem o DECLARE; COPY, DDL e scripts não têm EXPLAIN
+    if (not explicavel or item is None or cursor.name is not None or not RE_EXPLICAVEL.match(sql.lstrip())
+            or ';' in normalizar(sql).rstrip('; ') or not _reservar_plano(item)):
+        return
+    analisar = not RE_ESCRITA.search(normalizar(sql))
+    try:
+        try:
+            plano = explicar(cursor.connection, sql, params, analisar)
+        except errors.ReadOnlySqlTransaction:
+            # SELECT de uma função que grava: fica o plano estimado
+            plano = explicar(cursor.connection, sql, params, analisar=False)
+    except Exception as e:
+        print(f"Erro no EXPLAIN de {nome} [{impressao}]: {e}")
+        return
+    if plano:
+        with _estatisticas_lock:
+            item['ultimo_plano'] = plano
+        print(f"Plano de {nome} [{impressao}]:\n{plano}")
+
+
+def estatisticas():
+    """Cópia do acumulado por impressão digital, da maior para a menor soma de tempo"""
+    with _estatisticas_lock:
+        itens = [dict(item, impressao=impressao, consultas=sorted(item['consultas']))
+                 for impressao, item in _estatisticas.items()]
+    for item in itens:
+        item.pop('plano_em')
+        item['media_ms'] = round(item['total_ms'] / item['chamadas'], 3)
+    return sorted(itens, key=lambda item: item['total_ms'], reverse=True)
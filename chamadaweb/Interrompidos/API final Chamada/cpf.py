@@ -0,0 +1,38 @@
+"""
+Validação e formatação de CPF.
+
+Um CPF por vez (formulários de cadastro). A versão em lote, com NumPy, fica em
+importacao_alunos.py; o gerador de dados sintéticos usa digitos_verificadores.
+"""
+import re
+
+
+def digitos_verificadores(base):
+    """Os dois dígitos verificadores a partir dos 9 primeiros dígitos"""
+    digitos = [int(c) for c in base]
+    for _ in range(2):
+        soma = sum(d * peso for d, peso in zip(digitos, range(len(digitos) + 1, 1, -1)))
+        digitos.append(soma * 10 % 11 % 10)
+    return f"{digitos[-2]}{digitos[-1]}"
+
+
+def validar_cpf(cpf):
+    """Valida formato e dígitos verificadores do CPF"""
+    # Remove caracteres não numéricos
+    cpf = re.sub(r'[^0-9]', '', cpf)
+
+    # Verifica se tem 11 dígitos
+    if len(cpf) != 11:
+        return False
+
+    # Verifica se todos os dígitos são iguais
+    if cpf == cpf[0] * 11:
+        return False
+
+    return cpf[9:] == digitos_verificadores(cpf[:9])
+
+
+def formatar_cpf(cpf):
+    """Formata CPF para XXX.XXX.XXX-XX"""
+    cpf = re.sub(r'[^0-9]', '', cpf)
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
@@ -0,0 +1,233 @@
+"""
+Pool de conexões PostgreSQL compartilhado pela aplicação.
+
+Em vez de abrir um psycopg2.connect() por requisição (TLS + autenticação a cada
+chamada), as rotas emprestam conexões de um ThreadedConnectionPool e as devolvem
+ao final pelo context manager get_db_connection().
+
+Variáveis de ambiente (ver config.py):
+- DB_POOL_MIN / DB_POOL_MAX: tamanho mínimo e máximo do pool
+- DB_POOL_TIMEOUT: segundos de espera por uma conexão livre
+- DB_POOL_HEALTHCHECK: segundos ociosos a partir dos quais a conexão é testada
+  com SELECT 1 antes de ser entregue (0 = testa sempre)
+- DB_USE_POOLER: usa o pooler do Supabase (porta 6543), como no test_pool.py
+
+Os cursores das conexões do pool são CursorMedido: o tempo de cada consulta vai
+para as métricas (metricas.py) com o nome da função que a executou, e as lentas
+para o log de consultas_lentas.py.
+"""
+import atexit
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2 import pool as pg_pool
+
+import consultas_lentas
+import metricas
+from config import Config
+
+
+def _nome_consulta():
+    """modulo.funcao de quem chamou execute (pulando o próprio psycopg2, ex.: execute_values)"""
+    frame = sys._getframe(3)  # _nome_consulta <- _medir <- execute <- quem chamou
+    while frame is not None and frame.f_globals.get('__name__', '').startswith('psycopg2'):
+        frame = frame.f_back
+    if frame is None:
+        return 'desconhecida'
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+class CursorMedido(extensions.cursor):
+    """Cursor que registra a duração de cada comando nas métricas e no log de
+    consultas lentas (consultas_lentas.py)"""
+
+    def _medir(self, executar, sql, params, *args, explicavel=True):
+        nome = _nome_consulta()
+        inicio = time.perf_counter()
+        try:
+            resultado = executar(sql, *args)
+        except Exception:
+            metricas.DB_ERROS.inc(nome)
+            metricas.DB_DURACAO.observar(time.perf_counter() - inicio, nome)
+            raise
+        duracao = time.perf_counter() - inicio
+        metricas.DB_DURACAO.observar(duracao, nome)
+        consultas_lentas.registrar(self, nome, sql, params, duracao * 1000, explicavel)
+        return resultado
+
+    def execute(self, query, vars=None):
+        return self._medir(super().execute, query, vars, vars)
+
+    def executemany(self, query, vars_list):
+        # Sem EXPLAIN: seria preciso repetir o lote inteiro
+        return self._medir(super().executemany, query, None, vars_list, explicavel=False)
+
+    def callproc(self, procname, parameters=None):
+        return self._medir(super().callproc, procname, parameters, parameters, explicavel=False)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._medir(super().copy_expert, sql, None, file, size, explicavel=False)
+
+
+class PoolEsgotado(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo limite"""
+
+
+def montar_dsn(database_url, usar_pooler=False):
+    """Troca a porta 5432 pela 6543 (pooler do Supabase) quando habilitado"""
+    if usar_pooler and database_url and ":5432/" in database_url:
+        return database_url.replace(":5432/", ":6543/")
+    return database_url
+
+
+class PoolConexoes:
+    """ThreadedConnectionPool com tempo limite de espera e teste de saúde no empréstimo"""
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=5, intervalo_healthcheck=30):
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, dsn, cursor_factory=CursorMedido)
+        # O ThreadedConnectionPool lança PoolError quando esgota; o semáforo
+        # faz as requisições esperarem até `timeout` segundos por uma vaga.
+        self._vagas = threading.BoundedSemaphore(maxconn)
+        self._ultimo_uso = {}
+        self._em_uso_lock = threading.Lock()
+        self.em_uso = 0
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.intervalo_healthcheck = intervalo_healthcheck
+
+    def _saudavel(self, conn):
+        """Verifica se a conexão ainda responde antes de entregá-la"""
+        if conn.closed:
+            return False
+        ocioso = time.monotonic() - self._ultimo_uso.get(id(conn), 0)
+        if ocioso < self.intervalo_healthcheck:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def obter(self):
+        """Empresta uma conexão, esperando no máximo `timeout` segundos"""
+        inicio = time.perf_counter()
+        if not self._vagas.acquire(timeout=self.timeout):
+            metricas.POOL_ESGOTADO.inc()
+            raise PoolEsgotado(f"Nenhuma conexão livre após {self.timeout}s")
+        metricas.POOL_ESPERA.observar(time.perf_counter() - inicio)
+        try:
+            conn = self._pool.getconn()
+            if not self._saudavel(conn):
+                self._descartar(conn)
+                conn = self._pool.getconn()
+        except Exception:
+            self._vagas.release()
+            raise
+        self._contar_em_uso(1)
+        return conn
+
+    def _contar_em_uso(self, delta):
+        with self._em_uso_lock:
+            self.em_uso += delta
+
+    def _descartar(self, conn):
+        self._ultimo_uso.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def devolver(self, conn, descartar=False):
+        """Devolve a conexão ao pool, descartando-a se estiver quebrada"""
+        try:
+            if conn.closed or descartar:
+                self._descartar(conn)
+                return
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                self._descartar(conn)
+                return
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            self._ultimo_uso[id(conn)] = time.monotonic()
+            self._pool.putconn(conn)
+        except psycopg2.Error:
+            self._descartar(conn)
+        finally:
+            self._contar_em_uso(-1)
+            self._vagas.release()
+
+    def fechar(self):
+        self._pool.closeall()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Cria o pool na primeira utilização (uma instância por processo)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolConexoes(
+                    montar_dsn(Config.DATABASE_URL, Config.DB_USE_POOLER),
+                    minconn=Config.DB_POOL_MIN,
+                    maxconn=Config.DB_POOL_MAX,
+                    timeout=Config.DB_POOL_TIMEOUT,
+                    intervalo_healthcheck=Config.DB_POOL_HEALTHCHECK,
+                )
+    return _pool
+
+
+# Saturação do pool: lida na hora da exportação das métricas
+metricas.Medidor('chamada_db_pool_conexoes_max', 'Tamanho máximo do pool de conexões',
+                 leitura=lambda: _pool.maxconn if _pool is not None else 0)
+metricas.Medidor('chamada_db_pool_conexoes_em_uso', 'Conexões emprestadas do pool',
+                 leitura=lambda: _pool.em_uso if _pool is not None else 0)
+
+
+@atexit.register
+def fechar_pool():
+    """Fecha todas as conexões do pool ao encerrar o processo"""
+    global _pool
+    if _pool is not None:
+        _pool.fechar()
+        _pool = None
+
+
+@contextmanager
+def get_db_connection():
+    """Empresta uma conexão do pool e garante a devolução ao final.
+
+    Entrega None quando o banco está indisponível, mantendo o padrão das rotas
+    de testar `if not conn`. Se o bloco lançar exceção, a transação é desfeita
+    antes da devolução.
+    """
+    pool = None
+    conn = None
+    try:
+        pool = get_pool()
+        conn = pool.obter()
+    except Exception as e:
+        print(f"Erro na conexão com o banco: {e}")
+
+    if conn is None:
+        yield None
+        return
+
+    descartar = False
+    try:
+        yield conn
+    except Exception:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            descartar = True
+        raise
+    finally:
+        pool.devolver(conn, descartar)
@@ -0,0 +1,115 @@
+"""
+Resumo de frequência por (aluno, turma) — tabela frequencia_alunos.
+
+A tabela é mantida por triggers (migrações 0006 e 0014) na mesma transação que
+grava, apaga ou altera chamadas e faltas. Este módulo recalcula o resumo a
+partir do histórico, para conferir se houve divergência e para reconstruí-lo
+do zero (junto com as sequências de faltas consecutivas, migração 0008).
+
+Regra: total_chamadas conta as chamadas da turma atual do aluno feitas desde
+alunos.turma_desde; total_faltas e ultima_falta vêm de faltas. Para turmas
+anteriores de alunos transferidos a contagem de chamadas não é recuperável do
+histórico, então o valor já gravado é preservado.
+
+Uso:
+    python frequencia.py              # confere divergências (padrão)
+    python frequencia.py verificar    # idem; sai com código 1 se houver
+    python frequencia.py reconstruir  # recalcula frequência e faltas consecutivas
+"""
+import sys
+
+from db_pool import get_db_connection
+
+SQL_FREQUENCIA_ESPERADA = '''
+    WITH chamadas_atuais AS (
+        SELECT a.id AS aluno_id, a.turma_id, COUNT(*) AS total_chamadas
+        FROM alunos a
+        JOIN chamadas c ON c.turma_id = a.turma_id AND c.created_at >= a.turma_desde
+        GROUP BY a.id, a.turma_id
+    ), faltas_registradas AS (
+        SELECT f.aluno_id, c.turma_id, COUNT(*) AS total_faltas, MAX(f.data_falta) AS ultima_falta
+        FROM faltas f
+        JOIN chamadas c ON c.id = f.chamada_id
+        GROUP BY f.aluno_id, c.turma_id
+    ), turmas_anteriores AS (
+        SELECT fa.aluno_id, fa.turma_id, fa.total_chamadas
+        FROM frequencia_alunos fa
+        JOIN alunos a ON a.id = fa.aluno_id
+        WHERE a.turma_id IS DISTINCT FROM fa.turma_id
+    )
+    SELECT aluno_id, turma_id,
+           COALESCE(ca.total_chamadas, ta.total_chamadas, 0) AS total_chamadas,
+           COALESCE(fr.total_faltas, 0) AS total_faltas,
+           fr.ultima_falta
+    FROM chamadas_atuais ca
+    FULL JOIN faltas_registradas fr USING (aluno_id, turma_id)
+    FULL JOIN turmas_anteriores ta USING (aluno_id, turma_id)
+'''
+
+
+def verificar_frequencia(conn):
+    """Compara a tabela com o recálculo; retorna [(aluno_id, turma_id, gravado, esperado)]"""
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        WITH esperado AS ({SQL_FREQUENCIA_ESPERADA})
+        SELECT aluno_id, turma_id,
+               g.total_chamadas, g.total_faltas, g.ultima_falta,
+               e.total_chamadas, e.total_faltas, e.ultima_falta
+        FROM frequencia_alunos g
+        FULL JOIN esperado e USING (aluno_id, turma_id)
+        WHERE (COALESCE(g.total_chamadas, 0), COALESCE(g.total_faltas, 0), g.ultima_falta)
+              IS DISTINCT FROM
+              (COALESCE(e.total_chamadas, 0), COALESCE(e.total_faltas, 0), e.ultima_falta)
+        ORDER BY turma_id, aluno_id
+    ''')
+    divergencias = [(linha[0], linha[1], linha[2:5], linha[5:8]) for linha in cursor.fetchall()]
+    conn.rollback()
+    cursor.close()
+    return divergencias
+
+
+def reconstruir_frequencia(conn):
+    """Recalcula frequencia_alunos do zero em uma transação; retorna o número de linhas"""
+    cursor = conn.cursor()
+    # Bloqueia novas chamadas/faltas enquanto recalcula (leituras continuam)
+    cursor.execute("LOCK TABLE chamadas, faltas, alunos IN SHARE MODE")
+    cursor.execute("LOCK TABLE frequencia_alunos IN EXCLUSIVE MODE")
+    cursor.execute(f"CREATE TEMP TABLE frequencia_esperada ON COMMIT DROP AS {SQL_FREQUENCIA_ESPERADA}")
+    cursor.execute("DELETE FROM frequencia_alunos")
+    cursor.execute('''
+        INSERT INTO frequencia_alunos (aluno_id, turma_id, total_chamadas, total_faltas, ultima_falta)
+        SELECT aluno_id, turma_id, total_chamadas, total_faltas, ultima_falta
+        FROM frequencia_esperada
+    ''')
+    total = cursor.rowcount
+    cursor.execute("SELECT recalcular_sequencias()")
+    conn.commit()
+    cursor.close()
+    return total
+
+
+def main(argv):
+    comando = argv[1] if len(argv) > 1 else 'verificar'
+    with get_db_connection() as conn:
+        if not conn:
+            print("Erro na conexão com o banco de dados")
+            return 1
+
+        if comando == 'verificar':
+            divergencias = verificar_frequencia(conn)
+            for aluno_id, turma_id, gravado, esperado in divergencias:
+                print(f"aluno {aluno_id} turma {turma_id}: gravado {gravado}, esperado {esperado}")
+            print(f"{len(divergencias)} divergência(s)")
+            return 1 if divergencias else 0
+
+        if comando == 'reconstruir':
+            total = reconstruir_frequencia(conn)
+            print(f"frequencia_alunos reconstruída: {total} linha(s)")
+            return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
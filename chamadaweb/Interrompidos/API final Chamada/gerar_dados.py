@@ -0,0 +1,390 @@
+"""
+Gerador de dados sintéticos para testes de escala.
+
+Carrega unidades, cursos, professores, turmas, alunos (com CPFs válidos),
+chamadas e faltas com COPY FROM STDIN, gerando as linhas conforme o
+PostgreSQL as consome (nada é montado em memória além das turmas e alunos).
+Com a mesma semente e os mesmos tamanhos, o conteúdo gerado é idêntico.
+
+Modelo:
+    - turmas distribuídas entre os cursos das unidades, em três turnos; cada
+      professor dá aula em até duas turmas do mesmo curso
+    - uma chamada por turma a cada dia útil, terminando em --ate
+    - cada aluno tem uma propensão própria a faltar (distribuição beta, média
+      ~13%, com cauda de alunos que faltam muito) e uma parte dos alunos evade:
+      a partir de um dia sorteado falta sempre (alguns ficam inativos)
+    - 10% das faltas são justificadas
+
+Chaves estrangeiras, índices secundários e triggers ficam suspensos durante a
+carga (como na restauração do backup). O resumo de frequência e as faltas
+consecutivas são calculados pelo gerador enquanto sorteia as faltas e
+carregados também com COPY; os alertas saem do trigger de frequencia_alunos.
+(Recalcular pelo histórico com recalcular_sequencias() leva dezenas de minutos
+no preset producao.) Para conferir os resumos: python frequencia.py verificar
+
+Tamanhos (--preset; cada um pode ser ajustado com --unidades, --turmas, ...):
+    pequeno    3 unidades,   60 turmas,  1.800 alunos,   60 dias  (~15 mil faltas)
+    medio     15 unidades,  500 turmas, 15.000 alunos,  200 dias  (~430 mil faltas)
+    producao  50 unidades, 2000 turmas, 60.000 alunos, 1160 dias  (~10 milhões de faltas)
+
+Uso:
+    python gerar_dados.py producao --limpar
+    python gerar_dados.py pequeno --semente 7 --alunos 5000
+
+Sem --limpar as tabelas precisam estar vazias; com --limpar são esvaziadas
+antes (TRUNCATE, inclusive o resumo de frequência e os alertas). Os usuários
+não são tocados e os professores gerados ficam sem login (usuario_id nulo).
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from backup import analisar, religar_restricoes, suspender_restricoes
+from cpf import digitos_verificadores
+from db_pool import get_db_connection
+
+PRESETS = {
+    'pequeno': dict(unidades=3, cursos_por_unidade=4, turmas=60, alunos=1800, dias=60),
+    'medio': dict(unidades=15, cursos_por_unidade=5, turmas=500, alunos=15000, dias=200),
+    'producao': dict(unidades=50, cursos_por_unidade=6, turmas=2000, alunos=60000, dias=1160),
+}
+
+# Tabelas carregadas, em ordem de dependência
+TABELAS_GERADAS = ['unidades', 'cursos', 'professores', 'turmas', 'alunos', 'chamadas', 'faltas']
+# Resumos calculados junto com as faltas; os alertas saem do trigger de frequencia_alunos
+TABELAS_RESUMO = ['frequencia_alunos', 'sequencias_faltas']
+TABELAS_DERIVADAS = TABELAS_RESUMO + ['alertas_frequencia']
+
+# Fim padrão fixo: a mesma semente gera as mesmas datas em qualquer dia
+DATA_FINAL_PADRAO = date(2026, 6, 30)
+
+TURNOS = ['08:00:00', '13:30:00', '19:00:00']
+TIPOS_PROFESSOR = ['instrutor'] * 7 + ['monitor'] * 2 + ['pedagoga']
+TAXA_EVASAO = 0.04
+TAXA_JUSTIFICADA = 0.1
+
+# Linhas acumuladas por bloco entregue ao COPY
+TAMANHO_BLOCO = 256 * 1024
+
+CIDADES = [
+    'Centro', 'Zona Norte', 'Zona Sul', 'Zona Leste', 'Zona Oeste', 'Vila Mariana', 'Santo Amaro',
+    'Pinheiros', 'Mooca', 'Penha', 'Itaquera', 'Campo Limpo', 'Butantã', 'Lapa', 'Tatuapé',
+    'Guarulhos', 'Osasco', 'Santo André', 'São Bernardo', 'Diadema', 'Mauá', 'Barueri',
+    'Carapicuíba', 'Taboão da Serra', 'Cotia',
+]
+NOMES_CURSOS = [
+    'Informática Básica', 'Pacote Office', 'Excel Avançado', 'Programação Web', 'Design Gráfico',
+    'Montagem e Manutenção', 'Redes de Computadores', 'Robótica', 'Administração', 'Inglês',
+    'Libras', 'Empreendedorismo',
+]
+LOGRADOUROS = ['Rua das Flores', 'Avenida Brasil', 'Rua São José', 'Rua XV de Novembro',
+               'Avenida Paulista', 'Rua da Paz', 'Rua Sete de Setembro', 'Avenida Central']
+PRIMEIROS_NOMES = [
+    'Ana', 'Maria', 'Julia', 'Beatriz', 'Larissa', 'Camila', 'Fernanda', 'Gabriela', 'Isabela',
+    'Leticia', 'Mariana', 'Patricia', 'Rafaela', 'Sofia', 'Vitoria', 'Aline', 'Bruna', 'Carla',
+    'João', 'Pedro', 'Lucas', 'Gabriel', 'Mateus', 'Rafael', 'Gustavo', 'Felipe', 'Bruno',
+    'Carlos', 'Daniel', 'Eduardo', 'Henrique', 'Leonardo', 'Marcos', 'Paulo', 'Rodrigo', 'Thiago',
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+    'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes',
+    'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques',
+    'Machado', 'Mendes', 'Freitas', 'Cardoso', 'Ramos', 'Teixeira', 'Araujo', 'Pinto', 'Moura',
+]
+
+
+def gerar_cpfs(semente):
+    """CPFs válidos, formatados e sem repetição (bijeção sobre os 9 primeiros dígitos)"""
+    deslocamento = random.Random(f"{semente}-cpf").randrange(10 ** 9)
+    indice = 0
+    while True:
+        # 3^18 é primo com 10^9: índices distintos dão bases distintas
+        base = f"{(indice * 387420489 + deslocamento) % 10 ** 9:09d}"
+        indice += 1
+        if base == base[0] * 9:
+            continue
+        cpf = base + digitos_verificadores(base)
+        yield f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+def dias_letivos(data_final, quantidade):
+    """Os últimos `quantidade` dias úteis (segunda a sexta) até data_final, em ordem"""
+    dias = []
+    dia = data_final
+    while len(dias) < quantidade:
+        if dia.weekday() < 5:
+            dias.append(dia)
+        dia -= timedelta(days=1)
+    return dias[::-1]
+
+
+def _nome_pessoa(rng):
+    return f"{rng.choice(PRIMEIROS_NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+class _FonteCopy:
+    """Arquivo só de leitura sobre um gerador de linhas, para o COPY FROM STDIN"""
+
+    def __init__(self, linhas):
+        self._linhas = linhas
+
+    def read(self, tamanho=-1):
+        partes, total = [], 0
+        for linha in self._linhas:
+            partes.append(linha)
+            total += len(linha)
+            if total >= TAMANHO_BLOCO:
+                break
+        return ''.join(partes)
+
+
+class Cenario:
+    """Entidades do cenário (unidades a alunos), sorteadas com a semente;
+    chamadas e faltas são geradas sob demanda a partir delas"""
+
+    def __init__(self, semente, unidades, cursos_por_unidade, turmas, alunos, dias,
+                 data_final=DATA_FINAL_PADRAO):
+        self.semente = semente
+        self.dias = dias_letivos(data_final, dias)
+        rng = random.Random(semente)
+        cpfs = gerar_cpfs(semente)
+        inicio = datetime.combine(self.dias[0] - timedelta(days=7), datetime.min.time())
+        self.criado_em = inicio.isoformat(sep=' ')
+
+        self.unidades = []
+        for unidade_id in range(1, unidades + 1):
+            rodada, posicao = divmod(unidade_id - 1, len(CIDADES))
+            nome = f"Unidade {CIDADES[posicao]}" + (f" {rodada + 1}" if rodada else '')
+            endereco = f"{rng.choice(LOGRADOUROS)}, {rng.randint(10, 2000)}"
+            self.unidades.append((unidade_id, nome, endereco))
+        self.cursos = []
+        for unidade_id, *_ in self.unidades:
+            for nome in rng.sample(NOMES_CURSOS, min(cursos_por_unidade, len(NOMES_CURSOS))):
+                self.cursos.append((len(self.cursos) + 1, nome, unidade_id))
+
+        # Turmas em rodízio pelos cursos; um professor a cada duas turmas do curso
+        self.professores = []
+        self.turmas = []
+        por_curso = {}
+        for indice in range(turmas):
+            curso_id, nome_curso, unidade_id = self.cursos[indice % len(self.cursos)]
+            do_curso = por_curso.setdefault(curso_id, [])
+            if len(do_curso) % 2 == 0:
+                self.professores.append((len(self.professores) + 1, _nome_pessoa(rng), next(cpfs),
+                                         rng.choice(TIPOS_PROFESSOR), unidade_id, curso_id))
+            turno = TURNOS[len(do_curso) % len(TURNOS)]
+            nome = f"{nome_curso} - {turno[:5]} - T{len(do_curso) + 1}"
+            turma = (indice + 1, nome, curso_id, self.professores[-1][0], turno)
+            do_curso.append(turma)
+            self.turmas.append(turma)
+
+        # Alunos: turma sorteada, propensão a faltar e, para os que evadem, o
+        # índice do dia a partir do qual faltam sempre
+        self.alunos = []
+        self.membros = {turma[0]: [] for turma in self.turmas}
+        sem_evasao = len(self.dias)
+        for aluno_id in range(1, alunos + 1):
+            turma_id = rng.randrange(turmas) + 1
+            propensao = rng.betavariate(1.5, 10)
+            evasao = sem_evasao
+            if rng.random() < TAXA_EVASAO:
+                evasao = rng.randrange(len(self.dias) // 4, len(self.dias))
+            ativo = evasao == sem_evasao or rng.random() < 0.5
+            self.alunos.append((aluno_id, _nome_pessoa(rng), next(cpfs), turma_id, ativo))
+            self.membros[turma_id].append((aluno_id, propensao, evasao))
+
+    # ---- linhas no formato texto do COPY ----
+
+    def linhas_unidades(self):
+        for unidade_id, nome, endereco in self.unidades:
+            yield f"{unidade_id}\t{nome}\t{endereco}\tt\t{self.criado_em}\n"
+
+    def linhas_cursos(self):
+        for curso_id, nome, unidade_id in self.cursos:
+            yield f"{curso_id}\t{nome}\t{unidade_id}\tt\t{self.criado_em}\n"
+
+    def linhas_professores(self):
+        for professor_id, nome, cpf, tipo, unidade_id, curso_id in self.professores:
+            yield f"{professor_id}\t{nome}\t{cpf}\t{tipo}\t{unidade_id}\t{curso_id}\t\\N\tt\t{self.criado_em}\n"
+
+    def linhas_turmas(self):
+        for turma_id, nome, curso_id, professor_id, _turno in self.turmas:
+            yield f"{turma_id}\t{nome}\t{curso_id}\t{professor_id}\tt\t{self.criado_em}\n"
+
+    def linhas_alunos(self):
+        for aluno_id, nome, cpf, turma_id, ativo in self.alunos:
+            yield (f"{aluno_id}\t{nome}\t{cpf}\t{turma_id}\t{'t' if ativo else 'f'}\tf\t"
+                   f"{self.criado_em}\t{self.criado_em}\n")
+
+    def _chamadas(self):
+        """(chamada_id, índice do dia, data, turma): dia a dia, todas as turmas"""
+        for indice_dia, dia in enumerate(self.dias):
+            data = dia.isoformat()
+            for turma in self.turmas:
+                yield indice_dia * len(self.turmas) + turma[0], indice_dia, data, turma
+
+    def linhas_chamadas(self):
+        for chamada_id, _indice_dia, data, (turma_id, _nome, _curso, professor_id, turno) in self._chamadas():
+            yield f"{chamada_id}\t{turma_id}\t{data}\t{turno}\t{professor_id}\t{data} {turno}\n"
+
+    def linhas_faltas(self):
+        # Gerador próprio: as faltas não dependem da ordem em que as tabelas são lidas
+        sorteio = random.Random(f"{self.semente}-faltas").random
+        # Por aluno: total de faltas, dia da última falta e dia em que começou a
+        # sequência atual (a turma tem chamada todo dia, então faltas seguidas
+        # são dias seguidos); daí saem frequencia_alunos e sequencias_faltas
+        total = self.total_faltas = [0] * (len(self.alunos) + 1)
+        ultima = self.ultima_falta = [-2] * (len(self.alunos) + 1)
+        inicio = self.inicio_sequencia = [0] * (len(self.alunos) + 1)
+        falta_id = 0
+        for chamada_id, indice_dia, data, (turma_id, _nome, _curso, _professor, turno) in self._chamadas():
+            ausentes = [aluno_id for aluno_id, propensao, evasao in self.membros[turma_id]
+                        if indice_dia >= evasao or sorteio() < propensao]
+            if not ausentes:
+                continue
+            linhas = []
+            for aluno_id in ausentes:
+                falta_id += 1
+                total[aluno_id] += 1
+                if ultima[aluno_id] != indice_dia - 1:
+                    inicio[aluno_id] = indice_dia
+                ultima[aluno_id] = indice_dia
+                justificada = 't' if sorteio() < TAXA_JUSTIFICADA else 'f'
+                linhas.append(f"{falta_id}\t{chamada_id}\t{aluno_id}\t{data}\t{turno}\t"
+                              f"{data} {turno}\t{justificada}\n")
+            yield ''.join(linhas)
+
+    # ---- resumos (mesmas regras de frequencia.py e recalcular_sequencias) ----
+    # Só depois de linhas_faltas: todos os alunos entram antes da primeira chamada
+
+    def linhas_frequencia_alunos(self):
+        for aluno_id, _nome, _cpf, turma_id, _ativo in self.alunos:
+            dia = self.ultima_falta[aluno_id]
+            ultima = self.dias[dia].isoformat() if dia >= 0 else '\\N'
+            yield f"{aluno_id}\t{turma_id}\t{len(self.dias)}\t{self.total_faltas[aluno_id]}\t{ultima}\n"
+
+    def linhas_sequencias_faltas(self):
+        ultimo_dia = len(self.dias) - 1
+        for aluno_id, _nome, _cpf, turma_id, _ativo in self.alunos:
+            ultima_chamada_id = ultimo_dia * len(self.turmas) + turma_id
+            if self.ultima_falta[aluno_id] == ultimo_dia:
+                inicio = self.inicio_sequencia[aluno_id]
+                yield (f"{aluno_id}\t{turma_id}\t{ultimo_dia - inicio + 1}\t"
+                       f"{self.dias[inicio].isoformat()}\t{ultima_chamada_id}\n")
+            else:
+                yield f"{aluno_id}\t{turma_id}\t0\t\\N\t{ultima_chamada_id}\n"
+
+
+COLUNAS = {
+    'unidades': 'id, nome, endereco, ativo, created_at',
+    'cursos': 'id, nome, unidade_id, ativo, created_at',
+    'professores': 'id, nome, cpf, tipo, unidade_id, curso_id, usuario_id, ativo, created_at',
+    'turmas': 'id, nome, curso_id, professor_id, ativo, created_at',
+    'alunos': 'id, nome, cpf, turma_id, ativo, editado, created_at, turma_desde',
+    'chamadas': 'id, turma_id, data_chamada, hora_chamada, professor_id, created_at',
+    'faltas': 'id, chamada_id, aluno_id, data_falta, hora_falta, created_at, justificada',
+    'frequencia_alunos': 'aluno_id, turma_id, total_chamadas, total_faltas, ultima_falta',
+    'sequencias_faltas': 'aluno_id, turma_id, faltas_seguidas, faltando_desde, ultima_chamada_id',
+}
+
+
+def _indices_secundarios(cursor, tabelas):
+    """Índices que não sustentam restrições (PK, UNIQUE): recriados depois da carga"""
+    cursor.execute('''
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid::regclass::text = ANY(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+    ''', (tabelas,))
+    return cursor.fetchall()
+
+
+def _copiar(cursor, cenario, tabela):
+    inicio = time.perf_counter()
+    linhas = getattr(cenario, f"linhas_{tabela}")()
+    cursor.copy_expert(f"COPY {tabela} ({COLUNAS[tabela]}) FROM STDIN", _FonteCopy(linhas))
+    segundos = time.perf_counter() - inicio
+    print(f"{tabela}: {cursor.rowcount} linha(s) em {segundos:.1f}s")
+    return cursor.rowcount, segundos
+
+
+def carregar(conn, cenario, limpar=False):
+    """Carrega o cenário em uma transação; retorna {tabela: (linhas, segundos)}"""
+    cursor = conn.cursor()
+    resultado = {}
+    try:
+        if limpar:
+            cursor.execute(f"TRUNCATE {', '.join(TABELAS_GERADAS + TABELAS_DERIVADAS)} RESTART IDENTITY CASCADE")
+        else:
+            for tabela in TABELAS_GERADAS:
+                cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {tabela})")
+                if cursor.fetchone()[0]:
+                    raise ValueError(f"A tabela {tabela} não está vazia (use --limpar)")
+
+        chaves = suspender_restricoes(cursor, TABELAS_GERADAS)
+        # Um índice montado de uma vez no fim custa bem menos que mantido linha a linha
+        indices = _indices_secundarios(cursor, TABELAS_GERADAS)
+        for nome, _definicao in indices:
+            cursor.execute(f"DROP INDEX {nome}")
+        for tabela in TABELAS_GERADAS:
+            resultado[tabela] = _copiar(cursor, cenario, tabela)
+        inicio = time.perf_counter()
+        for _nome, definicao in indices:
+            cursor.execute(definicao)
+        print(f"{len(indices)} índice(s) recriados em {time.perf_counter() - inicio:.1f}s")
+        religar_restricoes(cursor, chaves, TABELAS_GERADAS)
+
+        # Resumos com os triggers ligados: a carga de frequencia_alunos avalia os alertas
+        for tabela in TABELAS_RESUMO:
+            resultado[tabela] = _copiar(cursor, cenario, tabela)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para testes de escala")
+    parser.add_argument('preset', choices=sorted(PRESETS), help="tamanho do cenário")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--limpar', action='store_true', help="esvazia as tabelas antes da carga")
+    parser.add_argument('--ate', type=date.fromisoformat, default=DATA_FINAL_PADRAO,
+                        help="data da última chamada (AAAA-MM-DD)")
+    for nome in ('unidades', 'cursos_por_unidade', 'turmas', 'alunos', 'dias'):
+        parser.add_argument(f"--{nome.replace('_', '-')}", dest=nome, type=int)
+    args = parser.parse_args()
+
+    tamanhos = dict(PRESETS[args.preset])
+    tamanhos.update({nome: valor for nome, valor in vars(args).items()
+                     if nome in tamanhos and valor is not None})
+
+    inicio = time.perf_counter()
+    cenario = Cenario(args.semente, data_final=args.ate, **tamanhos)
+    print(f"Cenário {args.preset} (semente {args.semente}): {tamanhos}")
+
+    with get_db_connection() as conn:
+        if not conn:
+            print("Erro na conexão com o banco de dados")
+            return 1
+        try:
+            resultado = carregar(conn, cenario, limpar=args.limpar)
+        except ValueError as e:
+            print(e)
+            return 1
+
+        analisar(conn, TABELAS_GERADAS + TABELAS_DERIVADAS)
+
+    linhas = sum(total for total, _segundos in resultado.values())
+    segundos = sum(segundos for _total, segundos in resultado.values())
+    print(f"{linhas} linha(s) carregadas com COPY ({linhas / segundos * 60 / 1e6:.1f} milhões/min); "
+          f"total {time.perf_counter() - inicio:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
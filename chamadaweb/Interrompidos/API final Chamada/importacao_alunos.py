@@ -0,0 +1,308 @@
+"""
+Importação de alunos em lote a partir de planilhas de matrícula (CSV ou XLSX).
+
+A planilha é lida em streaming (openpyxl em modo somente leitura, ou csv) a
+partir da linha de cabeçalho que tenha as colunas de nome e CPF, como nas
+planilhas "IMPORTAÇÃO DE ALUNOS" (NOME COMPLETO, CPF, ...). A cada
+TAMANHO_LOTE linhas os CPFs são normalizados — células numéricas perdem os
+zeros à esquerda — e os dígitos verificadores de todo o lote são conferidos
+de uma vez com NumPy; as linhas válidas vão com COPY para uma tabela
+temporária. No fim, um único comando separa os CPFs já cadastrados e um
+INSERT ... SELECT grava o restante na turma, tudo na mesma transação.
+
+Cada linha recusada volta no relatório com o número da linha na planilha e o
+motivo (nome vazio, CPF inválido, repetido na planilha ou já cadastrado).
+Com simular=True nada é gravado: só o relatório.
+
+Uso:
+    python importacao_alunos.py planilha.xlsx TURMA_ID [--simular]
+
+Também por POST /alunos/importar (multipart: arquivo, turma_id, simular).
+"""
+import codecs
+import csv
+import io
+import itertools
+import re
+import sys
+import time
+import unicodedata
+
+import numpy as np
+
+from cpf import formatar_cpf
+from db_pool import get_db_connection
+
+TAMANHO_LOTE = 5000
+# Linhas do início de cada aba em que o cabeçalho é procurado
+LINHAS_CABECALHO = 20
+TAMANHO_NOME = 255
+
+COLUNAS_NOME = ('NOME COMPLETO', 'NOME DO ALUNO', 'NOME', 'ALUNO')
+PESOS_PRIMEIRO_DIGITO = np.arange(10, 1, -1)
+PESOS_SEGUNDO_DIGITO = np.arange(11, 1, -1)
+# Placeholder dos CPFs que nem chegam a 11 dígitos: dígitos iguais, sempre inválido
+CPF_VAZIO = '0' * 11
+
+
+class ErroImportacao(Exception):
+    """Planilha ilegível, sem as colunas de nome e CPF, ou turma inexistente"""
+
+
+# ================= LEITURA ===================
+
+def _normalizar_cabecalho(valor):
+    texto = unicodedata.normalize('NFKD', str(valor or '')).encode('ascii', 'ignore').decode()
+    return ' '.join(texto.upper().split())
+
+
+def _colunas(linha):
+    """(índice do nome, índice do CPF) se a linha é o cabeçalho, senão None"""
+    cabecalho = [_normalizar_cabecalho(valor) for valor in linha]
+    if 'CPF' not in cabecalho:
+        return None
+    for coluna in COLUNAS_NOME:
+        if coluna in cabecalho:
+            return cabecalho.index(coluna), cabecalho.index('CPF')
+    return None
+
+
+def _vazio(valor):
+    return valor is None or str(valor).strip() == ''
+
+
+def _abas_xlsx(arquivo):
+    from openpyxl import load_workbook  # só para planilhas .xlsx
+
+    try:
+        livro = load_workbook(arquivo, read_only=True, data_only=True)
+    except Exception as e:
+        raise ErroImportacao(f"Arquivo .xlsx inválido: {e}") from e
+    try:
+        for aba in livro.worksheets:
+            yield aba.iter_rows(values_only=True)
+    finally:
+        livro.close()
+
+
+def _abas_csv(arquivo):
+    amostra = arquivo.read(64 * 1024)
+    arquivo.seek(0)
+    # CSV salvo pelo Excel em português costuma vir em cp1252 e separado por ;
+    try:
+        texto_amostra = codecs.getincrementaldecoder('utf-8')().decode(amostra)
+        codificacao = 'utf-8-sig'
+    except UnicodeDecodeError:
+        texto_amostra = amostra.decode('cp1252', errors='replace')
+        codificacao = 'cp1252'
+    try:
+        dialeto = csv.Sniffer().sniff(texto_amostra, delimiters=';,\t')
+    except csv.Error:
+        dialeto = csv.excel
+    texto = io.TextIOWrapper(arquivo, encoding=codificacao, errors='replace', newline='')
+    try:
+        yield csv.reader(texto, dialeto)
+    finally:
+        texto.detach()
+
+
+def ler_planilha(arquivo, nome_arquivo):
+    """(linha, nome, cpf) de cada linha preenchida abaixo do cabeçalho, na
+    primeira aba que tenha as colunas de nome e CPF"""
+    extensao = nome_arquivo.lower().rsplit('.', 1)[-1]
+    if extensao in ('xlsx', 'xlsm'):
+        abas = _abas_xlsx(arquivo)
+    elif extensao in ('csv', 'txt'):
+        abas = _abas_csv(arquivo)
+    else:
+        raise ErroImportacao("Formato não suportado: envie um arquivo .csv ou .xlsx")
+
+    try:
+        for linhas in abas:
+            numeradas = enumerate(linhas, start=1)
+            for _numero, linha in itertools.islice(numeradas, LINHAS_CABECALHO):
+                colunas = _colunas(linha)
+                if colunas:
+                    break
+            else:
+                continue
+
+            coluna_nome, coluna_cpf = colunas
+            for numero, linha in numeradas:
+                nome = linha[coluna_nome] if coluna_nome < len(linha) else None
+                cpf = linha[coluna_cpf] if coluna_cpf < len(linha) else None
+                if _vazio(nome) and _vazio(cpf):
+                    continue
+                yield numero, nome, cpf
+            return
+    finally:
+        abas.close()
+    raise ErroImportacao("Cabeçalho com as colunas NOME e CPF não encontrado na planilha")
+
+
+# ================= VALIDAÇÃO ===================
+
+def normalizar_cpf(valor):
+    """Os 11 dígitos do CPF de uma célula (texto ou número), ou '' se não der"""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        # Célula numérica perde os zeros à esquerda; os dígitos verificadores
+        # recusam o que não era CPF. Texto com menos de 11 dígitos é recusado
+        digitos = str(valor)
+        if 6 <= len(digitos) < 11:
+            digitos = digitos.zfill(11)
+    else:
+        digitos = re.sub(r'[^0-9]', '', str(valor or ''))
+    return digitos if len(digitos) == 11 else ''
+
+
+def validar_cpfs(cpfs):
+    """Vetor booleano com a validade de cada CPF (strings de 11 dígitos), de uma vez"""
+    if not cpfs:
+        return np.zeros(0, dtype=bool)
+    digitos = np.frombuffer(''.join(cpfs).encode('ascii'), dtype=np.uint8).reshape(-1, 11) - ord('0')
+    digitos = digitos.astype(np.int64)
+    primeiro = digitos[:, :9] @ PESOS_PRIMEIRO_DIGITO * 10 % 11 % 10
+    segundo = digitos[:, :10] @ PESOS_SEGUNDO_DIGITO * 10 % 11 % 10
+    repetidos = (digitos == digitos[:, :1]).all(axis=1)
+    return (primeiro == digitos[:, 9]) & (segundo == digitos[:, 10]) & ~repetidos
+
+
+def _erro(linha, nome, cpf, motivo):
+    return {"linha": linha, "nome": None if _vazio(nome) else str(nome).strip(),
+            "cpf": None if _vazio(cpf) else str(cpf), "motivo": motivo}
+
+
+def _validar_lote(lote, vistos, erros):
+    """Linhas do lote prontas para o COPY; as recusadas vão para erros"""
+    cpfs = [normalizar_cpf(cpf) for _linha, _nome, cpf in lote]
+    validos = validar_cpfs([cpf or CPF_VAZIO for cpf in cpfs])
+    linhas_copy = []
+    for (linha, nome, cpf_original), cpf, valido in zip(lote, cpfs, validos):
+        nome_limpo = ' '.join(str(nome or '').split())
+        if not nome_limpo:
+            erros.append(_erro(linha, nome, cpf_original, "Nome vazio"))
+        elif len(nome_limpo) > TAMANHO_NOME:
+            erros.append(_erro(linha, nome, cpf_original, f"Nome com mais de {TAMANHO_NOME} caracteres"))
+        elif not valido:
+            erros.append(_erro(linha, nome, cpf_original, "CPF inválido"))
+        elif cpf in vistos:
+            erros.append(_erro(linha, nome, cpf_original, f"CPF repetido na planilha (linha {vistos[cpf]})"))
+        else:
+            vistos[cpf] = linha
+            nome_copy = nome_limpo.replace('\\', '\\\\')
+            linhas_copy.append(f"{linha}\t{nome_copy}\t{formatar_cpf(cpf)}\n")
+    return linhas_copy
+
+
+# ================= GRAVAÇÃO ===================
+
+def importar(conn, arquivo, nome_arquivo, turma_id, simular=False):
+    """Importa os alunos da planilha para a turma em uma transação; retorna o relatório"""
+    inicio = time.perf_counter()
+    cursor = conn.cursor()
+    erros = []
+    total = 0
+    try:
+        cursor.execute("SELECT 1 FROM turmas WHERE id = %s", (turma_id,))
+        if cursor.fetchone() is None:
+            raise ErroImportacao(f"Turma {turma_id} não encontrada")
+        cursor.execute('''
+            CREATE TEMP TABLE importacao_alunos (
+                linha INTEGER PRIMARY KEY,
+                nome VARCHAR(255) NOT NULL,
+                cpf VARCHAR(14) NOT NULL
+            ) ON COMMIT DROP
+        ''')
+
+        vistos = {}
+        linhas = ler_planilha(arquivo, nome_arquivo)
+        while True:
+            lote = list(itertools.islice(linhas, TAMANHO_LOTE))
+            if not lote:
+                break
+            total += len(lote)
+            linhas_copy = _validar_lote(lote, vistos, erros)
+            if linhas_copy:
+                cursor.copy_expert("COPY importacao_alunos (linha, nome, cpf) FROM STDIN",
+                                   io.StringIO(''.join(linhas_copy)))
+
+        # CPFs já cadastrados: uma consulta para a planilha inteira (índice único de alunos.cpf)
+        cursor.execute('''
+            DELETE FROM importacao_alunos i
+            USING alunos a
+            WHERE a.cpf = i.cpf
+            RETURNING i.linha, i.nome, i.cpf, a.id, a.turma_id
+        ''')
+        for linha, nome, cpf, aluno_id, turma_aluno in cursor.fetchall():
+            erros.append(_erro(linha, nome, cpf, f"CPF já cadastrado (aluno {aluno_id}, turma {turma_aluno})"))
+
+        # ON CONFLICT cobre um cadastro feito por outra sessão durante a importação
+        cursor.execute('''
+            WITH gravados AS (
+                INSERT INTO alunos (nome, cpf, turma_id)
+                SELECT nome, cpf, %s FROM importacao_alunos ORDER BY linha
+                ON CONFLICT (cpf) DO NOTHING
+                RETURNING cpf
+            )
+            SELECT (SELECT COUNT(*) FROM gravados),
+                   (SELECT json_agg(json_build_array(i.linha, i.nome, i.cpf))
+                    FROM importacao_alunos i
+                    WHERE NOT EXISTS (SELECT 1 FROM gravados g WHERE g.cpf = i.cpf))
+        ''', (turma_id,))
+        importados, concorrentes = cursor.fetchone()
+        for linha, nome, cpf in concorrentes or []:
+            erros.append(_erro(linha, nome, cpf, "CPF já cadastrado"))
+
+        if simular:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    erros.sort(key=lambda erro: erro['linha'])
+    return {
+        "turma_id": turma_id,
+        "linhas": total,
+        "importados": importados,
+        "recusados": len(erros),
+        "simulacao": simular,
+        "duracao_s": round(time.perf_counter() - inicio, 3),
+        "erros": erros,
+    }
+
+
+def importar_planilha(arquivo, nome_arquivo, turma_id, simular=False):
+    """importar() com uma conexão do pool"""
+    with get_db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Erro na conexão com o banco de dados")
+        return importar(conn, arquivo, nome_arquivo, turma_id, simular)
+
+
+def main(argv):
+    if len(argv) < 3 or not argv[2].isdigit():
+        print(__doc__)
+        return 2
+    caminho, turma_id = argv[1], int(argv[2])
+    with open(caminho, 'rb') as arquivo:
+        try:
+            relatorio = importar_planilha(arquivo, caminho, turma_id, simular='--simular' in argv)
+        except ErroImportacao as e:
+            print(e)
+            return 1
+    for erro in relatorio['erros']:
+        print(f"linha {erro['linha']}: {erro['motivo']} ({erro['nome']}, {erro['cpf']})")
+    acao = "seriam importados" if relatorio['simulacao'] else "importados"
+    print(f"{relatorio['linhas']} linha(s): {relatorio['importados']} {acao}, "
+          f"{relatorio['recusados']} recusada(s) em {relatorio['duracao_s']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
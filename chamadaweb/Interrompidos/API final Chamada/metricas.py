@@ -0,0 +1,194 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (GET /metrics).
+
+Sem dependências externas: contadores, histogramas e medidores simples, com um
+lock cada, atualizados por ganchos nos pontos por onde tudo passa:
+
+- requisições Flask: sinais request_started / request_finished /
+  request_tearing_down (ver instrumentar(app));
+- consultas ao PostgreSQL: CursorMedido em db_pool.py, com o nome da função
+  que executou a consulta (ex.: registro_chamada.inserir_chamada_com_faltas);
+- chamadas à API REST do Supabase: supabase_client._registrar;
+- pool de conexões: espera por uma vaga, esgotamentos e conexões em uso.
+
+Os valores são por processo (cada worker do gunicorn expõe os seus).
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request, request_started, request_finished, request_tearing_down
+
+# Limites dos histogramas de latência, em segundos
+LIMITES_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_registro = []
+
+
+def _formatar_rotulos(nomes, valores):
+    if not nomes:
+        return ''
+    pares = []
+    for nome, valor in zip(nomes, valores):
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{nome}="{valor}"')
+    return '{' + ','.join(pares) + '}'
+
+
+def _formatar_numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+        _registro.append(self)
+
+    def inc(self, *valores, quantidade=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def exportar(self):
+        with self._lock:
+            itens = sorted(self._valores.items())
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        for valores, total in itens:
+            linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {_formatar_numero(total)}")
+        return linhas
+
+
+class Histograma:
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.limites = tuple(limites)
+        self._valores = {}
+        self._lock = threading.Lock()
+        _registro.append(self)
+
+    def observar(self, valor, *valores):
+        # Uma contagem por faixa; o acumulado (le=) só é montado na exportação
+        faixa = bisect_left(self.limites, valor)
+        with self._lock:
+            item = self._valores.get(valores)
+            if item is None:
+                item = self._valores[valores] = [[0] * (len(self.limites) + 1), 0.0]
+            item[0][faixa] += 1
+            item[1] += valor
+
+    def exportar(self):
+        with self._lock:
+            itens = sorted((valores, (list(contagens), soma))
+                           for valores, (contagens, soma) in self._valores.items())
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        nomes_faixa = self.rotulos + ('le',)
+        for valores, (contagens, soma) in itens:
+            acumulado = 0
+            for limite, contagem in zip(self.limites + ('+Inf',), contagens):
+                acumulado += contagem
+                le = limite if limite == '+Inf' else _formatar_numero(float(limite))
+                rotulos = _formatar_rotulos(nomes_faixa, valores + (le,))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, valores)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {acumulado}")
+        return linhas
+
+
+class Medidor:
+    """Valor instantâneo: ajustado com inc/dec ou lido de uma função na exportação"""
+
+    def __init__(self, nome, ajuda, leitura=None):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.leitura = leitura
+        self._valor = 0
+        self._lock = threading.Lock()
+        _registro.append(self)
+
+    def inc(self, quantidade=1):
+        with self._lock:
+            self._valor += quantidade
+
+    def dec(self, quantidade=1):
+        self.inc(-quantidade)
+
+    def exportar(self):
+        valor = self.leitura() if self.leitura else self._valor
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} gauge",
+                f"{self.nome} {_formatar_numero(valor)}"]
+
+
+def exportar_texto():
+    """Todas as métricas no formato de exposição texto (versão 0.0.4)"""
+    linhas = []
+    for metrica in _registro:
+        linhas.extend(metrica.exportar())
+    return '\n'.join(linhas) + '\n'
+
+
+# ================= MÉTRICAS ===================
+
+HTTP_REQUISICOES = Contador('chamada_http_requisicoes_total',
+                            'Requisições HTTP atendidas', ('metodo', 'rota', 'status'))
+HTTP_DURACAO = Histograma('chamada_http_duracao_segundos',
+                          'Tempo de resposta das requisições HTTP', ('metodo', 'rota'))
+HTTP_EM_ANDAMENTO = Medidor('chamada_http_em_andamento', 'Requisições HTTP em andamento')
+
+DB_DURACAO = Histograma('chamada_db_consulta_duracao_segundos',
+                        'Tempo das consultas ao PostgreSQL, pela função que as executou', ('consulta',))
+DB_ERROS = Contador('chamada_db_consulta_erros_total',
+                    'Consultas ao PostgreSQL que terminaram em erro', ('consulta',))
+
+SUPABASE_DURACAO = Histograma('chamada_supabase_duracao_segundos',
+                              'Tempo das chamadas à API REST do Supabase', ('metodo', 'tabela'))
+SUPABASE_RESPOSTAS = Contador('chamada_supabase_respostas_total',
+                              'Respostas da API REST do Supabase (status 0 = sem resposta)',
+                              ('metodo', 'tabela', 'status'))
+
+POOL_ESPERA = Histograma('chamada_db_pool_espera_segundos',
+                         'Espera por uma conexão livre no pool',
+                         limites=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5))
+POOL_ESGOTADO = Contador('chamada_db_pool_esgotado_total',
+                         'Pedidos de conexão recusados por tempo limite (pool esgotado)')
+
+
+# ================= FLASK ===================
+
+# Início da requisição guardado no environ do WSGI; o objeto request é resolvido
+# uma vez por gancho (cada acesso ao proxy do Flask custa ~1-2 µs)
+_CHAVE_INICIO = 'chamada.metricas_inicio'
+
+
+def _inicio_requisicao(sender, **extra):
+    request.environ[_CHAVE_INICIO] = time.perf_counter()
+    HTTP_EM_ANDAMENTO.inc()
+
+
+def _fim_requisicao(sender, response, **extra):
+    req = request._get_current_object()
+    inicio = req.environ.get(_CHAVE_INICIO)
+    if inicio is None:
+        return
+    # Em respostas em streaming (ex.: /backup/export) mede até o início do envio
+    rota = req.url_rule.rule if req.url_rule is not None else 'sem_rota'
+    HTTP_DURACAO.observar(time.perf_counter() - inicio, req.method, rota)
+    HTTP_REQUISICOES.inc(req.method, rota, str(response.status_code))
+
+
+def _encerrar_requisicao(sender, **extra):
+    # Sempre chamado, mesmo quando a view lança exceção sem resposta
+    if request.environ.pop(_CHAVE_INICIO, None) is not None:
+        HTTP_EM_ANDAMENTO.dec()
+
+
+def instrumentar(app):
+    """Liga as métricas HTTP aos sinais de requisição do app"""
+    request_started.connect(_inicio_requisicao, app)
+    request_finished.connect(_fim_requisicao, app)
+    request_tearing_down.connect(_encerrar_requisicao, app)
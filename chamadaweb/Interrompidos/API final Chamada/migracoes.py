@@ -0,0 +1,242 @@
+"""
+Migrações versionadas do banco de dados.
+
+Cada arquivo migrations/NNNN_nome.sql é aplicado uma única vez, em ordem, e
+registrado em schema_migrations com o checksum do conteúdo. Na inicialização,
+se todas as versões já estão aplicadas com o mesmo checksum, nada é executado
+além de uma consulta (caminho rápido). Alterar um arquivo já aplicado é erro:
+crie uma nova migração.
+
+Uso:
+    python migracoes.py            # aplica as migrações pendentes
+    python migracoes.py status     # lista versões aplicadas e pendentes
+    python migracoes.py verificar  # EXPLAIN das consultas críticas; falha se houver Seq Scan
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+
+from db_pool import get_db_connection
+
+PASTA_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Chave do pg_advisory_xact_lock: impede dois workers de migrarem ao mesmo tempo
+LOCK_MIGRACOES = 7210431
+
+
+class ErroMigracao(Exception):
+    """Migração aplicada difere do arquivo atual"""
+
+
+def listar_migracoes():
+    """Lê os arquivos de migração em ordem: [(versao, nome, sql, checksum)]"""
+    migracoes = []
+    for arquivo in sorted(os.listdir(PASTA_MIGRACOES)):
+        m = re.match(r'^(\d+)_(.+)\.sql$', arquivo)
+        if not m:
+            continue
+        with open(os.path.join(PASTA_MIGRACOES, arquivo), encoding='utf-8') as f:
+            sql = f.read()
+        checksum = hashlib.sha256(sql.encode('utf-8')).hexdigest()
+        migracoes.append((int(m.group(1)), m.group(2), sql, checksum))
+    return migracoes
+
+
+def _versoes_aplicadas(cursor):
+    cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return {}
+    cursor.execute("SELECT versao, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def _conferir_checksums(migracoes, aplicadas):
+    for versao, nome, _sql, checksum in migracoes:
+        if versao in aplicadas and aplicadas[versao] != checksum:
+            raise ErroMigracao(f"Migração {versao:04d}_{nome} foi alterada depois de aplicada")
+
+
+def aplicar_migracoes(conn):
+    """Aplica as migrações pendentes em uma transação; retorna quantas foram aplicadas"""
+    migracoes = listar_migracoes()
+    cursor = conn.cursor()
+
+    # Caminho rápido: tudo aplicado, só uma consulta de leitura
+    aplicadas = _versoes_aplicadas(cursor)
+    _conferir_checksums(migracoes, aplicadas)
+    if all(versao in aplicadas for versao, *_ in migracoes):
+        conn.rollback()
+        cursor.close()
+        return 0
+
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (LOCK_MIGRACOES,))
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            versao INTEGER PRIMARY KEY,
+            nome VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Outro worker pode ter migrado enquanto esperávamos o lock
+    aplicadas = _versoes_aplicadas(cursor)
+    _conferir_checksums(migracoes, aplicadas)
+
+    total = 0
+    for versao, nome, sql, checksum in migracoes:
+        if versao in aplicadas:
+            continue
+        print(f"Aplicando migração {versao:04d}_{nome}")
+        cursor.execute(sql)
+        cursor.execute('''
+            INSERT INTO schema_migrations (versao, nome, checksum)
+            VALUES (%s, %s, %s)
+        ''', (versao, nome, checksum))
+        total += 1
+
+    if total:
+        # Atualiza o cache de esquema do PostgREST (novas funções/colunas)
+        cursor.execute("NOTIFY pgrst, 'reload schema'")
+    conn.commit()
+    cursor.close()
+    return total
+
+
+# Consultas críticas das rotas, com parâmetros de exemplo
+CONSULTAS_CRITICAS = {
+    'turma_do_professor': ('''
+        SELECT t.nome, p.id, p.usuario_id
+        FROM turmas t
+        JOIN professores p ON t.professor_id = p.id
+        WHERE t.id = %s AND t.ativo = TRUE
+    ''', (1,)),
+    'professor_do_usuario': ('''
+        SELECT p.id, u.nome, c.nome
+        FROM professores p
+        JOIN unidades u ON p.unidade_id = u.id
+        JOIN cursos c ON p.curso_id = c.id
+        WHERE p.usuario_id = %s AND p.ativo = TRUE
+    ''', (1,)),
+    'turmas_do_professor': ('''
+        SELECT id, nome, created_at
+        FROM turmas
+        WHERE professor_id = %s AND ativo = TRUE
+        ORDER BY nome
+    ''', (1,)),
+    'alunos_da_turma': ('''
+        SELECT id, nome, cpf
+        FROM alunos
+        WHERE turma_id = %s AND ativo = TRUE
+        ORDER BY nome
+    ''', (1,)),
+    'pagina_de_alunos': ('''
+        SELECT id, nome, cpf
+        FROM alunos
+        WHERE nome > %s OR (nome = %s AND id > %s)
+        ORDER BY nome, id
+        LIMIT 101
+    ''', ('Maria', 'Maria', 1)),
+    'chamadas_da_turma': ('''
+        SELECT id, data_chamada
+        FROM chamadas
+        WHERE turma_id = %s AND data_chamada BETWEEN %s AND %s
+    ''', (1, '2025-01-01', '2025-06-30')),
+    'faltas_do_aluno': ('''
+        SELECT f.data_falta
+        FROM faltas f
+        WHERE f.aluno_id = %s
+    ''', (1,)),
+    'faltas_da_chamada': ('''
+        SELECT aluno_id FROM faltas WHERE chamada_id = %s
+    ''', (1,)),
+    'frequencia_da_turma': ('''
+        SELECT aluno_id, total_chamadas, total_faltas
+        FROM frequencia_alunos
+        WHERE turma_id = %s
+    ''', (1,)),
+    'alertas_da_unidade': ('''
+        SELECT aluno_id, turma_id, frequencia
+        FROM alertas_frequencia
+        WHERE unidade_id = %s
+    ''', (1,)),
+    'faltas_seguidas': ('''
+        SELECT aluno_id, turma_id, faltas_seguidas
+        FROM sequencias_faltas
+        WHERE faltas_seguidas >= %s
+    ''', (3,)),
+}
+
+
+def _nos_do_plano(plano):
+    yield plano
+    for filho in plano.get('Plans', []):
+        yield from _nos_do_plano(filho)
+
+
+def verificar_consultas(conn):
+    """Roda EXPLAIN nas consultas críticas; retorna {nome: [tabelas com Seq Scan]}.
+
+    Com enable_seqscan desligado o planejador só escolhe Seq Scan quando não
+    existe índice utilizável, então o resultado não depende do volume de dados.
+    """
+    problemas = {}
+    cursor = conn.cursor()
+    cursor.execute("SET LOCAL enable_seqscan = off")
+    for nome, (sql, params) in CONSULTAS_CRITICAS.items():
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plano = cursor.fetchone()[0]
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        tabelas = [no.get('Relation Name') for no in _nos_do_plano(plano[0]['Plan'])
+                   if no['Node Type'] == 'Seq Scan']
+        if tabelas:
+            problemas[nome] = tabelas
+    conn.rollback()
+    cursor.close()
+    return problemas
+
+
+def main(argv):
+    comando = argv[1] if len(argv) > 1 else 'aplicar'
+    with get_db_connection() as conn:
+        if not conn:
+            print("Erro na conexão com o banco de dados")
+            return 1
+
+        if comando == 'aplicar':
+            total = aplicar_migracoes(conn)
+            print(f"{total} migração(ões) aplicada(s)" if total else "Banco já está na versão atual")
+            return 0
+
+        if comando == 'status':
+            cursor = conn.cursor()
+            aplicadas = _versoes_aplicadas(cursor)
+            cursor.close()
+            conn.rollback()
+            for versao, nome, _sql, checksum in listar_migracoes():
+                if versao not in aplicadas:
+                    situacao = 'pendente'
+                elif aplicadas[versao] != checksum:
+                    situacao = 'ALTERADA'
+                else:
+                    situacao = 'aplicada'
+                print(f"{versao:04d}_{nome}: {situacao}")
+            return 0
+
+        if comando == 'verificar':
+            problemas = verificar_consultas(conn)
+            for nome in CONSULTAS_CRITICAS:
+                if nome in problemas:
+                    print(f"FALHA {nome}: Seq Scan em {', '.join(problemas[nome])}")
+                else:
+                    print(f"OK    {nome}")
+            return 1 if problemas else 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,84 @@
+-- Esquema inicial (antes criado pelo init_database() a cada inicialização)
+
+-- Tabela de usuários
+CREATE TABLE IF NOT EXISTS usuarios (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    senha VARCHAR(255) NOT NULL,
+    tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('master', 'professor')),
+    ativo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de unidades
+CREATE TABLE IF NOT EXISTS unidades (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    endereco TEXT,
+    ativo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de cursos
+CREATE TABLE IF NOT EXISTS cursos (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    unidade_id INTEGER REFERENCES unidades(id),
+    ativo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de professores
+CREATE TABLE IF NOT EXISTS professores (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    cpf VARCHAR(14) UNIQUE NOT NULL,
+    tipo VARCHAR(20) CHECK (tipo IN ('instrutor', 'monitor', 'pedagoga')),
+    unidade_id INTEGER REFERENCES unidades(id),
+    curso_id INTEGER REFERENCES cursos(id),
+    usuario_id INTEGER REFERENCES usuarios(id),
+    ativo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de turmas
+CREATE TABLE IF NOT EXISTS turmas (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    curso_id INTEGER REFERENCES cursos(id),
+    professor_id INTEGER REFERENCES professores(id),
+    ativo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de alunos
+CREATE TABLE IF NOT EXISTS alunos (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    cpf VARCHAR(14) UNIQUE NOT NULL,
+    turma_id INTEGER REFERENCES turmas(id),
+    ativo BOOLEAN DEFAULT TRUE,
+    editado BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de chamadas
+CREATE TABLE IF NOT EXISTS chamadas (
+    id SERIAL PRIMARY KEY,
+    turma_id INTEGER REFERENCES turmas(id),
+    data_chamada DATE NOT NULL,
+    hora_chamada TIME NOT NULL,
+    professor_id INTEGER REFERENCES professores(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de faltas
+CREATE TABLE IF NOT EXISTS faltas (
+    id SERIAL PRIMARY KEY,
+    chamada_id INTEGER REFERENCES chamadas(id),
+    aluno_id INTEGER REFERENCES alunos(id),
+    data_falta DATE NOT NULL,
+    hora_falta TIME NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,47 @@
+-- Função chamada pelo PostgREST (POST /rest/v1/rpc/registrar_chamada) a partir do
+-- routes_chamadas.py. Insere chamada e faltas na mesma transação e, quando o
+-- cliente envia uma chave de idempotência, uma nova tentativa devolve a chamada
+-- já gravada em vez de criar outra.
+
+ALTER TABLE chamadas ADD COLUMN IF NOT EXISTS chave_idempotencia TEXT UNIQUE;
+
+CREATE OR REPLACE FUNCTION registrar_chamada(
+    p_turma_id INTEGER,
+    p_data_chamada DATE,
+    p_hora_chamada TIME,
+    p_professor_id INTEGER,
+    p_faltas INTEGER[] DEFAULT '{}',
+    p_chave_idempotencia TEXT DEFAULT NULL
+)
+RETURNS TABLE (id_chamada INTEGER, faltas_registradas INTEGER, repetida BOOLEAN)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_chamada_id INTEGER;
+BEGIN
+    INSERT INTO chamadas (turma_id, data_chamada, hora_chamada, professor_id, chave_idempotencia)
+    VALUES (p_turma_id, p_data_chamada, p_hora_chamada, p_professor_id, p_chave_idempotencia)
+    ON CONFLICT (chave_idempotencia) DO NOTHING
+    RETURNING chamadas.id INTO v_chamada_id;
+
+    IF v_chamada_id IS NULL THEN
+        -- Repetição de uma chamada já registrada com a mesma chave
+        RETURN QUERY
+            SELECT c.id,
+                   (SELECT COUNT(*)::INTEGER FROM faltas f WHERE f.chamada_id = c.id),
+                   TRUE
+            FROM chamadas c
+            WHERE c.chave_idempotencia = p_chave_idempotencia;
+        RETURN;
+    END IF;
+
+    INSERT INTO faltas (chamada_id, aluno_id, data_falta, hora_falta)
+    SELECT DISTINCT v_chamada_id, f.aluno_id, p_data_chamada, p_hora_chamada
+    FROM unnest(COALESCE(p_faltas, '{}')) AS f(aluno_id);
+
+    RETURN QUERY
+        SELECT v_chamada_id,
+               (SELECT COUNT(DISTINCT a) FROM unnest(COALESCE(p_faltas, '{}')) AS a)::INTEGER,
+               FALSE;
+END;
+$$;
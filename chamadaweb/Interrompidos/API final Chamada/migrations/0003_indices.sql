@@ -0,0 +1,23 @@
+-- Índices nas chaves estrangeiras mais consultadas e índices parciais para os
+-- filtros "ativo = TRUE" usados pelas telas (ver consultas em migracoes.py)
+
+-- Faltas por aluno (frequência) e por chamada
+CREATE INDEX IF NOT EXISTS idx_faltas_aluno_id ON faltas (aluno_id);
+CREATE INDEX IF NOT EXISTS idx_faltas_chamada_id ON faltas (chamada_id);
+
+-- Chamadas de uma turma por período
+CREATE INDEX IF NOT EXISTS idx_chamadas_turma_data ON chamadas (turma_id, data_chamada);
+
+-- Alunos da turma (chaves estrangeiras e lista da chamada ordenada por nome)
+CREATE INDEX IF NOT EXISTS idx_alunos_turma_id ON alunos (turma_id);
+CREATE INDEX IF NOT EXISTS idx_alunos_turma_ativos ON alunos (turma_id, nome) WHERE ativo = TRUE;
+
+-- Turmas do professor
+CREATE INDEX IF NOT EXISTS idx_turmas_professor_id ON turmas (professor_id);
+CREATE INDEX IF NOT EXISTS idx_turmas_professor_ativas ON turmas (professor_id, nome) WHERE ativo = TRUE;
+
+-- Professor do usuário logado
+CREATE INDEX IF NOT EXISTS idx_professores_usuario_ativos ON professores (usuario_id) WHERE ativo = TRUE;
+
+-- Listagem de unidades ativas
+CREATE INDEX IF NOT EXISTS idx_unidades_ativas_nome ON unidades (nome) WHERE ativo = TRUE;
@@ -0,0 +1,2 @@
+-- Paginação por keyset (nome, id) da listagem e exportação de alunos
+CREATE INDEX IF NOT EXISTS idx_alunos_nome_id ON alunos (nome, id);
@@ -0,0 +1,126 @@
+-- Sincronização incremental para clientes offline (routes_sync.py)
+--
+-- Cada linha de alunos, turmas e chamadas guarda o id da transação que a
+-- gravou por último (txid_sync). O cursor entregue ao cliente é o xmin do
+-- snapshot da consulta: toda transação anterior a ele já estava visível, então
+-- nenhuma escrita que termine depois é perdida (no pior caso uma linha volta
+-- repetida na sincronização seguinte).
+
+CREATE OR REPLACE FUNCTION marcar_txid_sync() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.txid_sync := pg_current_xact_id();
+    RETURN NEW;
+END;
+$$;
+
+ALTER TABLE alunos ADD COLUMN IF NOT EXISTS txid_sync xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE turmas ADD COLUMN IF NOT EXISTS txid_sync xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE chamadas ADD COLUMN IF NOT EXISTS txid_sync xid8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE INDEX IF NOT EXISTS idx_alunos_txid_sync ON alunos (txid_sync);
+CREATE INDEX IF NOT EXISTS idx_turmas_txid_sync ON turmas (txid_sync);
+CREATE INDEX IF NOT EXISTS idx_chamadas_txid_sync ON chamadas (txid_sync);
+
+DROP TRIGGER IF EXISTS trg_alunos_txid_sync ON alunos;
+CREATE TRIGGER trg_alunos_txid_sync BEFORE INSERT OR UPDATE ON alunos
+    FOR EACH ROW EXECUTE FUNCTION marcar_txid_sync();
+DROP TRIGGER IF EXISTS trg_turmas_txid_sync ON turmas;
+CREATE TRIGGER trg_turmas_txid_sync BEFORE INSERT OR UPDATE ON turmas
+    FOR EACH ROW EXECUTE FUNCTION marcar_txid_sync();
+DROP TRIGGER IF EXISTS trg_chamadas_txid_sync ON chamadas;
+CREATE TRIGGER trg_chamadas_txid_sync BEFORE INSERT OR UPDATE ON chamadas
+    FOR EACH ROW EXECUTE FUNCTION marcar_txid_sync();
+
+-- Alterações desde o cursor (NULL = carga inicial). Linhas com ativo = FALSE
+-- voltam como {"id": ..., "removido": true}. p_professor_id restringe às turmas
+-- do professor.
+CREATE OR REPLACE FUNCTION sincronizar(p_cursor TEXT DEFAULT NULL, p_professor_id INTEGER DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH desde AS (
+        SELECT COALESCE(p_cursor, '0')::xid8 AS txid
+    ), turmas_visiveis AS (
+        SELECT t.*
+        FROM turmas t
+        WHERE p_professor_id IS NULL OR t.professor_id = p_professor_id
+    ), turmas_alteradas AS (
+        SELECT t.*
+        FROM turmas_visiveis t, desde
+        WHERE t.txid_sync >= desde.txid AND (t.ativo OR p_cursor IS NOT NULL)
+    ), alunos_alterados AS (
+        SELECT a.*
+        FROM alunos a, desde
+        WHERE a.txid_sync >= desde.txid
+          AND (a.ativo OR p_cursor IS NOT NULL)
+          AND (p_professor_id IS NULL OR a.turma_id IN (SELECT id FROM turmas_visiveis))
+    ), chamadas_alteradas AS (
+        SELECT c.*
+        FROM chamadas c, desde
+        WHERE c.txid_sync >= desde.txid
+          AND (p_professor_id IS NULL OR c.turma_id IN (SELECT id FROM turmas_visiveis))
+    )
+    SELECT jsonb_build_object(
+        'cursor', pg_snapshot_xmin(pg_current_snapshot())::text,
+        'turmas', COALESCE((
+            SELECT jsonb_agg(CASE WHEN t.ativo
+                THEN jsonb_build_object('id', t.id, 'nome', t.nome, 'curso_id', t.curso_id,
+                                        'professor_id', t.professor_id)
+                ELSE jsonb_build_object('id', t.id, 'removido', TRUE) END)
+            FROM turmas_alteradas t), '[]'::jsonb),
+        'alunos', COALESCE((
+            SELECT jsonb_agg(CASE WHEN a.ativo
+                THEN jsonb_build_object('id', a.id, 'nome', a.nome, 'cpf', a.cpf,
+                                        'turma_id', a.turma_id, 'editado', a.editado)
+                ELSE jsonb_build_object('id', a.id, 'removido', TRUE) END)
+            FROM alunos_alterados a), '[]'::jsonb),
+        'chamadas', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', c.id, 'turma_id', c.turma_id, 'data_chamada', c.data_chamada,
+                'hora_chamada', c.hora_chamada, 'professor_id', c.professor_id,
+                'chave_idempotencia', c.chave_idempotencia,
+                'faltas', COALESCE((SELECT jsonb_agg(f.aluno_id) FROM faltas f
+                                    WHERE f.chamada_id = c.id), '[]'::jsonb)))
+            FROM chamadas_alteradas c), '[]'::jsonb)
+    )
+$$;
+
+-- Lote de chamadas feitas offline. Cada item passa por registrar_chamada (com
+-- sua chave de idempotência) em uma subtransação própria: um item inválido
+-- volta com erro sem impedir a gravação dos demais.
+CREATE OR REPLACE FUNCTION registrar_chamadas_lote(p_chamadas JSONB)
+RETURNS TABLE (chave TEXT, id_chamada INTEGER, faltas_registradas INTEGER, repetida BOOLEAN, erro TEXT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    item JSONB;
+    r RECORD;
+BEGIN
+    FOR item IN SELECT * FROM jsonb_array_elements(p_chamadas) LOOP
+        chave := item->>'chave_idempotencia';
+        BEGIN
+            SELECT * INTO r FROM registrar_chamada(
+                (item->>'turma_id')::INTEGER,
+                (item->>'data_chamada')::DATE,
+                (item->>'hora_chamada')::TIME,
+                (item->>'professor_id')::INTEGER,
+                ARRAY(SELECT jsonb_array_elements_text(COALESCE(item->'faltas', '[]'::jsonb))::INTEGER),
+                item->>'chave_idempotencia'
+            );
+            id_chamada := r.id_chamada;
+            faltas_registradas := r.faltas_registradas;
+            repetida := r.repetida;
+            erro := NULL;
+        EXCEPTION WHEN OTHERS THEN
+            id_chamada := NULL;
+            faltas_registradas := NULL;
+            repetida := NULL;
+            erro := SQLERRM;
+        END;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$;
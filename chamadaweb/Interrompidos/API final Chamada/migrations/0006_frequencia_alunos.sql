@@ -0,0 +1,99 @@
+-- Resumo de frequência por (aluno, turma), mantido por triggers
+--
+-- Cada chamada inserida soma 1 em total_chamadas para os alunos que estão na
+-- turma naquele momento (ou seja, as chamadas da turma desde alunos.turma_desde);
+-- cada falta soma 1 em total_faltas e atualiza ultima_falta. Os triggers rodam
+-- na mesma transação do INSERT (fazer_chamada, registrar_chamada,
+-- registrar_chamadas_lote), então o resumo nunca fica à frente nem atrás das
+-- chamadas gravadas. Para conferir divergências ou recalcular do zero:
+-- python frequencia.py verificar|reconstruir
+
+CREATE TABLE IF NOT EXISTS frequencia_alunos (
+    aluno_id INTEGER NOT NULL REFERENCES alunos(id),
+    turma_id INTEGER NOT NULL REFERENCES turmas(id),
+    total_chamadas INTEGER NOT NULL DEFAULT 0,
+    total_faltas INTEGER NOT NULL DEFAULT 0,
+    ultima_falta DATE,
+    PRIMARY KEY (aluno_id, turma_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_frequencia_alunos_turma ON frequencia_alunos (turma_id);
+
+-- Desde quando o aluno está na turma atual
+ALTER TABLE alunos ADD COLUMN IF NOT EXISTS turma_desde TIMESTAMP;
+UPDATE alunos SET turma_desde = created_at WHERE turma_desde IS NULL;
+ALTER TABLE alunos ALTER COLUMN turma_desde SET DEFAULT CURRENT_TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION marcar_turma_desde() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.turma_id IS DISTINCT FROM OLD.turma_id THEN
+        NEW.turma_desde := CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_alunos_turma_desde ON alunos;
+CREATE TRIGGER trg_alunos_turma_desde BEFORE UPDATE OF turma_id ON alunos
+    FOR EACH ROW EXECUTE FUNCTION marcar_turma_desde();
+
+CREATE OR REPLACE FUNCTION frequencia_contar_chamadas() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO frequencia_alunos AS f (aluno_id, turma_id, total_chamadas)
+    SELECT a.id, n.turma_id, COUNT(*)
+    FROM novas_chamadas n
+    JOIN alunos a ON a.turma_id = n.turma_id
+    GROUP BY a.id, n.turma_id
+    ON CONFLICT (aluno_id, turma_id)
+    DO UPDATE SET total_chamadas = f.total_chamadas + EXCLUDED.total_chamadas;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION frequencia_contar_faltas() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO frequencia_alunos AS f (aluno_id, turma_id, total_faltas, ultima_falta)
+    SELECT n.aluno_id, c.turma_id, COUNT(*), MAX(n.data_falta)
+    FROM novas_faltas n
+    JOIN chamadas c ON c.id = n.chamada_id
+    GROUP BY n.aluno_id, c.turma_id
+    ON CONFLICT (aluno_id, turma_id)
+    DO UPDATE SET total_faltas = f.total_faltas + EXCLUDED.total_faltas,
+                  ultima_falta = GREATEST(f.ultima_falta, EXCLUDED.ultima_falta);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_frequencia_chamadas ON chamadas;
+CREATE TRIGGER trg_frequencia_chamadas AFTER INSERT ON chamadas
+    REFERENCING NEW TABLE AS novas_chamadas
+    FOR EACH STATEMENT EXECUTE FUNCTION frequencia_contar_chamadas();
+
+DROP TRIGGER IF EXISTS trg_frequencia_faltas ON faltas;
+CREATE TRIGGER trg_frequencia_faltas AFTER INSERT ON faltas
+    REFERENCING NEW TABLE AS novas_faltas
+    FOR EACH STATEMENT EXECUTE FUNCTION frequencia_contar_faltas();
+
+-- Carga inicial a partir do histórico (mesma regra de frequencia.py)
+INSERT INTO frequencia_alunos (aluno_id, turma_id, total_chamadas, total_faltas, ultima_falta)
+SELECT aluno_id, turma_id, SUM(total_chamadas), SUM(total_faltas), MAX(ultima_falta)
+FROM (
+    SELECT a.id AS aluno_id, c.turma_id, COUNT(*) AS total_chamadas,
+           0 AS total_faltas, NULL::DATE AS ultima_falta
+    FROM alunos a
+    JOIN chamadas c ON c.turma_id = a.turma_id AND c.created_at >= a.turma_desde
+    GROUP BY a.id, c.turma_id
+    UNION ALL
+    SELECT f.aluno_id, c.turma_id, 0, COUNT(*), MAX(f.data_falta)
+    FROM faltas f
+    JOIN chamadas c ON c.id = f.chamada_id
+    GROUP BY f.aluno_id, c.turma_id
+) parciais
+GROUP BY aluno_id, turma_id
+ON CONFLICT (aluno_id, turma_id) DO NOTHING;
@@ -0,0 +1,110 @@
+-- Alunos em risco por frequência baixa (routes_alertas.py)
+--
+-- Sempre que frequencia_alunos muda (ou seja, a cada chamada gravada), só as
+-- linhas alteradas são reavaliadas contra os parâmetros abaixo e o conjunto
+-- alertas_frequencia é atualizado na mesma transação. As listagens por turma e
+-- por unidade leem esse conjunto direto, sem recalcular a partir de faltas.
+--
+-- Para mudar o limite:
+--     UPDATE parametros SET valor = 70 WHERE chave = 'frequencia_minima';
+--     SELECT recalcular_alertas();
+
+CREATE TABLE IF NOT EXISTS parametros (
+    chave VARCHAR(100) PRIMARY KEY,
+    valor NUMERIC NOT NULL
+);
+
+INSERT INTO parametros (chave, valor) VALUES
+    ('frequencia_minima', 75),  -- percentual mínimo de presença
+    ('chamadas_minimas', 4)     -- antes disso a frequência ainda não é significativa
+ON CONFLICT (chave) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS alertas_frequencia (
+    aluno_id INTEGER NOT NULL REFERENCES alunos(id),
+    turma_id INTEGER NOT NULL REFERENCES turmas(id),
+    unidade_id INTEGER REFERENCES unidades(id),
+    frequencia NUMERIC(5, 1) NOT NULL,
+    total_chamadas INTEGER NOT NULL,
+    total_faltas INTEGER NOT NULL,
+    desde TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (aluno_id, turma_id),
+    FOREIGN KEY (aluno_id, turma_id) REFERENCES frequencia_alunos (aluno_id, turma_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_alertas_frequencia_turma ON alertas_frequencia (turma_id);
+CREATE INDEX IF NOT EXISTS idx_alertas_frequencia_unidade ON alertas_frequencia (unidade_id);
+
+-- Reavalia as linhas de frequencia_alunos informadas (NULL = todas)
+CREATE OR REPLACE FUNCTION avaliar_alertas(p_aluno_ids INTEGER[], p_turma_ids INTEGER[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_minima NUMERIC := (SELECT valor FROM parametros WHERE chave = 'frequencia_minima');
+    v_chamadas_minimas NUMERIC := (SELECT valor FROM parametros WHERE chave = 'chamadas_minimas');
+BEGIN
+    WITH situacao AS (
+        SELECT f.aluno_id, f.turma_id
+        FROM frequencia_alunos f
+        WHERE (p_aluno_ids IS NULL
+               OR (f.aluno_id, f.turma_id) IN (SELECT * FROM unnest(p_aluno_ids, p_turma_ids)))
+          AND (f.total_chamadas < v_chamadas_minimas
+               OR 100.0 * (f.total_chamadas - f.total_faltas) / f.total_chamadas >= v_minima)
+    )
+    DELETE FROM alertas_frequencia a
+    USING situacao s
+    WHERE a.aluno_id = s.aluno_id AND a.turma_id = s.turma_id;
+
+    INSERT INTO alertas_frequencia AS a (aluno_id, turma_id, unidade_id, frequencia, total_chamadas, total_faltas)
+    SELECT f.aluno_id, f.turma_id, COALESCE(c.unidade_id, p.unidade_id),
+           round(100.0 * (f.total_chamadas - f.total_faltas) / f.total_chamadas, 1),
+           f.total_chamadas, f.total_faltas
+    FROM frequencia_alunos f
+    JOIN turmas t ON t.id = f.turma_id
+    LEFT JOIN cursos c ON c.id = t.curso_id
+    LEFT JOIN professores p ON p.id = t.professor_id
+    WHERE (p_aluno_ids IS NULL
+           OR (f.aluno_id, f.turma_id) IN (SELECT * FROM unnest(p_aluno_ids, p_turma_ids)))
+      AND f.total_chamadas >= v_chamadas_minimas
+      AND 100.0 * (f.total_chamadas - f.total_faltas) / f.total_chamadas < v_minima
+    ON CONFLICT (aluno_id, turma_id) DO UPDATE
+        SET frequencia = EXCLUDED.frequencia,
+            total_chamadas = EXCLUDED.total_chamadas,
+            total_faltas = EXCLUDED.total_faltas;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION recalcular_alertas() RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM alertas_frequencia;
+    SELECT avaliar_alertas(NULL, NULL);
+$$;
+
+CREATE OR REPLACE FUNCTION alertas_frequencia_alterada() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_aluno_ids INTEGER[];
+    v_turma_ids INTEGER[];
+BEGIN
+    SELECT array_agg(aluno_id), array_agg(turma_id) INTO v_aluno_ids, v_turma_ids
+    FROM linhas_alteradas;
+    IF v_aluno_ids IS NOT NULL THEN
+        PERFORM avaliar_alertas(v_aluno_ids, v_turma_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_alertas_frequencia_insert ON frequencia_alunos;
+CREATE TRIGGER trg_alertas_frequencia_insert AFTER INSERT ON frequencia_alunos
+    REFERENCING NEW TABLE AS linhas_alteradas
+    FOR EACH STATEMENT EXECUTE FUNCTION alertas_frequencia_alterada();
+
+DROP TRIGGER IF EXISTS trg_alertas_frequencia_update ON frequencia_alunos;
+CREATE TRIGGER trg_alertas_frequencia_update AFTER UPDATE ON frequencia_alunos
+    REFERENCING NEW TABLE AS linhas_alteradas
+    FOR EACH STATEMENT EXECUTE FUNCTION alertas_frequencia_alterada();
+
+SELECT recalcular_alertas();
@@ -0,0 +1,95 @@
+-- Faltas consecutivas por (aluno, turma): quantas das chamadas mais recentes da
+-- turma atual do aluno, em ordem de data/hora, foram faltas seguidas.
+--
+-- A manutenção é um constraint trigger adiado em chamadas: roda no COMMIT,
+-- quando as faltas da chamada já estão todas gravadas (no fazer_chamada elas
+-- entram no mesmo comando que a chamada). Se chegar uma chamada mais antiga
+-- que a última da turma (chamada feita offline e sincronizada depois), a
+-- turma é recalculada pelo histórico com funções de janela.
+
+CREATE TABLE IF NOT EXISTS sequencias_faltas (
+    aluno_id INTEGER NOT NULL REFERENCES alunos(id),
+    turma_id INTEGER NOT NULL REFERENCES turmas(id),
+    faltas_seguidas INTEGER NOT NULL DEFAULT 0,
+    faltando_desde DATE,
+    ultima_chamada_id INTEGER,  -- chamada mais recente já contabilizada
+    PRIMARY KEY (aluno_id, turma_id)
+);
+
+-- Consulta "sequência >= K" em todas as unidades
+CREATE INDEX IF NOT EXISTS idx_sequencias_faltas_seguidas ON sequencias_faltas (faltas_seguidas)
+    WHERE faltas_seguidas > 0;
+
+-- Recalcula pelo histórico as sequências de uma turma (NULL = todas). Uma só
+-- passada de janela dá o tamanho da sequência e o início dela, sem subconsulta
+-- correlacionada por aluno (que teria custo quadrático com o histórico).
+CREATE OR REPLACE FUNCTION recalcular_sequencias(p_turma_id INTEGER DEFAULT NULL)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM sequencias_faltas WHERE p_turma_id IS NULL OR turma_id = p_turma_id;
+
+    INSERT INTO sequencias_faltas (aluno_id, turma_id, faltas_seguidas, faltando_desde, ultima_chamada_id)
+    WITH participacao AS (
+        SELECT a.id AS aluno_id, c.turma_id, c.id AS chamada_id, c.data_chamada,
+               f.id IS NOT NULL AS faltou,
+               ROW_NUMBER() OVER (PARTITION BY a.id, c.turma_id
+                                  ORDER BY c.data_chamada DESC, c.hora_chamada DESC, c.id DESC) AS recente
+        FROM alunos a
+        JOIN chamadas c ON c.turma_id = a.turma_id AND c.created_at >= a.turma_desde
+        LEFT JOIN faltas f ON f.chamada_id = c.id AND f.aluno_id = a.id
+        WHERE p_turma_id IS NULL OR a.turma_id = p_turma_id
+    ), marcada AS (
+        -- A sequência termina na presença mais recente (ou cobre tudo, se não houve)
+        SELECT *, MIN(recente) FILTER (WHERE NOT faltou)
+                      OVER (PARTITION BY aluno_id, turma_id) AS presenca_recente
+        FROM participacao
+    )
+    SELECT aluno_id, turma_id,
+           COUNT(*) FILTER (WHERE presenca_recente IS NULL OR recente < presenca_recente),
+           MIN(data_chamada) FILTER (WHERE presenca_recente IS NULL OR recente < presenca_recente),
+           MIN(chamada_id) FILTER (WHERE recente = 1)
+    FROM marcada
+    GROUP BY aluno_id, turma_id;
+$$;
+
+CREATE OR REPLACE FUNCTION sequencias_chamada_registrada() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM chamadas c
+        WHERE c.turma_id = NEW.turma_id
+          AND (c.data_chamada, c.hora_chamada, c.id) > (NEW.data_chamada, NEW.hora_chamada, NEW.id)
+    ) THEN
+        PERFORM recalcular_sequencias(NEW.turma_id);
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO sequencias_faltas AS s (aluno_id, turma_id, faltas_seguidas, faltando_desde, ultima_chamada_id)
+    SELECT a.id, NEW.turma_id,
+           CASE WHEN f.id IS NULL THEN 0 ELSE 1 END,
+           CASE WHEN f.id IS NULL THEN NULL ELSE NEW.data_chamada END,
+           NEW.id
+    FROM alunos a
+    LEFT JOIN faltas f ON f.chamada_id = NEW.id AND f.aluno_id = a.id
+    WHERE a.turma_id = NEW.turma_id
+    ON CONFLICT (aluno_id, turma_id) DO UPDATE
+        SET faltas_seguidas = CASE WHEN EXCLUDED.faltas_seguidas = 0 THEN 0
+                                   ELSE s.faltas_seguidas + 1 END,
+            faltando_desde = CASE WHEN EXCLUDED.faltas_seguidas = 0 THEN NULL
+                                  ELSE COALESCE(s.faltando_desde, EXCLUDED.faltando_desde) END,
+            ultima_chamada_id = NEW.id
+        -- Já contabilizada por um recálculo da turma na mesma transação
+        WHERE s.ultima_chamada_id IS DISTINCT FROM NEW.id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sequencias_faltas ON chamadas;
+CREATE CONSTRAINT TRIGGER trg_sequencias_faltas AFTER INSERT ON chamadas
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION sequencias_chamada_registrada();
+
+-- Carga inicial a partir do histórico
+SELECT recalcular_sequencias();
@@ -0,0 +1,2 @@
+-- Falta justificada (atestado etc.), separada das demais no relatório semestral
+ALTER TABLE faltas ADD COLUMN IF NOT EXISTS justificada BOOLEAN NOT NULL DEFAULT FALSE;
@@ -0,0 +1,27 @@
+-- Avisa pelo canal tabelas_alteradas quando unidades, cursos ou professores
+-- mudam, com o nome da tabela como payload.
+--
+-- Cada worker guarda essas tabelas em memória (referencias.py) e escuta o
+-- canal para descartar a cópia quando a escrita vem de outro processo ou direto
+-- do banco. Os triggers são por comando: um INSERT de mil linhas gera um aviso
+-- só, e avisos iguais na mesma transação já são agrupados pelo PostgreSQL.
+CREATE OR REPLACE FUNCTION notificar_tabela_alterada() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM pg_notify('tabelas_alteradas', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_unidades_notificar ON unidades;
+CREATE TRIGGER trg_unidades_notificar AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON unidades
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_tabela_alterada();
+
+DROP TRIGGER IF EXISTS trg_cursos_notificar ON cursos;
+CREATE TRIGGER trg_cursos_notificar AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cursos
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_tabela_alterada();
+
+DROP TRIGGER IF EXISTS trg_professores_notificar ON professores;
+CREATE TRIGGER trg_professores_notificar AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON professores
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_tabela_alterada();
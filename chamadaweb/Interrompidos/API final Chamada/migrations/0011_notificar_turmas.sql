@@ -0,0 +1,6 @@
+-- Turmas também avisam pelo canal tabelas_alteradas (ver 0010): criar, desativar
+-- ou trocar o professor de uma turma descarta o cache de autorização dos
+-- workers (autorizacao.py).
+DROP TRIGGER IF EXISTS trg_turmas_notificar ON turmas;
+CREATE TRIGGER trg_turmas_notificar AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON turmas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_tabela_alterada();
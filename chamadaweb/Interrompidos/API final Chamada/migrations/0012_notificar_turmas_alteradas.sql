@@ -0,0 +1,93 @@
+-- Alunos, chamadas e faltas também avisam pelo canal tabelas_alteradas (ver
+-- 0010), com a turma como escopo: payload 'alunos:7' para uma escrita nos
+-- alunos da turma 7, ou só o nome da tabela quando a linha não tem turma.
+--
+-- As versões usadas nos ETags (cache.py) passam a enxergar as escritas de
+-- outros workers e as feitas fora da aplicação (Next.js, RPC, gerar_dados,
+-- restauração). Os triggers são por comando, com as linhas alteradas nas
+-- tabelas de transição: um aviso por turma afetada, não por linha.
+CREATE OR REPLACE FUNCTION notificar_turmas_alteradas() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    turmas INTEGER[] := '{}';
+    turma INTEGER;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('tabelas_alteradas', TG_TABLE_NAME);
+        RETURN NULL;
+    END IF;
+
+    IF TG_TABLE_NAME = 'faltas' THEN
+        -- Faltas não têm turma_id: a turma vem da chamada (NULL se já foi apagada)
+        IF TG_OP <> 'DELETE' THEN
+            turmas := ARRAY(SELECT DISTINCT c.turma_id FROM novas f LEFT JOIN chamadas c ON c.id = f.chamada_id);
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            turmas := turmas || ARRAY(SELECT DISTINCT c.turma_id FROM antigas f LEFT JOIN chamadas c ON c.id = f.chamada_id);
+        END IF;
+    ELSE
+        -- Num UPDATE que troca a turma, avisam a turma antiga e a nova
+        IF TG_OP <> 'DELETE' THEN
+            turmas := ARRAY(SELECT DISTINCT turma_id FROM novas);
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            turmas := turmas || ARRAY(SELECT DISTINCT turma_id FROM antigas);
+        END IF;
+    END IF;
+
+    FOR turma IN SELECT DISTINCT t FROM unnest(turmas) AS t LOOP
+        PERFORM pg_notify('tabelas_alteradas', TG_TABLE_NAME || COALESCE(':' || turma, ''));
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+
+-- Tabelas de transição exigem um trigger por evento
+DROP TRIGGER IF EXISTS trg_alunos_notificar_insert ON alunos;
+CREATE TRIGGER trg_alunos_notificar_insert AFTER INSERT ON alunos
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_alunos_notificar_update ON alunos;
+CREATE TRIGGER trg_alunos_notificar_update AFTER UPDATE ON alunos
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_alunos_notificar_delete ON alunos;
+CREATE TRIGGER trg_alunos_notificar_delete AFTER DELETE ON alunos
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_alunos_notificar_truncate ON alunos;
+CREATE TRIGGER trg_alunos_notificar_truncate AFTER TRUNCATE ON alunos
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+
+DROP TRIGGER IF EXISTS trg_chamadas_notificar_insert ON chamadas;
+CREATE TRIGGER trg_chamadas_notificar_insert AFTER INSERT ON chamadas
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_chamadas_notificar_update ON chamadas;
+CREATE TRIGGER trg_chamadas_notificar_update AFTER UPDATE ON chamadas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_chamadas_notificar_delete ON chamadas;
+CREATE TRIGGER trg_chamadas_notificar_delete AFTER DELETE ON chamadas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_chamadas_notificar_truncate ON chamadas;
+CREATE TRIGGER trg_chamadas_notificar_truncate AFTER TRUNCATE ON chamadas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+
+DROP TRIGGER IF EXISTS trg_faltas_notificar_insert ON faltas;
+CREATE TRIGGER trg_faltas_notificar_insert AFTER INSERT ON faltas
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_faltas_notificar_update ON faltas;
+CREATE TRIGGER trg_faltas_notificar_update AFTER UPDATE ON faltas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_faltas_notificar_delete ON faltas;
+CREATE TRIGGER trg_faltas_notificar_delete AFTER DELETE ON faltas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
+DROP TRIGGER IF EXISTS trg_faltas_notificar_truncate ON faltas;
+CREATE TRIGGER trg_faltas_notificar_truncate AFTER TRUNCATE ON faltas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_turmas_alteradas();
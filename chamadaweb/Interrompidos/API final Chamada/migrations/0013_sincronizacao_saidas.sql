@@ -0,0 +1,155 @@
+-- Remoções na sincronização incremental (ver 0005) para linhas que saem do
+-- conjunto visível sem ficar com ativo = FALSE: turma passada a outro
+-- professor, aluno transferido de turma, linha apagada.
+--
+-- sync_saidas registra, na transação da mudança, quem deixou de ver a linha:
+-- professor_id do dono anterior, ou NULL quando a linha some para todos
+-- (DELETE). sincronizar devolve essas linhas como {"id": ..., "removido": true}.
+
+CREATE TABLE IF NOT EXISTS sync_saidas (
+    id BIGSERIAL PRIMARY KEY,
+    tabela TEXT NOT NULL,
+    linha_id INTEGER NOT NULL,
+    professor_id INTEGER,
+    txid_sync xid8 NOT NULL DEFAULT pg_current_xact_id()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_saidas_txid_sync ON sync_saidas (txid_sync);
+
+CREATE OR REPLACE FUNCTION registrar_saida_sync() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO sync_saidas (tabela, linha_id, professor_id) VALUES (TG_TABLE_NAME, OLD.id, NULL);
+    ELSIF TG_TABLE_NAME = 'turmas' THEN
+        INSERT INTO sync_saidas (tabela, linha_id, professor_id) VALUES ('turmas', OLD.id, OLD.professor_id);
+    ELSE
+        -- Aluno transferido: sai para o professor da turma anterior
+        INSERT INTO sync_saidas (tabela, linha_id, professor_id)
+        SELECT 'alunos', OLD.id, t.professor_id FROM turmas t
+        WHERE t.id = OLD.turma_id AND t.professor_id IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_turmas_saida_sync ON turmas;
+CREATE TRIGGER trg_turmas_saida_sync AFTER UPDATE OF professor_id ON turmas
+    FOR EACH ROW WHEN (OLD.professor_id IS DISTINCT FROM NEW.professor_id AND OLD.professor_id IS NOT NULL)
+    EXECUTE FUNCTION registrar_saida_sync();
+DROP TRIGGER IF EXISTS trg_alunos_saida_sync ON alunos;
+CREATE TRIGGER trg_alunos_saida_sync AFTER UPDATE OF turma_id ON alunos
+    FOR EACH ROW WHEN (OLD.turma_id IS DISTINCT FROM NEW.turma_id AND OLD.turma_id IS NOT NULL)
+    EXECUTE FUNCTION registrar_saida_sync();
+
+DROP TRIGGER IF EXISTS trg_turmas_apagada_sync ON turmas;
+CREATE TRIGGER trg_turmas_apagada_sync AFTER DELETE ON turmas
+    FOR EACH ROW EXECUTE FUNCTION registrar_saida_sync();
+DROP TRIGGER IF EXISTS trg_alunos_apagado_sync ON alunos;
+CREATE TRIGGER trg_alunos_apagado_sync AFTER DELETE ON alunos
+    FOR EACH ROW EXECUTE FUNCTION registrar_saida_sync();
+DROP TRIGGER IF EXISTS trg_chamadas_apagada_sync ON chamadas;
+CREATE TRIGGER trg_chamadas_apagada_sync AFTER DELETE ON chamadas
+    FOR EACH ROW EXECUTE FUNCTION registrar_saida_sync();
+
+-- Como em 0005, mais:
+--   * remoções de sync_saidas que valem para o professor (ou para todos), exceto
+--     de linhas que voltaram a ser visíveis;
+--   * alunos e chamadas de uma turma que saiu do professor também voltam
+--     como removidos;
+--   * alunos e chamadas de turmas alteradas desde o cursor voltam inteiros, já
+--     que a turma pode ter acabado de passar para o professor.
+CREATE OR REPLACE FUNCTION sincronizar(p_cursor TEXT DEFAULT NULL, p_professor_id INTEGER DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH desde AS (
+        SELECT COALESCE(p_cursor, '0')::xid8 AS txid
+    ), turmas_visiveis AS (
+        SELECT t.*
+        FROM turmas t
+        WHERE p_professor_id IS NULL OR t.professor_id = p_professor_id
+    ), turmas_alteradas AS (
+        SELECT t.*
+        FROM turmas_visiveis t, desde
+        WHERE t.txid_sync >= desde.txid AND (t.ativo OR p_cursor IS NOT NULL)
+    ), alunos_alterados AS (
+        -- UNION em vez de OR: cada lado usa o seu índice (txid_sync, turma_id)
+        SELECT a.*
+        FROM alunos a, desde
+        WHERE a.txid_sync >= desde.txid
+          AND (a.ativo OR p_cursor IS NOT NULL)
+          AND (p_professor_id IS NULL OR a.turma_id IN (SELECT id FROM turmas_visiveis))
+        UNION
+        SELECT a.*
+        FROM alunos a
+        WHERE p_cursor IS NOT NULL AND a.turma_id IN (SELECT id FROM turmas_alteradas)
+    ), chamadas_alteradas AS (
+        SELECT c.*
+        FROM chamadas c, desde
+        WHERE c.txid_sync >= desde.txid
+          AND (p_professor_id IS NULL OR c.turma_id IN (SELECT id FROM turmas_visiveis))
+        UNION
+        SELECT c.*
+        FROM chamadas c
+        WHERE p_cursor IS NOT NULL AND c.turma_id IN (SELECT id FROM turmas_alteradas)
+    ), saidas AS (
+        SELECT DISTINCT s.tabela, s.linha_id
+        FROM sync_saidas s, desde
+        WHERE p_cursor IS NOT NULL
+          AND s.txid_sync >= desde.txid
+          AND (s.professor_id IS NULL OR s.professor_id = p_professor_id)
+    ), turmas_removidas AS (
+        SELECT s.linha_id AS id
+        FROM saidas s
+        WHERE s.tabela = 'turmas' AND s.linha_id NOT IN (SELECT id FROM turmas_visiveis)
+    ), alunos_removidos AS (
+        SELECT s.linha_id AS id
+        FROM saidas s
+        WHERE s.tabela = 'alunos'
+        UNION
+        SELECT a.id FROM alunos a WHERE a.turma_id IN (SELECT id FROM turmas_removidas)
+    ), chamadas_removidas AS (
+        SELECT s.linha_id AS id
+        FROM saidas s
+        WHERE s.tabela = 'chamadas'
+        UNION
+        SELECT c.id FROM chamadas c WHERE c.turma_id IN (SELECT id FROM turmas_removidas)
+    )
+    SELECT jsonb_build_object(
+        'cursor', pg_snapshot_xmin(pg_current_snapshot())::text,
+        'turmas', COALESCE((
+            SELECT jsonb_agg(CASE WHEN t.ativo
+                THEN jsonb_build_object('id', t.id, 'nome', t.nome, 'curso_id', t.curso_id,
+                                        'professor_id', t.professor_id)
+                ELSE jsonb_build_object('id', t.id, 'removido', TRUE) END)
+            FROM turmas_alteradas t), '[]'::jsonb)
+            || COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('id', r.id, 'removido', TRUE))
+            FROM turmas_removidas r), '[]'::jsonb),
+        'alunos', COALESCE((
+            SELECT jsonb_agg(CASE WHEN a.ativo
+                THEN jsonb_build_object('id', a.id, 'nome', a.nome, 'cpf', a.cpf,
+                                        'turma_id', a.turma_id, 'editado', a.editado)
+                ELSE jsonb_build_object('id', a.id, 'removido', TRUE) END)
+            FROM alunos_alterados a), '[]'::jsonb)
+            || COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('id', r.id, 'removido', TRUE))
+            FROM alunos_removidos r
+            WHERE r.id NOT IN (SELECT id FROM alunos_alterados)), '[]'::jsonb),
+        'chamadas', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', c.id, 'turma_id', c.turma_id, 'data_chamada', c.data_chamada,
+                'hora_chamada', c.hora_chamada, 'professor_id', c.professor_id,
+                'chave_idempotencia', c.chave_idempotencia,
+                'faltas', COALESCE((SELECT jsonb_agg(f.aluno_id) FROM faltas f
+                                    WHERE f.chamada_id = c.id), '[]'::jsonb)))
+            FROM chamadas_alteradas c), '[]'::jsonb)
+            || COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('id', r.id, 'removido', TRUE))
+            FROM chamadas_removidas r
+            WHERE r.id NOT IN (SELECT id FROM chamadas_alteradas)), '[]'::jsonb)
+    )
+$$;
@@ -0,0 +1,147 @@
+-- frequencia_alunos (0006) e sequencias_faltas (0008) também acompanham
+-- DELETE e UPDATE de chamadas e faltas: chamada apagada, falta removida ou
+-- passada a outro aluno/chamada, chamada movida de turma ou de data.
+--
+-- Mudanças assim são raras, então em vez de decrementar os contadores as
+-- linhas (aluno, turma) afetadas são recontadas pela regra de frequencia.py,
+-- na mesma transação; as sequências das turmas afetadas são recalculadas.
+-- Justificar uma falta (0009) não muda nenhuma contagem e não dispara nada.
+
+-- Reconta as linhas (aluno, turma) informadas. Como em frequencia.py, o
+-- total_chamadas de uma turma anterior do aluno não é recuperável do
+-- histórico e fica como está.
+CREATE OR REPLACE FUNCTION frequencia_recontar(p_aluno_ids INTEGER[], p_turma_ids INTEGER[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    WITH chaves AS (
+        SELECT DISTINCT k.aluno_id, k.turma_id
+        FROM unnest(p_aluno_ids, p_turma_ids) AS k(aluno_id, turma_id)
+    ), recontagem AS (
+        SELECT k.aluno_id, k.turma_id, g.aluno_id IS NOT NULL AS gravada,
+               CASE WHEN a.turma_id = k.turma_id
+                    THEN (SELECT COUNT(*) FROM chamadas c
+                          WHERE c.turma_id = k.turma_id AND c.created_at >= a.turma_desde)
+                    ELSE COALESCE(g.total_chamadas, 0) END AS total_chamadas,
+               fr.total_faltas, fr.ultima_falta
+        FROM chaves k
+        JOIN alunos a ON a.id = k.aluno_id
+        LEFT JOIN frequencia_alunos g ON g.aluno_id = k.aluno_id AND g.turma_id = k.turma_id
+        CROSS JOIN LATERAL (
+            SELECT COUNT(*) AS total_faltas, MAX(f.data_falta) AS ultima_falta
+            FROM faltas f
+            JOIN chamadas c ON c.id = f.chamada_id
+            WHERE f.aluno_id = k.aluno_id AND c.turma_id = k.turma_id
+        ) fr
+    )
+    INSERT INTO frequencia_alunos AS f (aluno_id, turma_id, total_chamadas, total_faltas, ultima_falta)
+    SELECT aluno_id, turma_id, total_chamadas, total_faltas, ultima_falta
+    FROM recontagem
+    WHERE gravada OR total_chamadas > 0 OR total_faltas > 0
+    ON CONFLICT (aluno_id, turma_id) DO UPDATE
+        SET total_chamadas = EXCLUDED.total_chamadas,
+            total_faltas = EXCLUDED.total_faltas,
+            ultima_falta = EXCLUDED.ultima_falta
+        WHERE (f.total_chamadas, f.total_faltas, f.ultima_falta)
+              IS DISTINCT FROM (EXCLUDED.total_chamadas, EXCLUDED.total_faltas, EXCLUDED.ultima_falta);
+$$;
+
+CREATE OR REPLACE FUNCTION frequencia_faltas_removidas() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_aluno_ids INTEGER[];
+    v_turma_ids INTEGER[];
+    v_turma INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT array_agg(f.aluno_id), array_agg(c.turma_id) INTO v_aluno_ids, v_turma_ids
+        FROM antigas f
+        JOIN chamadas c ON c.id = f.chamada_id;
+    ELSE
+        -- A linha antiga e a nova, só das faltas que mudaram de chamada, aluno ou data
+        SELECT array_agg(k.aluno_id), array_agg(c.turma_id) INTO v_aluno_ids, v_turma_ids
+        FROM antigas o
+        JOIN novas n ON n.id = o.id
+        CROSS JOIN LATERAL (VALUES (o.aluno_id, o.chamada_id), (n.aluno_id, n.chamada_id)) AS k(aluno_id, chamada_id)
+        JOIN chamadas c ON c.id = k.chamada_id
+        WHERE (o.chamada_id, o.aluno_id, o.data_falta) IS DISTINCT FROM (n.chamada_id, n.aluno_id, n.data_falta);
+    END IF;
+
+    IF v_aluno_ids IS NOT NULL THEN
+        PERFORM frequencia_recontar(v_aluno_ids, v_turma_ids);
+        -- recalcular_sequencias(NULL) recalcularia todas as turmas
+        FOR v_turma IN SELECT DISTINCT t FROM unnest(v_turma_ids) AS t WHERE t IS NOT NULL LOOP
+            PERFORM recalcular_sequencias(v_turma);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION frequencia_chamadas_removidas() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_turmas INTEGER[];
+    v_chamadas INTEGER[];
+    v_aluno_ids INTEGER[];
+    v_turma_ids INTEGER[];
+    v_turma INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        -- As faltas da chamada já saíram antes (chave estrangeira) e foram recontadas
+        SELECT array_agg(DISTINCT turma_id) FILTER (WHERE turma_id IS NOT NULL) INTO v_turmas
+        FROM antigas;
+    ELSE
+        SELECT array_agg(DISTINCT t.turma_id) FILTER (WHERE t.turma_id IS NOT NULL), array_agg(DISTINCT n.id)
+        INTO v_turmas, v_chamadas
+        FROM antigas o
+        JOIN novas n ON n.id = o.id
+        CROSS JOIN LATERAL (VALUES (o.turma_id), (n.turma_id)) AS t(turma_id)
+        WHERE (o.turma_id, o.created_at, o.data_chamada, o.hora_chamada)
+              IS DISTINCT FROM (n.turma_id, n.created_at, n.data_chamada, n.hora_chamada);
+    END IF;
+
+    IF v_turmas IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Alunos atuais das turmas, mais as faltas das chamadas movidas (na turma antiga e na nova)
+    SELECT array_agg(k.aluno_id), array_agg(k.turma_id) INTO v_aluno_ids, v_turma_ids
+    FROM (
+        SELECT a.id AS aluno_id, a.turma_id FROM alunos a WHERE a.turma_id = ANY (v_turmas)
+        UNION
+        SELECT f.aluno_id, t.turma_id FROM faltas f, unnest(v_turmas) AS t(turma_id)
+        WHERE f.chamada_id = ANY (v_chamadas)
+    ) k;
+
+    IF v_aluno_ids IS NOT NULL THEN
+        PERFORM frequencia_recontar(v_aluno_ids, v_turma_ids);
+    END IF;
+    FOREACH v_turma IN ARRAY v_turmas LOOP
+        PERFORM recalcular_sequencias(v_turma);
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_frequencia_faltas_delete ON faltas;
+CREATE TRIGGER trg_frequencia_faltas_delete AFTER DELETE ON faltas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION frequencia_faltas_removidas();
+
+DROP TRIGGER IF EXISTS trg_frequencia_faltas_update ON faltas;
+CREATE TRIGGER trg_frequencia_faltas_update AFTER UPDATE ON faltas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION frequencia_faltas_removidas();
+
+DROP TRIGGER IF EXISTS trg_frequencia_chamadas_delete ON chamadas;
+CREATE TRIGGER trg_frequencia_chamadas_delete AFTER DELETE ON chamadas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION frequencia_chamadas_removidas();
+
+DROP TRIGGER IF EXISTS trg_frequencia_chamadas_update ON chamadas;
+CREATE TRIGGER trg_frequencia_chamadas_update AFTER UPDATE ON chamadas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION frequencia_chamadas_removidas();
@@ -0,0 +1,61 @@
+-- Retenção de sync_saidas (0013): as remoções ficam guardadas por
+-- parametros.sync_retencao_dias. A cada nova remoção registrada, as linhas
+-- mais antigas que isso são apagadas e sync_retencao.podado_ate guarda a
+-- maior transação apagada.
+--
+-- Um cursor até podado_ate pode ter perdido remoções: sincronizar responde com
+-- a carga completa (como sem cursor) e "completo": true, e o aparelho troca
+-- os dados locais pelos recebidos em vez de mesclar.
+
+INSERT INTO parametros (chave, valor) VALUES
+    ('sync_retencao_dias', 90)  -- aparelho sem sincronizar há mais tempo recebe tudo de novo
+ON CONFLICT (chave) DO NOTHING;
+
+ALTER TABLE sync_saidas ADD COLUMN IF NOT EXISTS criada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+CREATE INDEX IF NOT EXISTS idx_sync_saidas_criada_em ON sync_saidas (criada_em);
+
+CREATE TABLE IF NOT EXISTS sync_retencao (
+    unica BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (unica),
+    podado_ate xid8 NOT NULL DEFAULT '0'
+);
+INSERT INTO sync_retencao DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION podar_sync_saidas() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_dias NUMERIC := (SELECT valor FROM parametros WHERE chave = 'sync_retencao_dias');
+    v_limite xid8;
+BEGIN
+    SELECT s.txid_sync INTO v_limite
+    FROM sync_saidas s
+    WHERE s.criada_em < CURRENT_TIMESTAMP - make_interval(days => v_dias::INTEGER)
+    ORDER BY s.txid_sync DESC
+    LIMIT 1;
+
+    IF v_limite IS NOT NULL THEN
+        DELETE FROM sync_saidas WHERE txid_sync <= v_limite;
+        UPDATE sync_retencao SET podado_ate = v_limite WHERE podado_ate < v_limite;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sync_saidas_podar ON sync_saidas;
+CREATE TRIGGER trg_sync_saidas_podar AFTER INSERT ON sync_saidas
+    FOR EACH STATEMENT EXECUTE FUNCTION podar_sync_saidas();
+
+-- A consulta de 0013 passa a se chamar sincronizar_desde; sincronizar decide
+-- entre ela e a carga completa
+ALTER FUNCTION sincronizar(TEXT, INTEGER) RENAME TO sincronizar_desde;
+
+CREATE OR REPLACE FUNCTION sincronizar(p_cursor TEXT DEFAULT NULL, p_professor_id INTEGER DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT CASE WHEN p_cursor IS NULL OR p_cursor::xid8 <= r.podado_ate
+                THEN sincronizar_desde(NULL, p_professor_id) || '{"completo": true}'::jsonb
+                ELSE sincronizar_desde(p_cursor, p_professor_id) || '{"completo": false}'::jsonb END
+    FROM sync_retencao r
+$$;
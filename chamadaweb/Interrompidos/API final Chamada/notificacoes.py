@@ -0,0 +1,81 @@
+"""
+Escuta do canal NOTIFY tabelas_alteradas (migrações 0010, 0011 e 0012).
+
+Os triggers dessas migrações avisam, com o nome da tabela, quando unidades,
+cursos, professores ou turmas mudam; alunos, chamadas e faltas avisam com a
+turma como escopo ('alunos:7'). Uma thread por processo, com conexão própria,
+repassa cada aviso a cache.tabela_alterada; assim os caches em memória
+(referencias.py, autorizacao.py) e as versões dos ETags também veem o que foi
+alterado por outro worker ou direto no banco.
+"""
+import select
+import threading
+import time
+
+import psycopg2
+
+from cache import tabela_alterada
+from config import Config
+
+CANAL = 'tabelas_alteradas'
+TABELAS = ('unidades', 'cursos', 'professores', 'turmas', 'alunos', 'chamadas', 'faltas')
+
+_escuta = None
+_escuta_lock = threading.Lock()
+# Marcado enquanto o LISTEN está ativo
+_conectada = threading.Event()
+
+
+def iniciar_escuta():
+    """Sobe a thread de LISTEN deste processo (de novo, se o worker foi criado por fork)"""
+    global _escuta
+    if not Config.DB_LISTEN or not Config.DATABASE_URL:
+        return
+    if _escuta is not None and _escuta.is_alive():
+        return
+    with _escuta_lock:
+        if _escuta is None or not _escuta.is_alive():
+            _escuta = threading.Thread(target=_escutar, daemon=True, name='tabelas-alteradas')
+            _escuta.start()
+
+
+def escuta_conectada():
+    """Se os avisos de outros processos estão chegando (e a escuta, iniciada)"""
+    iniciar_escuta()
+    return _conectada.is_set()
+
+
+def _repassar(payload):
+    tabela, _, escopo = payload.partition(':')
+    tabela_alterada(tabela, int(escopo) if escopo else None)
+
+
+def _escutar():
+    """Repassa os avisos do canal a tabela_alterada, reconectando após falhas"""
+    espera = 1
+    while True:
+        try:
+            # Conexão própria, fora do pool e sem o pooler: LISTEN precisa de uma
+            # sessão fixa, e keepalives para notar uma conexão que caiu calada
+            conn = psycopg2.connect(Config.DATABASE_URL, keepalives=1, keepalives_idle=60,
+                                    keepalives_interval=10, keepalives_count=3)
+            try:
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {CANAL}")
+                # Avisos enviados antes do LISTEN (ou durante uma queda) se perderam
+                for tabela in TABELAS:
+                    tabela_alterada(tabela)
+                _conectada.set()
+                espera = 1
+                while True:
+                    select.select([conn], [], [], 60)
+                    conn.poll()
+                    while conn.notifies:
+                        _repassar(conn.notifies.pop(0).payload)
+            finally:
+                _conectada.clear()
+                conn.close()
+        except Exception as e:
+            print(f"Escuta do canal {CANAL} interrompida: {e}; nova tentativa em {espera}s")
+            time.sleep(espera)
+            espera = min(espera * 2, 60)
@@ -0,0 +1,92 @@
+"""
+Paginação por keyset (nome, id) sobre a API REST do Supabase.
+
+Em vez de OFFSET, cada página continua a partir do último (nome, id) visto, que
+vai para o cliente como um cursor opaco. O custo de cada página é o mesmo em
+qualquer posição da lista, e exportacao_json() percorre a tabela inteira página
+por página, gerando o JSON aos poucos, sem carregar tudo em memória.
+"""
+import base64
+import json
+
+from flask import request
+
+import supabase_client
+from config import Config
+
+
+class CursorInvalido(ValueError):
+    """Cursor de paginação malformado"""
+
+
+def codificar_cursor(nome, id):
+    dados = json.dumps([nome, id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(dados).decode('ascii')
+
+
+def decodificar_cursor(cursor):
+    try:
+        nome, id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(nome), int(id)
+    except (ValueError, TypeError, UnicodeError):
+        raise CursorInvalido(cursor)
+
+
+def _valor_postgrest(valor):
+    """Aspas para valores com vírgula/parênteses dentro de um filtro or=(...)"""
+    escapado = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escapado}"'
+
+
+def ler_limite():
+    """Lê ?limit= da requisição, respeitando o padrão e o máximo do Config"""
+    try:
+        limite = int(request.args.get('limit', Config.PAGINA_LIMITE_PADRAO))
+    except ValueError:
+        limite = Config.PAGINA_LIMITE_PADRAO
+    return max(1, min(limite, Config.PAGINA_LIMITE_MAXIMO))
+
+
+def buscar_pagina(tabela, colunas, limite, cursor=None, filtros=None):
+    """Busca uma página ordenada por (nome, id).
+
+    Retorna (resp, linhas, proximo_cursor); linhas é None se o Supabase falhar.
+    """
+    params = dict(filtros or {})
+    params['select'] = colunas
+    params['order'] = 'nome.asc,id.asc'
+    # Um registro a mais indica se existe próxima página
+    params['limit'] = limite + 1
+    if cursor:
+        nome, id = decodificar_cursor(cursor)
+        params['or'] = f"(nome.gt.{_valor_postgrest(nome)},and(nome.eq.{_valor_postgrest(nome)},id.gt.{id}))"
+
+    resp = supabase_client.get(tabela, params=params)
+    if resp.status_code != 200:
+        return resp, None, None
+
+    linhas = resp.json()
+    proximo_cursor = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo_cursor = codificar_cursor(linhas[-1]['nome'], linhas[-1]['id'])
+    return resp, linhas, proximo_cursor
+
+
+def exportacao_json(tabela, colunas, filtros=None):
+    """Gera um array JSON com todas as linhas, buscando uma página por vez"""
+    yield '['
+    primeiro = True
+    cursor = None
+    while True:
+        resp, linhas, cursor = buscar_pagina(tabela, colunas, Config.PAGINA_LIMITE_MAXIMO,
+                                             cursor, filtros)
+        if linhas is None:
+            # O status 200 já foi enviado; interromper deixa o JSON inválido para o cliente
+            raise RuntimeError(f"Erro ao exportar {tabela}: {resp.status_code}")
+        for linha in linhas:
+            yield ('' if primeiro else ',') + json.dumps(linha, ensure_ascii=False)
+            primeiro = False
+        if not cursor:
+            break
+    yield ']'
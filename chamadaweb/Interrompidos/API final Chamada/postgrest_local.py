@@ -0,0 +1,568 @@
+"""
+Substituto local da API REST do Supabase (PostgREST) para testes e benchmarks
+sem rede.
+
+Implementa, sobre o PostgreSQL de DATABASE_URL (com as migrações aplicadas),
+o subconjunto do PostgREST que os blueprints usam:
+
+    GET    /rest/v1/<tabela>?select=...&<coluna>=<op>.<valor>&order=...&limit=...&offset=...
+    POST   /rest/v1/<tabela>            objeto ou lista (insert em lote; upsert com
+                                        Prefer: resolution=merge-duplicates e ?on_conflict=)
+    PATCH  /rest/v1/<tabela>?<filtros>
+    DELETE /rest/v1/<tabela>?<filtros>
+    GET/POST /rest/v1/rpc/<funcao>
+
+- select: colunas, *, e um nível de recursos embutidos pelas chaves estrangeiras,
+  com ou sem !inner: alunos(nome), alunos!inner(nome,cpf), turmas(id);
+  filtros no recurso embutido: alunos.ativo=eq.true
+- filtros: eq, neq, gt, gte, lt, lte, like, ilike, in.(...), is.null|true|false,
+  prefixo not. e or=(...) com and(...)/or(...) aninhados
+- Prefer: return=representation devolve as linhas gravadas (sem ele, 201/204
+  sem corpo, como o PostgREST)
+- erros no formato do PostgREST ({code, message, details, hint})
+
+Cada resposta pode receber latência e erros injetados, com semente fixa para
+que as medições se repitam:
+
+    python postgrest_local.py --porta 54321 --latencia-ms 40 --jitter-ms 20 --taxa-erro 0.02
+
+e a aplicação aponta para ele com SUPABASE_URL=http://127.0.0.1:54321.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+
+import psycopg2
+from flask import Flask, Response, request
+from psycopg2 import sql
+from psycopg2.extras import Json
+
+from db_pool import get_db_connection
+
+OPERADORES = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+              'like': 'LIKE', 'ilike': 'ILIKE'}
+PARAMETROS_RESERVADOS = {'select', 'order', 'limit', 'offset', 'or', 'and', 'on_conflict', 'columns'}
+
+# Códigos do PostgreSQL -> status HTTP, como no PostgREST
+STATUS_POR_CODIGO = {'23505': 409, '23503': 409, '23502': 400, '22P02': 400, '42703': 400,
+                     '42883': 404, '42P01': 404, '42501': 403, 'P0001': 400}
+
+RE_ITEM_SELECT = re.compile(r'^(\w+)(?:!(\w+))?\((.*)\)$', re.S)
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, mensagem, status=400, codigo='PGRST100'):
+        super().__init__(mensagem)
+        self.status = status
+        self.codigo = codigo
+
+
+# ================= ESQUEMA ===================
+
+class Esquema:
+    """Colunas, chaves primárias e estrangeiras do schema public (carregado uma vez)"""
+
+    def __init__(self, cursor):
+        cursor.execute('''
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = 'public' ORDER BY table_name, ordinal_position
+        ''')
+        self.colunas = {}
+        for tabela, coluna in cursor.fetchall():
+            self.colunas.setdefault(tabela, []).append(coluna)
+
+        cursor.execute('''
+            SELECT c.conrelid::regclass::text, c.contype, c.confrelid::regclass::text,
+                   ARRAY(SELECT a.attname FROM unnest(c.conkey) WITH ORDINALITY k(n, i)
+                         JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.n ORDER BY k.i),
+                   ARRAY(SELECT a.attname FROM unnest(c.confkey) WITH ORDINALITY k(n, i)
+                         JOIN pg_attribute a ON a.attrelid = c.confrelid AND a.attnum = k.n ORDER BY k.i)
+            FROM pg_constraint c
+            WHERE c.contype IN ('p', 'f') AND c.connamespace = 'public'::regnamespace
+            ORDER BY c.conname
+        ''')
+        self.chaves_primarias = {}
+        self.estrangeiras = []
+        for tabela, tipo, referenciada, colunas, colunas_ref in cursor.fetchall():
+            if tipo == 'p':
+                self.chaves_primarias[tabela] = colunas
+            else:
+                self.estrangeiras.append((tabela, colunas, referenciada, colunas_ref))
+
+        cursor.execute('''
+            SELECT p.proname, p.proretset, t.typtype, t.typname
+            FROM pg_proc p JOIN pg_type t ON t.oid = p.prorettype
+            WHERE p.pronamespace = 'public'::regnamespace
+        ''')
+        self.funcoes = {nome: (conjunto, tipo, nome_tipo) for nome, conjunto, tipo, nome_tipo in cursor.fetchall()}
+
+        # Tipo de cada argumento de entrada, para o cast dos parâmetros da RPC
+        cursor.execute('''
+            SELECT p.proname, a.nome, format_type(a.tipo, NULL)
+            FROM pg_proc p
+            CROSS JOIN LATERAL unnest(p.proargnames, COALESCE(p.proallargtypes, p.proargtypes::oid[]),
+                                      p.proargmodes::text[]) AS a(nome, tipo, modo)
+            WHERE p.pronamespace = 'public'::regnamespace AND COALESCE(a.modo, 'i') IN ('i', 'b', 'v')
+        ''')
+        self.argumentos = {}
+        for funcao, nome, tipo in cursor.fetchall():
+            self.argumentos.setdefault(funcao, {})[nome] = tipo
+
+    def tabela(self, nome):
+        if nome not in self.colunas:
+            raise ErroRequisicao(f'relation "public.{nome}" does not exist', 404, '42P01')
+        return nome
+
+    def coluna(self, tabela, nome):
+        if nome not in self.colunas[tabela]:
+            raise ErroRequisicao(f'column {tabela}.{nome} does not exist', 400, '42703')
+        return nome
+
+    def relacao(self, tabela, embutida):
+        """(condição de junção, é_lista) entre tabela (alias t) e embutida (alias e)"""
+        for origem, colunas, destino, colunas_ref in self.estrangeiras:
+            if origem == tabela and destino == embutida:
+                # Muitos-para-um: objeto (ou null)
+                return list(zip(colunas_ref, colunas)), False
+        for origem, colunas, destino, colunas_ref in self.estrangeiras:
+            if origem == embutida and destino == tabela:
+                # Um-para-muitos: lista
+                return list(zip(colunas, colunas_ref)), True
+        raise ErroRequisicao(f"Could not find a relationship between '{tabela}' and '{embutida}'",
+                             400, 'PGRST200')
+
+
+_esquema = None
+_esquema_lock = threading.Lock()
+
+
+def obter_esquema(cursor):
+    global _esquema
+    if _esquema is None:
+        with _esquema_lock:
+            if _esquema is None:
+                _esquema = Esquema(cursor)
+    return _esquema
+
+
+# ================= PARSE ===================
+
+def dividir(texto, separador=','):
+    """Divide no separador de primeiro nível (fora de parênteses e aspas)"""
+    partes, atual, nivel, aspas = [], [], 0, False
+    i = 0
+    while i < len(texto):
+        c = texto[i]
+        if aspas:
+            atual.append(c)
+            if c == '\\' and i + 1 < len(texto):
+                atual.append(texto[i + 1])
+                i += 1
+            elif c == '"':
+                aspas = False
+        elif c == '"':
+            aspas = True
+            atual.append(c)
+        elif c == '(':
+            nivel += 1
+            atual.append(c)
+        elif c == ')':
+            nivel -= 1
+            atual.append(c)
+        elif c == separador and nivel == 0:
+            partes.append(''.join(atual))
+            atual = []
+        else:
+            atual.append(c)
+        i += 1
+    if atual or partes:
+        partes.append(''.join(atual))
+    return partes
+
+
+def _valor(texto):
+    if len(texto) >= 2 and texto[0] == texto[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', texto[1:-1])
+    return texto
+
+
+def condicao(alias, tabela, esquema, coluna, expressao):
+    """Filtro "coluna=op.valor" -> (SQL, parâmetros)"""
+    esquema.coluna(tabela, coluna)
+    negar = expressao.startswith('not.')
+    if negar:
+        expressao = expressao[4:]
+    operador, _, valor = expressao.partition('.')
+    campo = sql.SQL('{}.{}').format(sql.Identifier(alias), sql.Identifier(coluna))
+
+    if operador in OPERADORES:
+        if operador in ('like', 'ilike'):
+            valor = valor.replace('*', '%')
+        texto = sql.SQL('{} {} %s').format(campo, sql.SQL(OPERADORES[operador]))
+        parametros = [_valor(valor)]
+    elif operador == 'in':
+        if not (valor.startswith('(') and valor.endswith(')')):
+            raise ErroRequisicao(f'"failed to parse filter (in.{valor})"')
+        itens = [_valor(item) for item in dividir(valor[1:-1])]
+        if not itens:
+            texto, parametros = sql.SQL('FALSE'), []
+        else:
+            texto = sql.SQL('{} IN ({})').format(campo, sql.SQL(', ').join(sql.Placeholder() * len(itens)))
+            parametros = itens
+    elif operador == 'is' and valor in ('null', 'true', 'false'):
+        texto = sql.SQL('{} IS {}').format(campo, sql.SQL(valor.upper()))
+        parametros = []
+    else:
+        raise ErroRequisicao(f'"failed to parse filter ({operador}.{valor})"')
+
+    if negar:
+        texto = sql.SQL('NOT ({})').format(texto)
+    return texto, parametros
+
+
+def condicao_logica(alias, tabela, esquema, operador, texto):
+    """or=(a.eq.1,and(b.gt.2,c.lt.3)) -> (SQL, parâmetros)"""
+    if not (texto.startswith('(') and texto.endswith(')')):
+        raise ErroRequisicao(f'"failed to parse logic tree ({texto})"')
+    partes, parametros = [], []
+    for item in dividir(texto[1:-1]):
+        item = item.strip()
+        m = re.match(r'^(not\.)?(and|or)(\(.*\))$', item, re.S)
+        if m:
+            parte, valores = condicao_logica(alias, tabela, esquema, m.group(2), m.group(3))
+            if m.group(1):
+                parte = sql.SQL('NOT ({})').format(parte)
+        else:
+            coluna, _, expressao = item.partition('.')
+            parte, valores = condicao(alias, tabela, esquema, coluna, expressao)
+        partes.append(parte)
+        parametros.extend(valores)
+    juncao = sql.SQL(' OR ' if operador == 'or' else ' AND ')
+    return sql.SQL('({})').format(juncao.join(partes)), parametros
+
+
+def filtros(argumentos):
+    """Filtros da query string agrupados por destino: {None: [...], 'embutida': [...]}"""
+    resultado = {}
+    for chave, valores in argumentos.lists():
+        for valor in valores:
+            if chave in ('or', 'and') or chave.endswith(('.or', '.and')):
+                destino, _, operador = chave.rpartition('.')
+                resultado.setdefault(destino or None, []).append(('logica', operador, valor))
+            elif chave not in PARAMETROS_RESERVADOS:
+                destino, _, coluna = chave.rpartition('.')
+                resultado.setdefault(destino or None, []).append(('coluna', coluna, valor))
+    return resultado
+
+
+def montar_condicoes(alias, tabela, esquema, itens):
+    partes, parametros = [], []
+    for tipo, primeiro, valor in itens:
+        if tipo == 'logica':
+            parte, valores = condicao_logica(alias, tabela, esquema, primeiro, valor)
+        else:
+            parte, valores = condicao(alias, tabela, esquema, primeiro, valor)
+        partes.append(parte)
+        parametros.extend(valores)
+    return partes, parametros
+
+
+# ================= CONSULTAS ===================
+
+def consulta_select(esquema, tabela, argumentos):
+    """SELECT que devolve o resultado inteiro como um único texto JSON"""
+    esquema.tabela(tabela)
+    por_destino = filtros(argumentos)
+    condicoes, parametros = montar_condicoes('t', tabela, esquema, por_destino.pop(None, []))
+
+    campos, campos_params = [], []
+    for item in dividir(argumentos.get('select', '*')):
+        item = item.strip()
+        if item == '*':
+            campos.append(sql.SQL('t.*'))
+            continue
+        m = RE_ITEM_SELECT.match(item)
+        if not m:
+            coluna = esquema.coluna(tabela, item)
+            campos.append(sql.SQL('t.{}').format(sql.Identifier(coluna)))
+            continue
+
+        embutida, dica, colunas = m.groups()
+        esquema.tabela(embutida)
+        juncao, lista = esquema.relacao(tabela, embutida)
+        condicoes_e = [sql.SQL('e.{} = t.{}').format(sql.Identifier(a), sql.Identifier(b)) for a, b in juncao]
+        extras, extras_params = montar_condicoes('e', embutida, esquema, por_destino.pop(embutida, []))
+        condicoes_e += extras
+        onde_e = sql.SQL(' AND ').join(condicoes_e)
+
+        if colunas.strip() in ('', '*'):
+            lista_e = sql.SQL('e.*')
+        else:
+            itens_e = [item_e.strip() for item_e in dividir(colunas)]
+            if any('(' in item_e for item_e in itens_e):
+                raise ErroRequisicao('Só um nível de recursos embutidos é suportado', 400, 'PGRST100')
+            lista_e = sql.SQL(', ').join(sql.SQL('e.{}').format(sql.Identifier(esquema.coluna(embutida, c)))
+                                         for c in itens_e)
+
+        if lista:
+            subconsulta = sql.SQL("(SELECT COALESCE(json_agg(x), '[]') FROM (SELECT {} FROM {} e WHERE {}) x)")
+        else:
+            subconsulta = sql.SQL("(SELECT row_to_json(x) FROM (SELECT {} FROM {} e WHERE {} LIMIT 1) x)")
+        campos.append(sql.SQL('{} AS {}').format(
+            subconsulta.format(lista_e, sql.Identifier(embutida), onde_e), sql.Identifier(embutida)))
+        campos_params += extras_params
+        if dica == 'inner':
+            condicoes.append(sql.SQL('EXISTS (SELECT 1 FROM {} e WHERE {})').format(sql.Identifier(embutida), onde_e))
+            parametros += extras_params
+
+    if por_destino:
+        raise ErroRequisicao(f"Filtro em recurso não embutido: {', '.join(por_destino)}", 400, 'PGRST108')
+
+    consulta = sql.SQL('SELECT {} FROM {} t').format(sql.SQL(', ').join(campos), sql.Identifier(tabela))
+    if condicoes:
+        consulta += sql.SQL(' WHERE ') + sql.SQL(' AND ').join(condicoes)
+
+    if argumentos.get('order'):
+        ordem = []
+        for item in argumentos['order'].split(','):
+            partes = item.strip().split('.')
+            coluna = esquema.coluna(tabela, partes[0])
+            termo = sql.SQL('t.{}').format(sql.Identifier(coluna))
+            for modificador in partes[1:]:
+                if modificador not in ('asc', 'desc', 'nullsfirst', 'nullslast'):
+                    raise ErroRequisicao(f'"failed to parse order ({item})"')
+                termo += sql.SQL({'asc': ' ASC', 'desc': ' DESC', 'nullsfirst': ' NULLS FIRST',
+                                  'nullslast': ' NULLS LAST'}[modificador])
+            ordem.append(termo)
+        consulta += sql.SQL(' ORDER BY ') + sql.SQL(', ').join(ordem)
+
+    limite = []
+    for chave, clausula in (('limit', ' LIMIT %s'), ('offset', ' OFFSET %s')):
+        if argumentos.get(chave):
+            if not argumentos[chave].isdigit():
+                raise ErroRequisicao(f'"{chave} inválido"')
+            consulta += sql.SQL(clausula)
+            limite.append(int(argumentos[chave]))
+
+    # Parâmetros na ordem em que aparecem: campos embutidos, WHERE, LIMIT/OFFSET
+    consulta = sql.SQL("SELECT COALESCE(json_agg(q), '[]')::text FROM ({}) q").format(consulta)
+    return consulta, campos_params + parametros + limite
+
+
+def _retorno(consulta, representacao):
+    if not representacao:
+        return consulta
+    return sql.SQL("WITH r AS ({} RETURNING *) SELECT COALESCE(json_agg(r), '[]')::text FROM r").format(consulta)
+
+
+def consulta_insert(esquema, tabela, corpo, argumentos, preferencias):
+    esquema.tabela(tabela)
+    linhas = corpo if isinstance(corpo, list) else [corpo]
+    if not linhas or not all(isinstance(linha, dict) for linha in linhas):
+        raise ErroRequisicao('Envie um objeto ou uma lista de objetos', 400, 'PGRST102')
+    if argumentos.get('columns'):
+        colunas = [c.strip() for c in argumentos['columns'].split(',')]
+    else:
+        # Como no PostgREST: as chaves do primeiro objeto; ausentes nos demais viram NULL
+        colunas = list(linhas[0])
+    colunas = [esquema.coluna(tabela, c) for c in colunas]
+    lista = sql.SQL(', ').join(sql.Identifier(c) for c in colunas)
+
+    consulta = sql.SQL('INSERT INTO {t} ({c}) SELECT {c} FROM json_populate_recordset(NULL::{t}, %s)').format(
+        t=sql.Identifier(tabela), c=lista)
+    resolucao = preferencias.get('resolution')
+    if resolucao in ('merge-duplicates', 'ignore-duplicates'):
+        conflito = ([c.strip() for c in argumentos['on_conflict'].split(',')] if argumentos.get('on_conflict')
+                    else esquema.chaves_primarias.get(tabela, []))
+        alvo = sql.SQL(', ').join(sql.Identifier(esquema.coluna(tabela, c)) for c in conflito)
+        atualizar = [c for c in colunas if c not in conflito]
+        if resolucao == 'ignore-duplicates' or not atualizar:
+            consulta += sql.SQL(' ON CONFLICT ({}) DO NOTHING').format(alvo)
+        else:
+            consulta += sql.SQL(' ON CONFLICT ({}) DO UPDATE SET {}').format(alvo, sql.SQL(', ').join(
+                sql.SQL('{0} = EXCLUDED.{0}').format(sql.Identifier(c)) for c in atualizar))
+    return _retorno(consulta, preferencias.get('return') == 'representation'), [Json(linhas)]
+
+
+def _onde(esquema, tabela, argumentos):
+    por_destino = filtros(argumentos)
+    condicoes, parametros = montar_condicoes(tabela, tabela, esquema, por_destino.pop(None, []))
+    if por_destino:
+        raise ErroRequisicao('Filtros em recursos embutidos não se aplicam a escrita', 400, 'PGRST108')
+    if not condicoes:
+        return sql.SQL(''), []
+    return sql.SQL(' WHERE ') + sql.SQL(' AND ').join(condicoes), parametros
+
+
+def consulta_update(esquema, tabela, corpo, argumentos, preferencias):
+    esquema.tabela(tabela)
+    if not isinstance(corpo, dict) or not corpo:
+        raise ErroRequisicao('Envie um objeto com as colunas a alterar', 400, 'PGRST102')
+    colunas = sql.SQL(', ').join(sql.Identifier(esquema.coluna(tabela, c)) for c in corpo)
+    onde, parametros = _onde(esquema, tabela, argumentos)
+    consulta = sql.SQL('UPDATE {t} SET ({c}) = (SELECT {c} FROM json_populate_record(NULL::{t}, %s))').format(
+        t=sql.Identifier(tabela), c=colunas)
+    return _retorno(consulta + onde, preferencias.get('return') == 'representation'), [Json(corpo)] + parametros
+
+
+def consulta_delete(esquema, tabela, argumentos, preferencias):
+    esquema.tabela(tabela)
+    onde, parametros = _onde(esquema, tabela, argumentos)
+    consulta = sql.SQL('DELETE FROM {}').format(sql.Identifier(tabela)) + onde
+    return _retorno(consulta, preferencias.get('return') == 'representation'), parametros
+
+
+def consulta_rpc(esquema, funcao, argumentos):
+    if funcao not in esquema.funcoes:
+        raise ErroRequisicao(f'Could not find the function public.{funcao}', 404, 'PGRST202')
+    conjunto, tipo, nome_tipo = esquema.funcoes[funcao]
+    tipos = esquema.argumentos.get(funcao, {})
+    nomes = sorted(argumentos)
+    for nome in nomes:
+        if nome not in tipos:
+            raise ErroRequisicao(f'Could not find the function public.{funcao}({nome})', 404, 'PGRST202')
+    # Listas viram ARRAY (int[], text[]...) ou JSON, conforme o tipo do argumento
+    chamada = sql.SQL('{}({})').format(sql.Identifier(funcao), sql.SQL(', ').join(
+        sql.SQL('{} => %s::{}').format(sql.Identifier(nome), sql.SQL(tipos[nome])) for nome in nomes))
+    parametros = [Json(argumentos[n]) if tipos[n] in ('json', 'jsonb') else argumentos[n]
+                  for n in nomes]
+    if nome_tipo == 'void':
+        # Uma linha com NULL: a rota responde 204, como o PostgREST
+        return sql.SQL('SELECT NULL::text FROM {} v').format(chamada), parametros
+    if conjunto or tipo == 'c':
+        return sql.SQL("SELECT COALESCE(json_agg(r), '[]')::text FROM {} r").format(chamada), parametros
+    return sql.SQL("SELECT COALESCE(to_json({})::text, 'null')").format(chamada), parametros
+
+
+# ================= SERVIDOR ===================
+
+app = Flask(__name__)
+app.config['injecao'] = {'latencia_ms': 0.0, 'jitter_ms': 0.0, 'taxa_erro': 0.0, 'status_erro': 503,
+                         'aleatorio': random.Random()}
+# O servidor atende em várias threads: os sorteios de cada requisição são
+# feitos juntos, sob lock, na ordem de chegada
+_sorteio_lock = threading.Lock()
+
+
+def _json(corpo, status=200):
+    return Response(corpo, status=status, mimetype='application/json')
+
+
+def _erro(codigo, mensagem, status, detalhes=None, dica=None):
+    return _json(json.dumps({"code": codigo, "message": mensagem, "details": detalhes, "hint": dica}), status)
+
+
+def _preferencias():
+    preferencias = {}
+    for item in request.headers.get('Prefer', '').split(','):
+        chave, _, valor = item.strip().partition('=')
+        if chave:
+            preferencias[chave] = valor
+    return preferencias
+
+
+@app.before_request
+def injetar_falhas():
+    injecao = app.config['injecao']
+    with _sorteio_lock:
+        jitter = injecao['aleatorio'].uniform(0, injecao['jitter_ms'])
+        falhar = injecao['aleatorio'].random() < injecao['taxa_erro']
+    atraso = injecao['latencia_ms'] + jitter
+    if atraso > 0:
+        time.sleep(atraso / 1000)
+    if falhar:
+        return _erro('PGRST000', 'Erro injetado pelo postgrest_local', injecao['status_erro'])
+
+
+def _executar(montar, escrita):
+    """Monta a consulta com o esquema (montar(esquema) -> (sql, params)) e executa.
+
+    Retorna o texto JSON da primeira coluna (None se não houver) ou uma Response de erro.
+    """
+    with get_db_connection() as conn:
+        if not conn:
+            return _erro('PGRST000', 'Erro na conexão com o banco de dados', 503)
+        cursor = conn.cursor()
+        try:
+            consulta, parametros = montar(obter_esquema(cursor))
+            cursor.execute(consulta, parametros)
+            resultado = cursor.fetchone()[0] if cursor.description else None
+            if escrita:
+                conn.commit()
+            else:
+                conn.rollback()
+            return resultado
+        except ErroRequisicao as e:
+            conn.rollback()
+            return _erro(e.codigo, str(e), e.status)
+        except psycopg2.Error as e:
+            conn.rollback()
+            diag = e.diag
+            return _erro(e.pgcode, diag.message_primary or str(e), STATUS_POR_CODIGO.get(e.pgcode, 400),
+                         diag.message_detail, diag.message_hint)
+        finally:
+            cursor.close()
+
+
+@app.route('/rest/v1/rpc/<funcao>', methods=['GET', 'POST'])
+def rpc(funcao):
+    if request.method == 'POST':
+        argumentos = request.get_json(silent=True) or {}
+    else:
+        argumentos = request.args.to_dict()
+    resultado = _executar(lambda esquema: consulta_rpc(esquema, funcao, argumentos),
+                          escrita=request.method == 'POST')
+    if isinstance(resultado, Response):
+        return resultado
+    if resultado is None:
+        return Response(status=204)
+    return _json(resultado)
+
+
+@app.route('/rest/v1/<tabela>', methods=['GET', 'POST', 'PATCH', 'DELETE'])
+def tabela_rest(tabela):
+    preferencias = _preferencias()
+    argumentos = request.args
+    corpo = request.get_json(silent=True)
+    if request.method == 'GET':
+        montar = lambda esquema: consulta_select(esquema, tabela, argumentos)
+    elif request.method == 'POST':
+        montar = lambda esquema: consulta_insert(esquema, tabela, corpo, argumentos, preferencias)
+    elif request.method == 'PATCH':
+        montar = lambda esquema: consulta_update(esquema, tabela, corpo, argumentos, preferencias)
+    else:
+        montar = lambda esquema: consulta_delete(esquema, tabela, argumentos, preferencias)
+
+    resultado = _executar(montar, escrita=request.method != 'GET')
+    if isinstance(resultado, Response):
+        return resultado
+    if request.method == 'GET':
+        return _json(resultado)
+    if preferencias.get('return') == 'representation':
+        return _json(resultado, 201 if request.method == 'POST' else 200)
+    return Response(status=201 if request.method == 'POST' else 204)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Substituto local do PostgREST (ver docstring do módulo)")
+    parser.add_argument('--porta', type=int, default=54321)
+    parser.add_argument('--latencia-ms', type=float, default=0, help="atraso fixo por requisição")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="atraso extra aleatório (0 a N ms)")
+    parser.add_argument('--taxa-erro', type=float, default=0, help="fração das requisições que falham")
+    parser.add_argument('--status-erro', type=int, default=503, help="status dos erros injetados")
+    parser.add_argument('--semente', type=int, default=42, help="semente do sorteio de atrasos e erros")
+    args = parser.parse_args()
+
+    app.config['injecao'] = {'latencia_ms': args.latencia_ms, 'jitter_ms': args.jitter_ms,
+                             'taxa_erro': args.taxa_erro, 'status_erro': args.status_erro,
+                             'aleatorio': random.Random(args.semente)}
+    print(f"PostgREST local em http://127.0.0.1:{args.porta}/rest/v1 "
+          f"(latência {args.latencia_ms}+{args.jitter_ms}ms, erros {args.taxa_erro:.1%})")
+    app.run(host='127.0.0.1', port=args.porta, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
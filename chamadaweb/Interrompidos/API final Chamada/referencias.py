@@ -0,0 +1,101 @@
+"""
+Cache em memória (por processo) das tabelas de referência: unidades, cursos e
+o vínculo de cada professor com sua unidade e seu curso.
+
+Essas tabelas mudam raramente e entram em quase toda página. O conjunto é lido
+inteiro do banco na primeira consulta do worker e guardado com a versão das
+tabelas (cache.etag_atual): qualquer tabela_alterada('unidades' | 'cursos' |
+'professores') muda a versão e a consulta seguinte recarrega.
+
+As escritas da própria aplicação (bp_unidades, bp_cursos, rotas do master) já
+chamam tabela_alterada. As de outros workers ou feitas direto no banco chegam
+pelo canal NOTIFY tabelas_alteradas (ver notificacoes.py). Se a escuta cair, o
+conjunto ainda vence após Config.REFERENCIAS_TTL segundos.
+"""
+import threading
+import time
+
+import notificacoes
+from cache import etag_atual
+from config import Config
+from db_pool import get_db_connection
+
+TABELAS = ('unidades', 'cursos', 'professores')
+
+
+class ReferenciasIndisponiveis(Exception):
+    """Sem conexão com o banco para carregar as tabelas de referência"""
+
+
+class Referencias:
+    """Instantâneo das tabelas de referência; não é alterado depois de criado"""
+
+    def __init__(self, versao, unidades, cursos, professores):
+        self.versao = versao
+        self.carregado_em = time.monotonic()
+        self.unidades = unidades        # id -> {id, nome, endereco, ativo}
+        self.cursos = cursos            # id -> {id, nome, unidade_id, ativo}
+        self.professores = professores  # id -> {id, usuario_id, tipo, unidade_id, curso_id, ativo}
+        self._por_usuario = {}
+        for professor in sorted(professores.values(), key=lambda p: p['id']):
+            if professor['ativo'] and professor['usuario_id'] is not None:
+                self._por_usuario.setdefault(professor['usuario_id'], professor)
+
+    def professor_do_usuario(self, usuario_id):
+        """(id, unidade, curso, tipo) do professor ativo do usuário, como o JOIN
+        de professores com unidades e cursos; None se não houver"""
+        professor = self._por_usuario.get(usuario_id)
+        if professor is None:
+            return None
+        unidade = self.unidades.get(professor['unidade_id'])
+        curso = self.cursos.get(professor['curso_id'])
+        if unidade is None or curso is None:
+            return None
+        return (professor['id'], unidade['nome'], curso['nome'], professor['tipo'])
+
+
+def _linhas(cursor, sql):
+    cursor.execute(sql)
+    colunas = [coluna.name for coluna in cursor.description]
+    return {linha[0]: dict(zip(colunas, linha)) for linha in cursor.fetchall()}
+
+
+def _carregar(versao):
+    with get_db_connection() as conn:
+        if not conn:
+            raise ReferenciasIndisponiveis("Sem conexão com o banco")
+        cursor = conn.cursor()
+        unidades = _linhas(cursor, "SELECT id, nome, endereco, ativo FROM unidades")
+        cursos = _linhas(cursor, "SELECT id, nome, unidade_id, ativo FROM cursos")
+        professores = _linhas(cursor, '''
+            SELECT id, usuario_id, tipo, unidade_id, curso_id, ativo
+            FROM professores
+        ''')
+        cursor.close()
+    return Referencias(versao, unidades, cursos, professores)
+
+
+_atual = None
+_atual_lock = threading.Lock()
+
+
+def _valido(referencias):
+    return (referencias is not None
+            and referencias.versao == etag_atual(*TABELAS)
+            and time.monotonic() - referencias.carregado_em < Config.REFERENCIAS_TTL)
+
+
+def obter():
+    """Instantâneo atual, recarregado se alguma das tabelas mudou"""
+    global _atual
+    notificacoes.iniciar_escuta()
+    referencias = _atual
+    if _valido(referencias):
+        return referencias
+    with _atual_lock:
+        if not _valido(_atual):
+            # A versão é lida antes dos dados: uma escrita durante a carga
+            # deixa o instantâneo já vencido, e a próxima consulta recarrega
+            _atual = _carregar(etag_atual(*TABELAS))
+        return _atual
+
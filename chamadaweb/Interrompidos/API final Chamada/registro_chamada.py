@@ -0,0 +1,34 @@
+"""
+Gravação de chamadas direto no PostgreSQL.
+
+A chamada e todas as suas faltas são gravadas pela função registrar_chamada
+(migrations/0002_registrar_chamada.sql), a mesma que o PostgREST expõe em
+rpc/registrar_chamada: uma ida e volta ao banco independente do número de
+faltas e, com chave de idempotência, um reenvio do mesmo formulário devolve a
+chamada já gravada em vez de criar outra.
+"""
+
+SQL_REGISTRAR_CHAMADA = '''
+    SELECT id_chamada, repetida
+    FROM registrar_chamada(%(turma_id)s, %(data)s, %(hora)s, %(professor_id)s,
+                           %(faltas)s::int[], %(chave)s)
+'''
+
+
+def inserir_chamada_com_faltas(cursor, turma_id, professor_id, faltas_ids, data, hora,
+                               chave_idempotencia=None):
+    """Grava a chamada e suas faltas em um só comando; retorna (id da chamada, repetida).
+
+    Não faz commit: quem chama controla a transação.
+    """
+    faltas = sorted({int(aluno_id) for aluno_id in faltas_ids})
+    cursor.execute(SQL_REGISTRAR_CHAMADA, {
+        'turma_id': turma_id,
+        'professor_id': professor_id,
+        'faltas': faltas,
+        'data': data,
+        'hora': hora,
+        'chave': chave_idempotencia,
+    })
+    chamada_id, repetida = cursor.fetchone()
+    return chamada_id, repetida
@@ -0,0 +1,200 @@
+"""
+Relatório semestral de frequência, calculado em colunas (pandas/NumPy).
+
+Alunos, chamadas e faltas do período são lidos com COPY direto para
+DataFrames e todos os indicadores saem de operações vetorizadas (merge e
+groupby), sem laço por aluno em Python:
+
+    - presença por aluno, turma, curso e unidade
+    - faltas justificadas x não justificadas
+    - taxa de faltas por dia da semana, por unidade
+
+Uma chamada conta para o aluno se foi feita na turma atual dele a partir de
+alunos.turma_desde (mesma regra de frequencia.py).
+
+Uso:
+    python relatorio_semestral.py 2025-02-01 2025-06-30 relatorio.xlsx [unidade_id]
+
+Também é gerado pela fila de relatórios: POST /reports/generate com
+{"tipo": "semestral", "inicio": "...", "fim": "..."} (ou "semestral_csv").
+"""
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from db_pool import get_db_connection
+from tarefas import tipo_tarefa
+
+DIAS_DA_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+
+SQL_ALUNOS = '''
+    SELECT a.id AS aluno_id, a.nome AS aluno, a.cpf, a.turma_id, a.turma_desde,
+           t.nome AS turma, cu.nome AS curso, un.nome AS unidade
+    FROM alunos a
+    JOIN turmas t ON t.id = a.turma_id
+    LEFT JOIN cursos cu ON cu.id = t.curso_id
+    LEFT JOIN unidades un ON un.id = cu.unidade_id
+    WHERE a.ativo = TRUE
+      AND (%(unidade_id)s::INTEGER IS NULL OR cu.unidade_id = %(unidade_id)s::INTEGER)
+'''
+
+SQL_CHAMADAS = '''
+    SELECT c.id AS chamada_id, c.turma_id, c.data_chamada, c.created_at
+    FROM chamadas c
+    WHERE c.data_chamada BETWEEN %(inicio)s AND %(fim)s
+'''
+
+SQL_FALTAS = '''
+    SELECT f.chamada_id, f.aluno_id, f.justificada
+    FROM faltas f
+    JOIN chamadas c ON c.id = f.chamada_id
+    WHERE c.data_chamada BETWEEN %(inicio)s AND %(fim)s
+'''
+
+
+def _ler_tabela(cursor, sql, params, datas=()):
+    """Executa a consulta com COPY e devolve um DataFrame (parse em C, sem tuplas por linha)"""
+    consulta = cursor.mogrify(sql, params).decode('utf-8')
+    buffer = io.StringIO()
+    cursor.copy_expert(f"COPY ({consulta}) TO STDOUT WITH CSV HEADER", buffer)
+    buffer.seek(0)
+    tabela = pd.read_csv(buffer)
+    # Conversão explícita: parse_dates deixa a coluna como texto se o período
+    # não tem linhas ou se os timestamps variam de formato (com e sem fração)
+    for coluna in datas:
+        tabela[coluna] = pd.to_datetime(tabela[coluna], format='ISO8601')
+    return tabela
+
+
+def carregar_dados(conn, inicio, fim, unidade_id=None):
+    """(alunos, chamadas, faltas) do período como DataFrames"""
+    params = {"inicio": inicio, "fim": fim, "unidade_id": unidade_id}
+    cursor = conn.cursor()
+    alunos = _ler_tabela(cursor, SQL_ALUNOS, params, datas=('turma_desde',))
+    chamadas = _ler_tabela(cursor, SQL_CHAMADAS, params, datas=('data_chamada', 'created_at'))
+    faltas = _ler_tabela(cursor, SQL_FALTAS, params)
+    cursor.close()
+    conn.rollback()
+    faltas['justificada'] = faltas['justificada'].map({'t': True, 'f': False}).astype(bool)
+    return alunos, chamadas, faltas
+
+
+def _taxa(numerador, denominador):
+    return np.where(denominador > 0, np.round(100.0 * numerador / np.maximum(denominador, 1), 1), np.nan)
+
+
+def _agregar(por_aluno, chaves):
+    grupos = por_aluno.groupby(chaves, dropna=False, sort=True)
+    resumo = grupos.agg(alunos=('aluno_id', 'size'),
+                        chamadas=('chamadas', 'sum'),
+                        faltas=('faltas', 'sum'),
+                        justificadas=('justificadas', 'sum')).reset_index()
+    resumo['nao_justificadas'] = resumo['faltas'] - resumo['justificadas']
+    resumo['presenca'] = _taxa(resumo['chamadas'] - resumo['faltas'], resumo['chamadas'])
+    return resumo
+
+
+def calcular_relatorio(alunos, chamadas, faltas):
+    """Todas as planilhas do relatório a partir dos três DataFrames: {nome: DataFrame}"""
+    # Uma linha por (aluno, chamada que conta para ele)
+    participacao = alunos[['aluno_id', 'turma_id', 'turma_desde', 'unidade']].merge(
+        chamadas, on='turma_id')
+    participacao = participacao[participacao['created_at'] >= participacao['turma_desde']]
+
+    # Só as faltas de chamadas que contam para o aluno
+    faltas = faltas.merge(participacao[['aluno_id', 'chamada_id', 'data_chamada', 'unidade']],
+                          on=['aluno_id', 'chamada_id'])
+
+    por_aluno = alunos[['aluno_id', 'unidade', 'curso', 'turma', 'aluno', 'cpf']].copy()
+    indice = pd.Index(por_aluno['aluno_id'])
+    por_aluno['chamadas'] = participacao.groupby('aluno_id').size().reindex(indice, fill_value=0).to_numpy()
+    por_aluno['faltas'] = faltas.groupby('aluno_id').size().reindex(indice, fill_value=0).to_numpy()
+    por_aluno['justificadas'] = (faltas.groupby('aluno_id')['justificada'].sum()
+                                 .reindex(indice, fill_value=0).to_numpy())
+    por_aluno['nao_justificadas'] = por_aluno['faltas'] - por_aluno['justificadas']
+    por_aluno['presenca'] = _taxa(por_aluno['chamadas'] - por_aluno['faltas'], por_aluno['chamadas'])
+    por_aluno = por_aluno.sort_values(['unidade', 'curso', 'turma', 'aluno'], na_position='last')
+
+    # Dias da semana: faltas / participações esperadas naquele dia
+    dia_participacao = participacao['data_chamada'].dt.dayofweek
+    dia_falta = faltas['data_chamada'].dt.dayofweek
+    esperadas = participacao.groupby([participacao['unidade'], dia_participacao], dropna=False).size()
+    faltas_dia = faltas.groupby([faltas['unidade'], dia_falta], dropna=False).size()
+    semana = pd.DataFrame({'esperadas': esperadas, 'faltas': faltas_dia}).fillna(0).astype(int)
+    semana.index.names = ['unidade', 'dia']
+    semana = semana.reset_index()
+    semana['taxa_faltas'] = _taxa(semana['faltas'], semana['esperadas'])
+    semana['dia'] = np.asarray(DIAS_DA_SEMANA)[semana['dia'].to_numpy()]
+
+    return {
+        'Alunos': por_aluno.drop(columns='aluno_id'),
+        'Turmas': _agregar(por_aluno, ['unidade', 'curso', 'turma']),
+        'Cursos': _agregar(por_aluno, ['unidade', 'curso']),
+        'Unidades': _agregar(por_aluno, ['unidade']),
+        'Dias da semana': semana,
+    }
+
+
+def gerar_relatorio_semestral(inicio, fim, unidade_id=None):
+    with get_db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Erro na conexão com o banco de dados")
+        alunos, chamadas, faltas = carregar_dados(conn, inicio, fim, unidade_id)
+    return calcular_relatorio(alunos, chamadas, faltas)
+
+
+def salvar_xlsx(planilhas, caminho):
+    with pd.ExcelWriter(caminho) as escritor:
+        for nome, tabela in planilhas.items():
+            tabela.to_excel(escritor, sheet_name=nome, index=False)
+
+
+def salvar_csv(planilhas, caminho):
+    # CSV tem uma tabela só: a de alunos (as demais são agregações dela)
+    planilhas['Alunos'].to_csv(caminho, index=False, encoding='utf-8-sig')
+
+
+def _parametros_periodo(parametros):
+    if not parametros.get('inicio') or not parametros.get('fim'):
+        raise ValueError("Informe inicio e fim do período (AAAA-MM-DD)")
+    return parametros['inicio'], parametros['fim'], parametros.get('unidade_id')
+
+
+@tipo_tarefa('semestral', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+def tarefa_semestral_xlsx(parametros, caminho, progresso):
+    planilhas = gerar_relatorio_semestral(*_parametros_periodo(parametros))
+    progresso(0.7)
+    salvar_xlsx(planilhas, caminho)
+
+
+@tipo_tarefa('semestral_csv', 'csv', 'text/csv')
+def tarefa_semestral_csv(parametros, caminho, progresso):
+    planilhas = gerar_relatorio_semestral(*_parametros_periodo(parametros))
+    progresso(0.7)
+    salvar_csv(planilhas, caminho)
+
+
+def main(argv):
+    if len(argv) < 4:
+        print(__doc__)
+        return 2
+    inicio, fim, caminho = argv[1:4]
+    unidade_id = int(argv[4]) if len(argv) > 4 else None
+
+    t0 = time.perf_counter()
+    planilhas = gerar_relatorio_semestral(inicio, fim, unidade_id)
+    t1 = time.perf_counter()
+    if caminho.endswith('.csv'):
+        salvar_csv(planilhas, caminho)
+    else:
+        salvar_xlsx(planilhas, caminho)
+    t2 = time.perf_counter()
+    print(f"{len(planilhas['Alunos'])} alunos: cálculo {t1 - t0:.2f}s, gravação {t2 - t1:.2f}s -> {caminho}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,59 @@
+"""
+Relatórios gerados em segundo plano pela fila de tarefas (tarefas.py).
+
+Os relatórios leem direto do PostgreSQL (pool de db_pool.py) com cursor no
+servidor, gravando o arquivo linha a linha sem carregar o resultado inteiro em
+memória.
+"""
+import csv
+
+from db_pool import get_db_connection
+from tarefas import tipo_tarefa
+
+# Linhas buscadas por ida ao banco no cursor do servidor
+LINHAS_POR_LOTE = 2000
+
+SQL_RELATORIO_FREQUENCIA = '''
+    SELECT un.nome, cu.nome, t.nome, a.nome, a.cpf,
+           f.total_chamadas, f.total_faltas,
+           round(100.0 * (f.total_chamadas - f.total_faltas) / NULLIF(f.total_chamadas, 0), 1),
+           f.ultima_falta
+    FROM frequencia_alunos f
+    JOIN alunos a ON a.id = f.aluno_id AND a.ativo = TRUE AND a.turma_id = f.turma_id
+    JOIN turmas t ON t.id = f.turma_id
+    LEFT JOIN cursos cu ON cu.id = t.curso_id
+    LEFT JOIN unidades un ON un.id = cu.unidade_id
+    WHERE %(unidade_id)s::INTEGER IS NULL OR cu.unidade_id = %(unidade_id)s::INTEGER
+    ORDER BY un.nome, cu.nome, t.nome, a.nome
+'''
+
+CABECALHO_FREQUENCIA = ['Unidade', 'Curso', 'Turma', 'Aluno', 'CPF',
+                        'Chamadas', 'Faltas', 'Frequência (%)', 'Última falta']
+
+
+@tipo_tarefa('frequencia', 'csv', 'text/csv')
+def relatorio_frequencia(parametros, caminho, progresso):
+    """Frequência de cada aluno ativo na turma atual (opcional: unidade_id)"""
+    filtros = {"unidade_id": parametros.get('unidade_id')}
+    with get_db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Erro na conexão com o banco de dados")
+
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM ({SQL_RELATORIO_FREQUENCIA}) r", filtros)
+        total = cursor.fetchone()[0]
+        cursor.close()
+
+        cursor = conn.cursor(name='relatorio_frequencia')
+        cursor.itersize = LINHAS_POR_LOTE
+        cursor.execute(SQL_RELATORIO_FREQUENCIA, filtros)
+        # utf-8-sig: o Excel reconhece os acentos ao abrir o CSV
+        with open(caminho, 'w', newline='', encoding='utf-8-sig') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(CABECALHO_FREQUENCIA)
+            for numero, linha in enumerate(cursor, 1):
+                escritor.writerow(linha)
+                if numero % LINHAS_POR_LOTE == 0:
+                    progresso(numero / total)
+        cursor.close()
+        conn.rollback()
@@ -1,58 +1,58 @@
-import os
-import requests
 from flask import render_template, session, redirect, url_for, flash, request
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY")
+import supabase_client
+import autorizacao
+from cache import tabela_alterada, etag_atual, nao_modificado, com_etag
 
 def add_additional_routes(app, validar_cpf, formatar_cpf):
     """Adiciona rotas adicionais à aplicação"""
 
-    def get_headers():
-        return {
-            "apikey": SUPABASE_API_KEY,
-            "Authorization": f"Bearer {SUPABASE_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
     @app.route('/professor/turmas/<int:turma_id>/alunos')
     def listar_alunos_professor(turma_id):
         if 'user_id' not in session or session['user_type'] != 'professor':
             return redirect(url_for('login'))
 
-        # Busca turma e valida se pertence ao professor
-        turma_url = f"{SUPABASE_URL}/rest/v1/turmas?id=eq.{turma_id}&select=nome,professor_id"
-        turma_resp = requests.get(turma_url, headers=get_headers())
-        if turma_resp.status_code != 200 or not turma_resp.json():
-            flash('Turma não encontrada', 'error')
+        # Turma do professor logado, pelo cache de autorização
+        try:
+            turma = autorizacao.turma_do_usuario(session['user_id'], turma_id)
+        except autorizacao.AutorizacaoIndisponivel:
+            flash('Erro de conexão com o banco de dados', 'error')
+            return redirect(url_for('dashboard_professor'))
+        if not turma:
+            flash('Turma não encontrada ou acesso negado', 'error')
             return redirect(url_for('dashboard_professor'))
-        turma_info = turma_resp.json()[0]
 
-        # Busca alunos da turma
-        alunos_url = f"{SUPABASE_URL}/rest/v1/alunos?turma_id=eq.{turma_id}&select=id,nome,cpf,editado"
-        alunos_resp = requests.get(alunos_url, headers=get_headers())
-        alunos = alunos_resp.json() if alunos_resp.status_code == 200 else []
+        # Lista já está atualizada no aparelho: 304 sem consultar o Supabase
+        etag = etag_atual('turmas', ('alunos', turma_id))
+        resposta_304 = nao_modificado(etag)
+        if resposta_304 is not None:
+            return resposta_304
 
-        return render_template('professor/alunos.html',
-                               turma_id=turma_id,
-                               turma_nome=turma_info['nome'],
-                               alunos=alunos)
+        alunos_url = f"alunos?turma_id=eq.{turma_id}&select=id,nome,cpf,editado"
+        alunos_resp = supabase_client.get(alunos_url)
+        if alunos_resp.status_code != 200:
+            flash('Erro ao carregar alunos', 'error')
+            return redirect(url_for('dashboard_professor'))
+
+        return com_etag(render_template('professor/alunos.html',
+                                        turma_id=turma_id,
+                                        turma_nome=turma[0],
+                                        alunos=alunos_resp.json()), etag)
 
     @app.route('/professor/turmas/<int:turma_id>/alunos/novo', methods=['GET', 'POST'])
     def novo_aluno_professor(turma_id):
         if 'user_id' not in session or session['user_type'] != 'professor':
             return redirect(url_for('login'))
 
-        # Busca turma
-        turma_url = f"{SUPABASE_URL}/rest/v1/turmas?id=eq.{turma_id}&select=nome,professor_id"
-        turma_resp = requests.get(turma_url, headers=get_headers())
-        if turma_resp.status_code != 200 or not turma_resp.json():
-            flash('Turma não encontrada', 'error')
+        # Turma do professor logado, pelo cache de autorização
+        try:
+            turma = autorizacao.turma_do_usuario(session['user_id'], turma_id)
+        except autorizacao.AutorizacaoIndisponivel:
+            flash('Erro de conexão com o banco de dados', 'error')
+            return redirect(url_for('dashboard_professor'))
+        if not turma:
+            flash('Turma não encontrada ou acesso negado', 'error')
             return redirect(url_for('dashboard_professor'))
-        turma_info = turma_resp.json()[0]
+        turma_info = {'nome': turma[0], 'professor_id': turma[1]}
 
         if request.method == 'POST':
             nome = request.form['nome']
@@ -76,8 +76,9 @@ def add_additional_routes(app, validar_cpf, formatar_cpf):
                 "cpf": cpf_formatado,
                 "turma_id": turma_id
             }
-            resp = requests.post(f"{SUPABASE_URL}/rest/v1/alunos", headers=get_headers(), json=data)
+            resp = supabase_client.post("alunos", json=data)
             if resp.status_code in (200, 201):
+                tabela_alterada('alunos', turma_id)
                 flash('Aluno cadastrado com sucesso!', 'success')
                 return redirect(url_for('listar_alunos_professor', turma_id=turma_id))
             else:
@@ -95,18 +96,17 @@ def add_additional_routes(app, validar_cpf, formatar_cpf):
         if 'user_id' not in session or session['user_type'] != 'professor':
             return redirect(url_for('login'))
 
-        # Busca professor pelo usuário logado
-        prof_url = f"{SUPABASE_URL}/rest/v1/professores?usuario_id=eq.{session['user_id']}&select=id,curso_id"
-        prof_resp = requests.get(prof_url, headers=get_headers())
+        # Busca professor pelo usuário logado já com as turmas ativas embutidas
+        prof_url = (f"professores?usuario_id=eq.{session['user_id']}"
+                    "&select=id,curso_id,turmas(id)&turmas.ativo=eq.true")
+        prof_resp = supabase_client.get(prof_url)
         if prof_resp.status_code != 200 or not prof_resp.json():
             flash('Professor não encontrado', 'error')
             return redirect(url_for('dashboard_professor'))
         professor = prof_resp.json()[0]
 
         # Verifica número de turmas
-        turmas_url = f"{SUPABASE_URL}/rest/v1/turmas?professor_id=eq.{professor['id']}&ativo=eq.true&select=id"
-        turmas_resp = requests.get(turmas_url, headers=get_headers())
-        num_turmas = len(turmas_resp.json()) if turmas_resp.status_code == 200 else 0
+        num_turmas = len(professor.get('turmas') or [])
         if num_turmas >= 4:
             flash('Você já atingiu o limite de 4 turmas', 'error')
             return redirect(url_for('dashboard_professor'))
@@ -122,8 +122,9 @@ def add_additional_routes(app, validar_cpf, formatar_cpf):
                 "curso_id": professor['curso_id'],
                 "professor_id": professor['id']
             }
-            resp = requests.post(f"{SUPABASE_URL}/rest/v1/turmas", headers=get_headers(), json=data)
+            resp = supabase_client.post("turmas", json=data)
             if resp.status_code in (200, 201):
+                tabela_alterada('turmas')
                 flash('Turma criada com sucesso!', 'success')
                 return redirect(url_for('dashboard_professor'))
             else:
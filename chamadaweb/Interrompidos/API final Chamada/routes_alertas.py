@@ -0,0 +1,74 @@
+from flask import Blueprint, request, jsonify, session
+import supabase_client
+import autorizacao
+from cache import get_condicional
+
+bp_alertas = Blueprint('alertas', __name__)
+
+COLUNAS_ALERTA = ("aluno_id,turma_id,unidade_id,frequencia,total_chamadas,total_faltas,desde,"
+                  "alunos!inner(nome,cpf),turmas(nome)")
+
+@bp_alertas.before_request
+def exigir_login():
+    # Alertas trazem nomes e CPFs: master vê todas as turmas, professor só as suas
+    if 'user_id' not in session or session.get('user_type') not in ('professor', 'master'):
+        return jsonify({"success": False, "message": "Acesso negado"}), 403
+
+def _filtro_do_professor(params):
+    # Para um professor, limita params às turmas dele; None se não sobrar nenhuma
+    if session['user_type'] != 'professor':
+        return params
+    turmas = autorizacao.turmas_do_usuario(session['user_id'])
+    if 'turma_id' in params:
+        pedida = params['turma_id'][len('eq.'):]
+        return params if pedida.isdigit() and int(pedida) in turmas else None
+    if not turmas:
+        return None
+    return {**params, "turma_id": f"in.({','.join(str(turma_id) for turma_id in sorted(turmas))})"}
+
+@bp_alertas.route('/alertas/frequencia', methods=['GET'])
+@get_condicional('chamadas', 'faltas', 'alunos', 'turmas', 'professores')
+def listar_alunos_em_risco():
+    # Alunos abaixo da frequência mínima, do menor percentual para o maior.
+    # Filtros opcionais: ?turma_id=ID ou ?unidade_id=ID
+    params = {
+        "select": COLUNAS_ALERTA,
+        "alunos.ativo": "eq.true",
+        "order": "frequencia.asc,aluno_id.asc"
+    }
+    for filtro in ('turma_id', 'unidade_id'):
+        if request.args.get(filtro):
+            params[filtro] = f"eq.{request.args[filtro]}"
+    try:
+        params = _filtro_do_professor(params)
+    except autorizacao.AutorizacaoIndisponivel:
+        return jsonify({"success": False, "message": "Erro de conexão com o banco de dados"}), 503
+    if params is None:
+        return jsonify([]), 200
+    resp = supabase_client.get("alertas_frequencia", params=params)
+    return jsonify(resp.json()), resp.status_code
+
+@bp_alertas.route('/alertas/faltas-seguidas', methods=['GET'])
+@get_condicional('chamadas', 'faltas', 'alunos', 'turmas', 'professores')
+def listar_faltas_seguidas():
+    # Alunos com pelo menos ?minimo=K faltas consecutivas (padrão 3): todas as
+    # unidades para o master, só as turmas do professor para ele
+    try:
+        minimo = max(1, int(request.args.get('minimo', 3)))
+    except ValueError:
+        return jsonify({"success": False, "message": "minimo deve ser um número inteiro"}), 400
+
+    params = {
+        "select": "aluno_id,turma_id,faltas_seguidas,faltando_desde,alunos!inner(nome,cpf),turmas(nome)",
+        "faltas_seguidas": f"gte.{minimo}",
+        "alunos.ativo": "eq.true",
+        "order": "faltas_seguidas.desc,aluno_id.asc"
+    }
+    try:
+        params = _filtro_do_professor(params)
+    except autorizacao.AutorizacaoIndisponivel:
+        return jsonify({"success": False, "message": "Erro de conexão com o banco de dados"}), 503
+    if params is None:
+        return jsonify([]), 200
+    resp = supabase_client.get("sequencias_faltas", params=params)
+    return jsonify(resp.json()), resp.status_code
@@ -1,42 +1,93 @@
-import os
-import requests
-from flask import Blueprint, request, jsonify
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY")
+from flask import Blueprint, request, jsonify, Response, session, stream_with_context
+import supabase_client
+from cadastros import validar, resposta_invalida, registrar_rota_lote
+from cache import invalidar_ao_escrever, tabela_alterada
+from paginacao import buscar_pagina, exportacao_json, ler_limite, CursorInvalido
+try:
+    import importacao_alunos
+except ImportError:
+    importacao_alunos = None
+    print("numpy não instalado: importação de alunos por planilha indisponível")
 
 bp_alunos = Blueprint('alunos', __name__)
+invalidar_ao_escrever(bp_alunos, 'alunos')
+registrar_rota_lote(bp_alunos, 'alunos')
 
-def get_headers():
-    return {
-        "apikey": SUPABASE_API_KEY,
-        "Authorization": f"Bearer {SUPABASE_API_KEY}",
-        "Content-Type": "application/json"
-    }
+COLUNAS_ALUNO = "id,nome,cpf,turma_id,ativo,editado"
 
-@bp_alunos.route('/alunos', methods=['GET'])
-def listar_alunos():
+@bp_alunos.before_request
+def exigir_master():
+    # API de cadastro: só o master. Professores usam as páginas de app.py
+    if 'user_id' not in session or session.get('user_type') != 'master':
+        return jsonify({"success": False, "message": "Acesso negado"}), 403
+
+def _filtros_alunos():
     # Para filtrar por turma, envie ?turma_id=ID
     turma_id = request.args.get('turma_id')
-    url = f"{SUPABASE_URL}/rest/v1/alunos?select=*"
-    if turma_id:
-        url += f"&turma_id=eq.{turma_id}"
-    resp = requests.get(url, headers=get_headers())
-    return jsonify(resp.json()), resp.status_code
+    return {"turma_id": f"eq.{turma_id}"} if turma_id else {}
+
+@bp_alunos.route('/alunos/lista', methods=['GET'])
+def listar_alunos():
+    # Paginado por (nome, id): ?limit=N e, para a próxima página,
+    # ?cursor=<valor do header X-Proximo-Cursor da resposta anterior>
+    try:
+        resp, alunos, proximo_cursor = buscar_pagina('alunos', COLUNAS_ALUNO, ler_limite(),
+                                                     request.args.get('cursor'), _filtros_alunos())
+    except CursorInvalido:
+        return jsonify({"message": "Cursor inválido"}), 400
+    if alunos is None:
+        return jsonify(resp.json()), resp.status_code
+    response = jsonify(alunos)
+    if proximo_cursor:
+        response.headers['X-Proximo-Cursor'] = proximo_cursor
+    return response
+
+@bp_alunos.route('/alunos/exportar', methods=['GET'])
+def exportar_alunos():
+    # Exportação completa em JSON, gerada em streaming página por página
+    exportacao = exportacao_json('alunos', COLUNAS_ALUNO, _filtros_alunos())
+    return Response(stream_with_context(exportacao), mimetype='application/json')
 
 @bp_alunos.route('/alunos', methods=['POST'])
 def criar_aluno():
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/alunos"
-    resp = requests.post(url, headers=get_headers(), json=data)
+    data, erros = validar('alunos', request.get_json(silent=True))
+    if erros:
+        return resposta_invalida(erros)
+    url = "alunos"
+    resp = supabase_client.post(url, json=data)
     return jsonify(resp.json()), resp.status_code
 
 @bp_alunos.route('/alunos/<int:aluno_id>', methods=['PATCH'])
 def editar_aluno(aluno_id):
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/alunos?id=eq.{aluno_id}"
-    resp = requests.patch(url, headers=get_headers(), json=data)
-    return jsonify(resp.json()), resp.status_code
\ No newline at end of file
+    data, erros = validar('alunos', request.get_json(silent=True), parcial=True)
+    if erros:
+        return resposta_invalida(erros)
+    url = f"alunos?id=eq.{aluno_id}"
+    resp = supabase_client.patch(url, json=data)
+    return jsonify(resp.json()), resp.status_code
+
+@bp_alunos.route('/alunos/importar', methods=['POST'])
+def importar_alunos():
+    # multipart/form-data: arquivo (.csv ou .xlsx), turma_id e, para só conferir
+    # a planilha sem gravar, simular=1. Responde o relatório com os erros por linha.
+    if importacao_alunos is None:
+        return jsonify({"success": False, "message": "Importação indisponível (numpy não instalado)"}), 503
+
+    arquivo = request.files.get('arquivo')
+    turma_id = request.form.get('turma_id', '')
+    if not arquivo or not turma_id.isdigit():
+        return jsonify({"success": False, "message": "Envie o arquivo e o turma_id"}), 400
+    simular = request.form.get('simular', '').lower() in ('1', 'true', 'sim')
+
+    try:
+        relatorio = importacao_alunos.importar_planilha(arquivo.stream, arquivo.filename or '',
+                                                        int(turma_id), simular)
+    except importacao_alunos.ErroImportacao as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        print(f"Erro ao importar alunos: {e}")
+        return jsonify({"success": False, "message": "Erro ao importar alunos"}), 500
+
+    if relatorio['importados'] and not simular:
+        tabela_alterada('alunos', int(turma_id))
+    return jsonify({"success": True, **relatorio}), 200
@@ -0,0 +1,17 @@
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, session, stream_with_context
+from backup import exportacao_gzip
+
+bp_backup = Blueprint('backup', __name__)
+
+@bp_backup.route('/backup/export', methods=['GET'])
+def exportar_backup():
+    # Backup completo (inclui hashes de senha): só para o usuário master
+    if 'user_id' not in session or session.get('user_type') != 'master':
+        return jsonify({"success": False, "message": "Acesso negado"}), 403
+
+    nome = f"backup-{datetime.now():%Y%m%d-%H%M}.sql.gz"
+    # Sem Content-Length: a resposta vai em chunks conforme o COPY avança
+    return Response(stream_with_context(exportacao_gzip()),
+                    mimetype='application/gzip',
+                    headers={'Content-Disposition': f'attachment; filename="{nome}"'})
@@ -1,57 +1,49 @@
-import os
-import requests
-from flask import Blueprint, request, jsonify
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY")
+from flask import Blueprint, request, jsonify, session
+import supabase_client
+import autorizacao
+from cache import invalidar_ao_escrever
 
 bp_chamadas = Blueprint('chamadas', __name__)
-
-def get_headers():
-    return {
-        "apikey": SUPABASE_API_KEY,
-        "Authorization": f"Bearer {SUPABASE_API_KEY}",
-        "Content-Type": "application/json"
-    }
+invalidar_ao_escrever(bp_chamadas, 'chamadas', 'faltas')
 
 @bp_chamadas.route('/chamadas', methods=['POST'])
 def registrar_chamada():
     # Espera JSON: turma_id, data_chamada, hora_chamada, professor_id, faltas (lista de aluno_id)
-    data = request.get_json()
-    turma_id = data.get('turma_id')
-    data_chamada = data.get('data_chamada')
-    hora_chamada = data.get('hora_chamada')
+    # e, opcionalmente, chave_idempotencia (ou o header Idempotency-Key) para que
+    # reenvios da mesma chamada não a dupliquem. Para um professor, professor_id
+    # vem da sessão e a turma precisa ser dele.
+    if 'user_id' not in session or session.get('user_type') not in ('professor', 'master'):
+        return jsonify({"success": False, "message": "Acesso negado"}), 403
+    data = request.get_json(silent=True) or {}
     professor_id = data.get('professor_id')
-    faltas = data.get('faltas', [])
-
-    # Cria chamada
-    chamada_payload = {
-        "turma_id": turma_id,
-        "data_chamada": data_chamada,
-        "hora_chamada": hora_chamada,
-        "professor_id": professor_id
+    if session['user_type'] == 'professor':
+        try:
+            turma = autorizacao.turma_do_usuario(session['user_id'], int(data.get('turma_id')))
+        except (TypeError, ValueError):
+            turma = None
+        if not turma:
+            return jsonify({"success": False, "message": "Turma não encontrada ou acesso negado"}), 403
+        professor_id = turma[1]
+    chave = request.headers.get('Idempotency-Key') or data.get('chave_idempotencia')
+
+    # Chamada e faltas são gravadas na mesma transação pela função registrar_chamada
+    payload = {
+        "p_turma_id": data.get('turma_id'),
+        "p_data_chamada": data.get('data_chamada'),
+        "p_hora_chamada": data.get('hora_chamada'),
+        "p_professor_id": professor_id,
+        "p_faltas": data.get('faltas', []),
+        "p_chave_idempotencia": chave
     }
-    chamada_resp = requests.post(f"{SUPABASE_URL}/rest/v1/chamadas", headers=get_headers(), json=chamada_payload)
-    if chamada_resp.status_code not in (200, 201):
+    resp = supabase_client.post("rpc/registrar_chamada", json=payload)
+    if resp.status_code != 200 or not resp.json():
         return jsonify({"success": False, "message": "Erro ao registrar chamada"}), 400
 
-    chamada_id = chamada_resp.json()[0]['id']
-
-    # Registra faltas
-    faltas_payload = []
-    for aluno_id in faltas:
-        faltas_payload.append({
-            "chamada_id": chamada_id,
-            "aluno_id": aluno_id,
-            "data_falta": data_chamada,
-            "hora_falta": hora_chamada
-        })
-    if faltas_payload:
-        faltas_resp = requests.post(f"{SUPABASE_URL}/rest/v1/faltas", headers=get_headers(), json=faltas_payload)
-        if faltas_resp.status_code not in (200, 201):
-            return jsonify({"success": False, "message": "Erro ao registrar faltas"}), 400
-
-    return jsonify({"success": True, "message": "Chamada registrada com sucesso"}), 201
\ No newline at end of file
+    resultado = resp.json()[0]
+    return jsonify({
+        "success": True,
+        "message": "Chamada registrada com sucesso",
+        "chamada_id": resultado['id_chamada'],
+        "faltas": resultado['faltas_registradas'],
+        "repetida": resultado['repetida']
+    }), 200 if resultado['repetida'] else 201
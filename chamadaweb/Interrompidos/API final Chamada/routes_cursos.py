@@ -1,44 +1,39 @@
-import os
-import requests
 from flask import Blueprint, request, jsonify
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY")
+import supabase_client
+from cadastros import validar, resposta_invalida, registrar_rota_lote
+from cache import invalidar_ao_escrever, get_condicional
 
 bp_cursos = Blueprint('cursos', __name__)
-
-def get_headers():
-    return {
-        "apikey": SUPABASE_API_KEY,
-        "Authorization": f"Bearer {SUPABASE_API_KEY}",
-        "Content-Type": "application/json"
-    }
+invalidar_ao_escrever(bp_cursos, 'cursos')
+registrar_rota_lote(bp_cursos, 'cursos')
 
 @bp_cursos.route('/cursos', methods=['GET'])
+@get_condicional('cursos')
 def listar_cursos():
-    url = f"{SUPABASE_URL}/rest/v1/cursos?select=*"
-    resp = requests.get(url, headers=get_headers())
+    url = "cursos?select=*"
+    resp = supabase_client.get(url)
     return jsonify(resp.json()), resp.status_code
 
 @bp_cursos.route('/cursos', methods=['POST'])
 def criar_curso():
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/cursos"
-    resp = requests.post(url, headers=get_headers(), json=data)
+    data, erros = validar('cursos', request.get_json(silent=True))
+    if erros:
+        return resposta_invalida(erros)
+    url = "cursos"
+    resp = supabase_client.post(url, json=data)
     return jsonify(resp.json()), resp.status_code
 
 @bp_cursos.route('/cursos/<int:curso_id>', methods=['PATCH'])
 def editar_curso(curso_id):
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/cursos?id=eq.{curso_id}"
-    resp = requests.patch(url, headers=get_headers(), json=data)
+    data, erros = validar('cursos', request.get_json(silent=True), parcial=True)
+    if erros:
+        return resposta_invalida(erros)
+    url = f"cursos?id=eq.{curso_id}"
+    resp = supabase_client.patch(url, json=data)
     return jsonify(resp.json()), resp.status_code
 
 @bp_cursos.route('/cursos/<int:curso_id>', methods=['DELETE'])
 def deletar_curso(curso_id):
-    url = f"{SUPABASE_URL}/rest/v1/cursos?id=eq.{curso_id}"
-    resp = requests.delete(url, headers=get_headers())
+    url = f"cursos?id=eq.{curso_id}"
+    resp = supabase_client.delete(url)
     return jsonify(resp.json()), resp.status_code
\ No newline at end of file
@@ -0,0 +1,25 @@
+import hmac
+from flask import Blueprint, Response, request, jsonify
+from config import Config
+import consultas_lentas
+import metricas
+
+bp_metricas = Blueprint('metricas', __name__)
+
+@bp_metricas.before_request
+def exigir_token():
+    # Com METRICAS_TOKEN definido, só com Authorization: Bearer <token>
+    if Config.METRICAS_TOKEN:
+        esperado = f"Bearer {Config.METRICAS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), esperado):
+            return jsonify({"success": False, "message": "Acesso negado"}), 403
+
+@bp_metricas.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    # Formato texto do Prometheus
+    return Response(metricas.exportar_texto(), mimetype='text/plain; version=0.0.4')
+
+@bp_metricas.route('/metrics/consultas', methods=['GET'])
+def listar_consultas():
+    # Acumulado por impressão digital do SQL, com o último plano das lentas
+    return jsonify(consultas_lentas.estatisticas()), 200
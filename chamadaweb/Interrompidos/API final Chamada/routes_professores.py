@@ -1,44 +1,38 @@
-import os
-import requests
 from flask import Blueprint, request, jsonify
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY")
+import supabase_client
+from cadastros import validar, resposta_invalida, registrar_rota_lote
+from cache import invalidar_ao_escrever
 
 bp_professores = Blueprint('professores', __name__)
-
-def get_headers():
-    return {
-        "apikey": SUPABASE_API_KEY,
-        "Authorization": f"Bearer {SUPABASE_API_KEY}",
-        "Content-Type": "application/json"
-    }
+invalidar_ao_escrever(bp_professores, 'professores')
+registrar_rota_lote(bp_professores, 'professores')
 
 @bp_professores.route('/professores', methods=['GET'])
 def listar_professores():
-    url = f"{SUPABASE_URL}/rest/v1/professores?select=*"
-    resp = requests.get(url, headers=get_headers())
+    url = "professores?select=*"
+    resp = supabase_client.get(url)
     return jsonify(resp.json()), resp.status_code
 
 @bp_professores.route('/professores', methods=['POST'])
 def criar_professor():
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/professores"
-    resp = requests.post(url, headers=get_headers(), json=data)
+    data, erros = validar('professores', request.get_json(silent=True))
+    if erros:
+        return resposta_invalida(erros)
+    url = "professores"
+    resp = supabase_client.post(url, json=data)
     return jsonify(resp.json()), resp.status_code
 
 @bp_professores.route('/professores/<int:professor_id>', methods=['PATCH'])
 def editar_professor(professor_id):
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/professores?id=eq.{professor_id}"
-    resp = requests.patch(url, headers=get_headers(), json=data)
+    data, erros = validar('professores', request.get_json(silent=True), parcial=True)
+    if erros:
+        return resposta_invalida(erros)
+    url = f"professores?id=eq.{professor_id}"
+    resp = supabase_client.patch(url, json=data)
     return jsonify(resp.json()), resp.status_code
 
 @bp_professores.route('/professores/<int:professor_id>', methods=['DELETE'])
 def deletar_professor(professor_id):
-    url = f"{SUPABASE_URL}/rest/v1/professores?id=eq.{professor_id}"
-    resp = requests.delete(url, headers=get_headers())
+    url = f"professores?id=eq.{professor_id}"
+    resp = supabase_client.delete(url)
     return jsonify(resp.json()), resp.status_code
\ No newline at end of file
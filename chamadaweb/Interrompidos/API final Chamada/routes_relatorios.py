@@ -0,0 +1,63 @@
+from flask import Blueprint, request, jsonify, send_file, url_for, session
+import tarefas
+import relatorios  # registra os tipos de relatório na fila
+try:
+    import relatorio_semestral  # noqa: F401 (requer pandas e openpyxl)
+except ImportError:
+    print("pandas não instalado: relatório semestral indisponível")
+
+bp_relatorios = Blueprint('relatorios', __name__)
+
+@bp_relatorios.before_request
+def exigir_master():
+    # Relatórios cobrem todas as unidades (nomes e CPFs): só para o usuário master
+    if 'user_id' not in session or session.get('user_type') != 'master':
+        return jsonify({"success": False, "message": "Acesso negado"}), 403
+
+def _resposta_estado(estado):
+    resposta = {chave: estado[chave] for chave in
+                ('id', 'tipo', 'status', 'progresso', 'erro', 'criada_em', 'finalizada_em')}
+    resposta['status_url'] = url_for('relatorios.status_relatorio', tarefa_id=estado['id'])
+    if estado['status'] == tarefas.CONCLUIDA:
+        resposta['download_url'] = url_for('relatorios.baixar_relatorio', tarefa_id=estado['id'])
+    return resposta
+
+@bp_relatorios.route('/reports/generate', methods=['POST'])
+def gerar_relatorio():
+    # Espera JSON: {"tipo": "frequencia", "unidade_id": 1} (ambos opcionais)
+    # Relatório semestral: {"tipo": "semestral" | "semestral_csv", "inicio": "2025-02-01", "fim": "2025-06-30"}
+    # Responde 202 na hora; acompanhe pelo status_url
+    data = request.get_json(silent=True) or {}
+    tipo = data.pop('tipo', 'frequencia')
+    if data.get('unidade_id') is not None and not str(data['unidade_id']).isdigit():
+        return jsonify({"success": False, "message": "unidade_id inválido"}), 400
+    try:
+        estado = tarefas.enfileirar(tipo, data)
+    except tarefas.TipoTarefaDesconhecido:
+        return jsonify({"success": False, "message": f"Tipo de relatório desconhecido: {tipo}"}), 400
+    except tarefas.FilaCheia:
+        resposta = jsonify({"success": False, "message": "Muitos relatórios em andamento; tente de novo em instantes"})
+        resposta.headers['Retry-After'] = '30'
+        return resposta, 429
+
+    resposta = jsonify(_resposta_estado(estado))
+    resposta.headers['Location'] = url_for('relatorios.status_relatorio', tarefa_id=estado['id'])
+    return resposta, 202
+
+@bp_relatorios.route('/reports/jobs/<tarefa_id>', methods=['GET'])
+def status_relatorio(tarefa_id):
+    estado = tarefas.obter_estado(tarefa_id)
+    if not estado:
+        return jsonify({"success": False, "message": "Relatório não encontrado ou expirado"}), 404
+    return jsonify(_resposta_estado(estado)), 200
+
+@bp_relatorios.route('/reports/jobs/<tarefa_id>/download', methods=['GET'])
+def baixar_relatorio(tarefa_id):
+    estado = tarefas.obter_estado(tarefa_id)
+    if not estado:
+        return jsonify({"success": False, "message": "Relatório não encontrado ou expirado"}), 404
+    if estado['status'] != tarefas.CONCLUIDA:
+        return jsonify(_resposta_estado(estado)), 409
+    return send_file(tarefas.caminho_resultado(estado), mimetype=estado['mimetype'],
+                     as_attachment=True,
+                     download_name=f"relatorio-{estado['tipo']}.{estado['extensao']}")
@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify, session
+import supabase_client
+import autorizacao
+import referencias
+from cache import invalidar_ao_escrever
+
+bp_sync = Blueprint('sync', __name__)
+invalidar_ao_escrever(bp_sync, 'chamadas', 'faltas')
+
+@bp_sync.before_request
+def exigir_login():
+    if 'user_id' not in session or session.get('user_type') not in ('professor', 'master'):
+        return jsonify({"success": False, "message": "Acesso negado"}), 403
+
+@bp_sync.route('/sync', methods=['GET'])
+def sincronizar():
+    # Devolve só o que mudou desde ?cursor= (omitido na primeira carga) e o novo cursor.
+    # Com "completo": true (primeira carga, ou cursor mais antigo que a retenção
+    # das remoções) a resposta traz tudo e substitui os dados do aparelho.
+    # Um professor recebe só as suas turmas; o master pode limitar com ?professor_id=ID.
+    params = {}
+    cursor = request.args.get('cursor')
+    if cursor:
+        if not cursor.isdigit():
+            return jsonify({"success": False, "message": "Cursor inválido"}), 400
+        params['p_cursor'] = cursor
+    if session['user_type'] == 'professor':
+        try:
+            professor = referencias.obter().professor_do_usuario(session['user_id'])
+        except referencias.ReferenciasIndisponiveis:
+            return jsonify({"success": False, "message": "Erro de conexão com o banco de dados"}), 503
+        if not professor:
+            return jsonify({"success": False, "message": "Professor não encontrado ou não vinculado"}), 403
+        params['p_professor_id'] = professor[0]
+    elif request.args.get('professor_id'):
+        params['p_professor_id'] = request.args['professor_id']
+    resp = supabase_client.get("rpc/sincronizar", params=params)
+    return jsonify(resp.json()), resp.status_code
+
+@bp_sync.route('/sync/chamadas', methods=['POST'])
+def enviar_chamadas_offline():
+    # Espera JSON: lista de chamadas no formato do POST /chamadas, cada uma com
+    # chave_idempotencia. Reenviar o mesmo lote não duplica nada. Para um
+    # professor, chamadas de turmas que não são dele voltam com erro e
+    # professor_id vem da turma.
+    chamadas = request.get_json(silent=True)
+    if not isinstance(chamadas, list) or not all(isinstance(c, dict) for c in chamadas):
+        return jsonify({"success": False, "message": "Envie uma lista de chamadas"}), 400
+
+    resultados = [None] * len(chamadas)
+    enviadas = []
+    for posicao, chamada in enumerate(chamadas):
+        if session['user_type'] == 'professor':
+            try:
+                turma = autorizacao.turma_do_usuario(session['user_id'], int(chamada.get('turma_id')))
+            except (TypeError, ValueError):
+                turma = None
+            if not turma:
+                resultados[posicao] = {"chave": chamada.get('chave_idempotencia'), "id_chamada": None,
+                                       "faltas_registradas": None, "repetida": None,
+                                       "erro": "Turma não encontrada ou acesso negado"}
+                continue
+            chamada = {**chamada, "professor_id": turma[1]}
+        enviadas.append((posicao, chamada))
+
+    if enviadas:
+        resp = supabase_client.post("rpc/registrar_chamadas_lote",
+                                    json={"p_chamadas": [chamada for _, chamada in enviadas]})
+        if resp.status_code != 200:
+            return jsonify({"success": False, "message": "Erro ao registrar chamadas"}), 400
+        for (posicao, _), resultado in zip(enviadas, resp.json()):
+            resultados[posicao] = resultado
+
+    return jsonify({
+        "success": all(r['erro'] is None for r in resultados),
+        "resultados": resultados
+    }), 200
@@ -1,35 +1,62 @@
-import os
-import requests
 from flask import Blueprint, request, jsonify, session
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY")
+import supabase_client
+import autorizacao
+from cadastros import validar, resposta_invalida, registrar_rota_lote
+from cache import invalidar_ao_escrever, get_condicional
 
 bp_turmas = Blueprint('turmas', __name__)
-
-def get_headers():
-    return {
-        "apikey": SUPABASE_API_KEY,
-        "Authorization": f"Bearer {SUPABASE_API_KEY}",
-        "Content-Type": "application/json"
-    }
+invalidar_ao_escrever(bp_turmas, 'turmas')
+registrar_rota_lote(bp_turmas, 'turmas')
 
 @bp_turmas.route('/turmas', methods=['GET'])
+@get_condicional('turmas')
 def listar_turmas():
     # Para filtrar por professor, envie ?professor_id=ID
     professor_id = request.args.get('professor_id')
-    url = f"{SUPABASE_URL}/rest/v1/turmas?select=*"
+    url = "turmas?select=*"
     if professor_id:
         url += f"&professor_id=eq.{professor_id}"
-    resp = requests.get(url, headers=get_headers())
+    resp = supabase_client.get(url)
     return jsonify(resp.json()), resp.status_code
 
 @bp_turmas.route('/turmas', methods=['POST'])
 def criar_turma():
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/turmas"
-    resp = requests.post(url, headers=get_headers(), json=data)
-    return jsonify(resp.json()), resp.status_code
\ No newline at end of file
+    data, erros = validar('turmas', request.get_json(silent=True))
+    if erros:
+        return resposta_invalida(erros)
+    url = "turmas"
+    resp = supabase_client.post(url, json=data)
+    return jsonify(resp.json()), resp.status_code
+
+@bp_turmas.route('/turmas/<int:turma_id>/frequencia', methods=['GET'])
+def frequencia_turma(turma_id):
+    # Master vê qualquer turma; professor só as suas
+    if 'user_id' not in session or session.get('user_type') not in ('professor', 'master'):
+        return jsonify({"success": False, "message": "Acesso negado"}), 403
+    if session['user_type'] == 'professor':
+        try:
+            turma = autorizacao.turma_do_usuario(session['user_id'], turma_id)
+        except autorizacao.AutorizacaoIndisponivel:
+            return jsonify({"success": False, "message": "Erro de conexão com o banco de dados"}), 503
+        if not turma:
+            return jsonify({"success": False, "message": "Turma não encontrada ou acesso negado"}), 403
+
+    # Lê o resumo mantido em frequencia_alunos: uma linha por aluno, sem varrer as faltas
+    url = (f"frequencia_alunos?turma_id=eq.{turma_id}"
+           "&select=aluno_id,total_chamadas,total_faltas,ultima_falta,alunos(nome)")
+    resp = supabase_client.get(url)
+    if resp.status_code != 200:
+        return jsonify(resp.json()), resp.status_code
+
+    resumo = []
+    for linha in resp.json():
+        total = linha['total_chamadas']
+        resumo.append({
+            "aluno_id": linha['aluno_id'],
+            "nome": (linha.get('alunos') or {}).get('nome'),
+            "total_chamadas": total,
+            "total_faltas": linha['total_faltas'],
+            "ultima_falta": linha['ultima_falta'],
+            "frequencia": round(100 * (total - linha['total_faltas']) / total, 1) if total else None
+        })
+    return jsonify(resumo), 200
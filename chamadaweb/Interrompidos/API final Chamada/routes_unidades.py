@@ -1,44 +1,39 @@
-import os
-import requests
-from flask import Blueprint, request, jsonify, session
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY")
+from flask import Blueprint, request, jsonify
+import supabase_client
+from cadastros import validar, resposta_invalida, registrar_rota_lote
+from cache import invalidar_ao_escrever, get_condicional
 
 bp_unidades = Blueprint('unidades', __name__)
-
-def get_headers():
-    return {
-        "apikey": SUPABASE_API_KEY,
-        "Authorization": f"Bearer {SUPABASE_API_KEY}",
-        "Content-Type": "application/json"
-    }
+invalidar_ao_escrever(bp_unidades, 'unidades')
+registrar_rota_lote(bp_unidades, 'unidades')
 
 @bp_unidades.route('/unidades', methods=['GET'])
+@get_condicional('unidades')
 def listar_unidades():
-    url = f"{SUPABASE_URL}/rest/v1/unidades?select=*"
-    resp = requests.get(url, headers=get_headers())
+    url = "unidades?select=*"
+    resp = supabase_client.get(url)
     return jsonify(resp.json()), resp.status_code
 
 @bp_unidades.route('/unidades', methods=['POST'])
 def criar_unidade():
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/unidades"
-    resp = requests.post(url, headers=get_headers(), json=data)
+    data, erros = validar('unidades', request.get_json(silent=True))
+    if erros:
+        return resposta_invalida(erros)
+    url = "unidades"
+    resp = supabase_client.post(url, json=data)
     return jsonify(resp.json()), resp.status_code
 
 @bp_unidades.route('/unidades/<int:unidade_id>', methods=['PATCH'])
 def editar_unidade(unidade_id):
-    data = request.get_json()
-    url = f"{SUPABASE_URL}/rest/v1/unidades?id=eq.{unidade_id}"
-    resp = requests.patch(url, headers=get_headers(), json=data)
+    data, erros = validar('unidades', request.get_json(silent=True), parcial=True)
+    if erros:
+        return resposta_invalida(erros)
+    url = f"unidades?id=eq.{unidade_id}"
+    resp = supabase_client.patch(url, json=data)
     return jsonify(resp.json()), resp.status_code
 
 @bp_unidades.route('/unidades/<int:unidade_id>', methods=['DELETE'])
 def deletar_unidade(unidade_id):
-    url = f"{SUPABASE_URL}/rest/v1/unidades?id=eq.{unidade_id}"
-    resp = requests.delete(url, headers=get_headers())
+    url = f"unidades?id=eq.{unidade_id}"
+    resp = supabase_client.delete(url)
     return jsonify(resp.json()), resp.status_code
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Cliente HTTP compartilhado para a API REST do Supabase (PostgREST).
+
+Todos os blueprints usam este módulo em vez de chamar requests.get/post direto:
+- uma requests.Session por processo, com pool de conexões keep-alive (sem novo
+  handshake TLS a cada chamada);
+- timeout padrão em todas as requisições;
+- novas tentativas limitadas, com backoff, para 429 e 5xx em métodos idempotentes;
+- medição de latência por método/tabela (ver estatisticas() e metricas.py).
+
+Os caminhos são relativos a /rest/v1, por exemplo:
+    supabase_client.get(f"turmas?id=eq.{turma_id}&select=nome,professor_id")
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metricas
+from config import Config
+
+
+def get_headers():
+    return {
+        "apikey": Config.SUPABASE_API_KEY,
+        "Authorization": f"Bearer {Config.SUPABASE_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+
+def _criar_sessao():
+    retry = Retry(
+        total=Config.SUPABASE_RETRIES,
+        backoff_factor=Config.SUPABASE_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        # POST não é repetido: inserir duas vezes criaria registros duplicados
+        allowed_methods=frozenset(['GET', 'HEAD', 'PATCH', 'PUT', 'DELETE']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1,
+                          pool_maxsize=Config.SUPABASE_POOL_SIZE,
+                          max_retries=retry)
+    sessao = requests.Session()
+    sessao.headers.update(get_headers())
+    sessao.mount('https://', adapter)
+    sessao.mount('http://', adapter)
+    return sessao
+
+
+_sessao = None
+_sessao_lock = threading.Lock()
+
+
+def get_sessao():
+    """Sessão HTTP única por processo"""
+    global _sessao
+    if _sessao is None:
+        with _sessao_lock:
+            if _sessao is None:
+                _sessao = _criar_sessao()
+    return _sessao
+
+
+# Latência por (método, tabela): chamadas, erros, tempo total e máximo em ms
+_estatisticas = {}
+_estatisticas_lock = threading.Lock()
+
+
+def _tabela(caminho):
+    return caminho.split('?', 1)[0].strip('/')
+
+
+def _registrar(metodo, tabela, status, duracao_ms):
+    with _estatisticas_lock:
+        item = _estatisticas.setdefault((metodo, tabela), {
+            'chamadas': 0, 'erros': 0, 'total_ms': 0.0, 'max_ms': 0.0
+        })
+        item['chamadas'] += 1
+        item['total_ms'] += duracao_ms
+        item['max_ms'] = max(item['max_ms'], duracao_ms)
+        if status == 0 or status >= 400:
+            item['erros'] += 1
+    metricas.SUPABASE_DURACAO.observar(duracao_ms / 1000, metodo, tabela)
+    metricas.SUPABASE_RESPOSTAS.inc(metodo, tabela, str(status))
+    if duracao_ms >= Config.SUPABASE_SLOW_MS:
+        print(f"Supabase lento: {metodo} {tabela} {status} {duracao_ms:.0f}ms")
+
+
+def estatisticas():
+    """Cópia das latências acumuladas, chaveadas por 'MÉTODO tabela'"""
+    with _estatisticas_lock:
+        return {f"{metodo} {tabela}": dict(item)
+                for (metodo, tabela), item in _estatisticas.items()}
+
+
+def requisitar(metodo, caminho, **kwargs):
+    """Faz a requisição em /rest/v1/<caminho> pela sessão compartilhada"""
+    kwargs.setdefault('timeout', (Config.SUPABASE_CONNECT_TIMEOUT, Config.SUPABASE_READ_TIMEOUT))
+    url = f"{Config.SUPABASE_URL}/rest/v1/{caminho.lstrip('/')}"
+    status = 0
+    inicio = time.perf_counter()
+    try:
+        resp = get_sessao().request(metodo, url, **kwargs)
+        status = resp.status_code
+        return resp
+    finally:
+        _registrar(metodo, _tabela(caminho), status, (time.perf_counter() - inicio) * 1000)
+
+
+def get(caminho, **kwargs):
+    return requisitar('GET', caminho, **kwargs)
+
+
+def post(caminho, **kwargs):
+    return requisitar('POST', caminho, **kwargs)
+
+
+def patch(caminho, **kwargs):
+    return requisitar('PATCH', caminho, **kwargs)
+
+
+def delete(caminho, **kwargs):
+    return requisitar('DELETE', caminho, **kwargs)
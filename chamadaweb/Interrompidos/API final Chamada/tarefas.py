@@ -0,0 +1,186 @@
+"""
+Fila local de tarefas em segundo plano (geração de relatórios).
+
+enfileirar() grava o estado da tarefa e a entrega a um pool de threads; a
+requisição volta na hora com o id. O estado (status, progresso, erro) e o
+arquivo de resultado ficam em Config.RELATORIOS_DIR, então qualquer worker da
+mesma máquina responde à consulta de status, não só o que recebeu o pedido.
+Tarefas finalizadas expiram depois de Config.RELATORIOS_EXPIRACAO segundos, e
+no máximo Config.RELATORIOS_PENDENTES_MAXIMO ficam na fila ou em andamento.
+
+Um tipo de tarefa é uma função registrada com @tipo_tarefa('nome') que recebe
+(parametros, caminho, progresso): grava o resultado em `caminho` e chama
+progresso(fração) de vez em quando.
+"""
+import json
+import os
+import re
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+NA_FILA = 'na_fila'
+EM_ANDAMENTO = 'em_andamento'
+CONCLUIDA = 'concluida'
+FALHOU = 'falhou'
+
+# Intervalo mínimo entre gravações de progresso (segundos)
+INTERVALO_PROGRESSO = 0.5
+
+_tipos = {}
+_executor = None
+_executor_lock = threading.Lock()
+_enfileirar_lock = threading.Lock()
+
+
+class TipoTarefaDesconhecido(ValueError):
+    """Nenhuma função registrada para o tipo pedido"""
+
+
+class FilaCheia(Exception):
+    """Já há Config.RELATORIOS_PENDENTES_MAXIMO tarefas pendentes"""
+
+
+def tipo_tarefa(nome, extensao, mimetype):
+    """Registra a função que gera o resultado de um tipo de tarefa"""
+    def decorator(funcao):
+        _tipos[nome] = (funcao, extensao, mimetype)
+        return funcao
+    return decorator
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.RELATORIOS_WORKERS,
+                                           thread_name_prefix='tarefa')
+        return _executor
+
+
+def _pasta():
+    os.makedirs(Config.RELATORIOS_DIR, exist_ok=True)
+    return Config.RELATORIOS_DIR
+
+
+def _caminho_estado(tarefa_id):
+    return os.path.join(_pasta(), f"{tarefa_id}.json")
+
+
+def caminho_resultado(estado):
+    return os.path.join(_pasta(), f"{estado['id']}.{estado['extensao']}")
+
+
+def _gravar_estado(estado):
+    # Grava em arquivo temporário e renomeia: quem lê nunca vê JSON pela metade
+    caminho = _caminho_estado(estado['id'])
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def obter_estado(tarefa_id):
+    """Estado da tarefa, ou None se não existe ou já expirou"""
+    if not re.fullmatch(r'[0-9a-f]{32}', tarefa_id):
+        return None
+    try:
+        with open(_caminho_estado(tarefa_id), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def enfileirar(tipo, parametros):
+    """Cria a tarefa e a coloca na fila; retorna o estado inicial"""
+    if tipo not in _tipos:
+        raise TipoTarefaDesconhecido(tipo)
+    limpar_expiradas()
+
+    with _enfileirar_lock:
+        # Conta as tarefas de todos os workers da máquina (mesma pasta); entre
+        # processos o limite é aproximado
+        if contar_pendentes() >= Config.RELATORIOS_PENDENTES_MAXIMO:
+            raise FilaCheia()
+        estado = _novo_estado(tipo, parametros)
+        _gravar_estado(estado)
+    _get_executor().submit(_executar, estado)
+    return estado
+
+
+def _novo_estado(tipo, parametros):
+    _funcao, extensao, mimetype = _tipos[tipo]
+    estado = {
+        "id": uuid.uuid4().hex,
+        "tipo": tipo,
+        "parametros": parametros,
+        "status": NA_FILA,
+        "progresso": 0.0,
+        "extensao": extensao,
+        "mimetype": mimetype,
+        "erro": None,
+        "criada_em": time.time(),
+        "finalizada_em": None,
+    }
+    return estado
+
+
+def contar_pendentes():
+    """Tarefas na fila ou em andamento. Uma tarefa pendente de um worker que
+    morreu nunca termina: deixa de contar depois da expiração"""
+    limite = time.time() - Config.RELATORIOS_EXPIRACAO
+    pendentes = 0
+    for arquivo in os.listdir(_pasta()):
+        if not arquivo.endswith('.json'):
+            continue
+        estado = obter_estado(arquivo[:-len('.json')])
+        if estado and estado['status'] in (NA_FILA, EM_ANDAMENTO) and estado['criada_em'] >= limite:
+            pendentes += 1
+    return pendentes
+
+
+def _executar(estado):
+    funcao = _tipos[estado['tipo']][0]
+    estado.update(status=EM_ANDAMENTO)
+    _gravar_estado(estado)
+
+    ultima_gravacao = [time.monotonic()]
+
+    def progresso(fracao):
+        agora = time.monotonic()
+        if agora - ultima_gravacao[0] >= INTERVALO_PROGRESSO:
+            estado['progresso'] = round(min(max(fracao, 0.0), 1.0), 3)
+            _gravar_estado(estado)
+            ultima_gravacao[0] = agora
+
+    caminho = caminho_resultado(estado)
+    try:
+        funcao(estado['parametros'], caminho, progresso)
+        estado.update(status=CONCLUIDA, progresso=1.0)
+    except Exception as e:
+        traceback.print_exc()
+        estado.update(status=FALHOU, erro=str(e))
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    estado['finalizada_em'] = time.time()
+    _gravar_estado(estado)
+
+
+def limpar_expiradas():
+    """Remove estado e resultado das tarefas finalizadas há mais tempo que a expiração"""
+    limite = time.time() - Config.RELATORIOS_EXPIRACAO
+    for arquivo in os.listdir(_pasta()):
+        if not arquivo.endswith('.json'):
+            continue
+        estado = obter_estado(arquivo[:-len('.json')])
+        if not estado or not estado['finalizada_em'] or estado['finalizada_em'] >= limite:
+            continue
+        for caminho in (caminho_resultado(estado), _caminho_estado(estado['id'])):
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
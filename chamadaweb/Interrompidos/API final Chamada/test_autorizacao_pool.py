@@ -0,0 +1,109 @@
+# test_autorizacao_pool.py
+# DB_POOL_MAX + 1 requisições simultâneas à edição de aluno, todas com falta
+# no cache de autorização: nenhuma pode esperar o pool até o timeout. (Com a
+# conferência da turma dentro de `with get_db_connection()`, cada requisição
+# segurava uma conexão enquanto a carga do cache pedia outra.)
+#
+# Só roda com TEST_DATABASE_URL apontando para um banco de teste com ao menos
+# um aluno não editado numa turma ativa. O teste só lê: a carga do cache faz a
+# consulta de verdade (pegando uma conexão do pool) e devolve a turma escolhida,
+# sem vincular usuário a professor.
+# Roda com pytest ou direto: python test_autorizacao_pool.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import pytest
+from flask import Flask
+
+from config import Config
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+REQUISICOES = Config.DB_POOL_MAX + 1
+USUARIO_TESTE = -1  # não existe: a consulta da carga volta vazia
+
+
+def _escolher_aluno():
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT t.id, t.nome, t.professor_id, a.id
+            FROM alunos a
+            JOIN turmas t ON t.id = a.turma_id AND t.ativo = TRUE
+            WHERE a.ativo = TRUE AND NOT a.editado
+            ORDER BY a.id LIMIT 1
+        ''')
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def _app_com_rotas():
+    # app.py recria `app` no fim do módulo (o Flask com as rotas só existe rodando
+    # `python app.py`): monta um com as views usadas aqui
+    import app as modulo
+    app = Flask('app')
+    app.secret_key = Config.SECRET_KEY
+    app.add_url_rule('/professor/turmas/<int:turma_id>/alunos/<int:aluno_id>/editar',
+                     view_func=modulo.editar_aluno, methods=['GET', 'POST'])
+    app.add_url_rule('/alunos', view_func=modulo.listar_alunos)
+    app.add_url_rule('/professor/dashboard', view_func=modulo.dashboard_professor)
+    return app
+
+
+def test_faltas_no_cache_nao_esgotam_o_pool():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL não definida")
+    linha = _escolher_aluno()
+    if linha is None:
+        pytest.skip("nenhum aluno não editado em turma ativa")
+    turma_id, turma_nome, professor_id, aluno_id = linha
+
+    import autorizacao
+    import db_pool
+    app = _app_com_rotas()
+
+    # Pool novo, no banco de teste
+    database_url = Config.DATABASE_URL
+    Config.DATABASE_URL = TEST_DATABASE_URL
+    db_pool.fechar_pool()
+
+    # Todas as requisições chegam juntas à carga do cache
+    barreira = threading.Barrier(REQUISICOES, timeout=Config.DB_POOL_TIMEOUT * 2)
+    carregar = autorizacao._carregar
+
+    def carregar_junto(usuario):
+        barreira.wait()
+        return {**carregar(usuario), turma_id: (turma_nome, professor_id)}
+
+    def requisitar(_):
+        cliente = app.test_client()
+        with cliente.session_transaction() as sessao:
+            sessao['user_id'] = USUARIO_TESTE
+            sessao['user_type'] = 'professor'
+        inicio = time.monotonic()
+        resposta = cliente.get(f'/professor/turmas/{turma_id}/alunos/{aluno_id}/editar')
+        return resposta.status_code, time.monotonic() - inicio
+
+    autorizacao._carregar = carregar_junto
+    autorizacao.cache_turmas.invalidar()
+    try:
+        with ThreadPoolExecutor(REQUISICOES) as executor:
+            resultados = list(executor.map(requisitar, range(REQUISICOES)))
+    finally:
+        autorizacao._carregar = carregar
+        autorizacao.cache_turmas.invalidar()
+        db_pool.fechar_pool()
+        Config.DATABASE_URL = database_url
+
+    # Redirecionamento = sem conexão (timeout do pool) ou carga do cache que falhou
+    assert [status for status, _ in resultados] == [200] * REQUISICOES, resultados
+    assert max(tempo for _, tempo in resultados) < Config.DB_POOL_TIMEOUT, resultados
+
+
+if __name__ == "__main__":
+    test_faltas_no_cache_nao_esgotam_o_pool()
+    print(f"{REQUISICOES} requisições simultâneas sem timeout do pool: ok")
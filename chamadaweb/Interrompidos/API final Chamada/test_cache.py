@@ -0,0 +1,80 @@
+# test_cache.py
+# CacheTTL (cache.py): valor vencido, recarga em segundo plano e invalidar()
+# no meio de uma carga. Roda com pytest ou direto: python test_cache.py
+import threading
+import time
+
+from cache import CacheTTL
+
+
+class CargaLenta:
+    """carregar() que devolve o valor atual da "tabela" e para até liberar()"""
+
+    def __init__(self, valor):
+        self.valor = valor
+        self.comecou = threading.Event()
+        self._liberada = threading.Event()
+
+    def __call__(self):
+        lido = self.valor
+        self.comecou.set()
+        self._liberada.wait(5)
+        return lido
+
+    def liberar(self):
+        self._liberada.set()
+
+
+def _esperar(condicao):
+    limite = time.monotonic() + 5
+    while not condicao() and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert condicao()
+
+
+def test_valor_em_cache():
+    cache = CacheTTL(ttl=60)
+    assert cache.obter('k', lambda: 1) == 1
+    assert cache.obter('k', lambda: 2) == 1
+    cache.invalidar('k')
+    assert cache.obter('k', lambda: 3) == 3
+
+
+def test_recarga_iniciada_antes_de_invalidar_nao_grava():
+    cache = CacheTTL(ttl=0.05, stale=60)
+    assert cache.obter('k', lambda: 'antigo') == 'antigo'
+    time.sleep(0.06)
+
+    # Vencido: entrega o antigo e recarrega em segundo plano, lendo 'antigo'
+    carga = CargaLenta('antigo')
+    assert cache.obter('k', carga) == 'antigo'
+    assert carga.comecou.wait(5)
+    # A tabela muda (e invalida) enquanto a recarga ainda está no ar
+    cache.invalidar('k')
+    carga.liberar()
+    _esperar(lambda: 'k' not in cache._recarregando)
+
+    assert cache.obter('k', lambda: 'novo') == 'novo'
+
+
+def test_carga_iniciada_antes_de_invalidar_tudo_nao_grava():
+    cache = CacheTTL(ttl=60)
+    carga = CargaLenta('antigo')
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(cache.obter('k', carga)))
+    thread.start()
+    assert carga.comecou.wait(5)
+    cache.invalidar()
+    carga.liberar()
+    thread.join(5)
+
+    # Quem pediu recebe o que leu; o cache não guarda
+    assert resultado == ['antigo']
+    assert cache.obter('k', lambda: 'novo') == 'novo'
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith('test_'):
+            teste()
+            print(f"{nome}: ok")
@@ -0,0 +1,184 @@
+# test_cadastros.py
+# Validação dos cadastros e gravação em lote (cadastros.py), com um PostgREST
+# em memória no lugar do supabase_client. Roda com pytest ou direto:
+# python test_cadastros.py
+from urllib.parse import parse_qsl, urlsplit
+
+import cadastros
+import supabase_client
+from cadastros import validar, gravar_lote
+
+
+class Resposta:
+    def __init__(self, status_code, corpo):
+        self.status_code = status_code
+        self.corpo = corpo
+        self.text = str(corpo)
+
+    def json(self):
+        return self.corpo
+
+
+class PostgrestFalso:
+    """Tabelas em memória; entende só o que cadastros.py envia"""
+
+    def __init__(self, **tabelas):
+        self.tabelas = {nome: {linha['id']: dict(linha) for linha in linhas} for nome, linhas in tabelas.items()}
+        self.proximo_id = 1000
+        self.chamadas = []
+
+    def _filtro(self, url):
+        partes = urlsplit(url)
+        tabela = partes.path
+        for coluna, valor in parse_qsl(partes.query):
+            if valor.startswith('in.('):
+                valores = {v.strip('"') for v in valor[4:-1].split(',')}
+                return tabela, [linha for linha in self.tabelas[tabela].values()
+                                if str(linha.get(coluna)) in valores]
+        return tabela, list(self.tabelas[tabela].values())
+
+    def get(self, url, **kwargs):
+        self.chamadas.append(('GET', url))
+        _, linhas = self._filtro(url)
+        return Resposta(200, [dict(linha) for linha in linhas])
+
+    def post(self, url, json=None, **kwargs):
+        self.chamadas.append(('POST', url))
+        tabela = urlsplit(url).path
+        criadas = []
+        for dados in json:
+            self.proximo_id += 1
+            linha = {'id': self.proximo_id, 'ativo': True, **dados}
+            self.tabelas[tabela][linha['id']] = linha
+            criadas.append(dict(linha))
+        return Resposta(201, criadas)
+
+    def patch(self, url, json=None, **kwargs):
+        self.chamadas.append(('PATCH', url))
+        _, linhas = self._filtro(url)
+        for linha in linhas:
+            linha.update(json)
+        return Resposta(200, [{'id': linha['id']} for linha in linhas])
+
+
+_ORIGINAIS = {nome: getattr(supabase_client, nome) for nome in ('get', 'post', 'patch')}
+
+
+def _usar(falso):
+    for nome in _ORIGINAIS:
+        setattr(supabase_client, nome, getattr(falso, nome))
+    return falso
+
+
+def teardown_function(_funcao=None):
+    for nome, funcao in _ORIGINAIS.items():
+        setattr(supabase_client, nome, funcao)
+
+
+# ================= validar ===================
+
+def test_validar_criacao():
+    dados, erros = validar('alunos', {'nome': '  Ana  ', 'cpf': '52998224725', 'turma_id': '3'})
+    assert erros == {}
+    assert dados == {'nome': 'Ana', 'cpf': '529.982.247-25', 'turma_id': 3}
+
+
+def test_validar_erros():
+    _, erros = validar('alunos', {'nome': '', 'cpf': '52998224724', 'turma_id': True, 'idade': 9})
+    assert set(erros) == {'nome', 'cpf', 'turma_id', 'idade'}
+    _, erros = validar('professores', {'nome': 'Bia', 'tipo': 'diretor'})
+    assert set(erros) == {'cpf', 'tipo'}
+    assert validar('unidades', [1, 2]) == (None, {'_': 'esperado um objeto JSON'})
+
+
+def test_validar_parcial():
+    assert validar('turmas', {'ativo': False}, parcial=True) == ({'ativo': False}, {})
+    assert validar('turmas', {'professor_id': None}, parcial=True) == ({'professor_id': None}, {})
+    assert validar('turmas', {}, parcial=True)[1] == {'_': 'nenhum campo para alterar'}
+
+
+# ================= gravar_lote ===================
+
+def _falso():
+    return _usar(PostgrestFalso(
+        turmas=[{'id': 1, 'nome': 'A'}],
+        alunos=[{'id': 10, 'nome': 'Ana', 'cpf': '529.982.247-25', 'turma_id': 1, 'ativo': True},
+                {'id': 11, 'nome': 'Bia', 'cpf': '111.444.777-35', 'turma_id': 1, 'ativo': True},
+                {'id': 12, 'nome': 'Caio', 'cpf': '123.456.789-09', 'turma_id': 1, 'ativo': True}]))
+
+
+def test_lote_cria_e_recusa_por_item():
+    falso = _falso()
+    corpo, status = gravar_lote('alunos', [
+        {'nome': 'Duda', 'cpf': '935.411.347-80', 'turma_id': 1},
+        {'nome': 'Eva', 'cpf': '529.982.247-25', 'turma_id': 1},      # já cadastrado
+        {'nome': 'Fred', 'cpf': '935.411.347-80', 'turma_id': 1},     # repetido no lote
+        {'nome': 'Gil', 'cpf': '862.260.431-48', 'turma_id': 99},     # turma inexistente
+        {'nome': 'Hugo'},                                             # sem CPF
+    ])
+    assert status == 207
+    assert [r['status'] for r in corpo['resultados']] == ['criado', 'erro', 'erro', 'erro', 'erro']
+    assert corpo['resultados'][1]['erros'] == {'cpf': 'já cadastrado'}
+    assert corpo['resultados'][2]['erros'] == {'cpf': 'repetido no lote (item 0)'}
+    assert corpo['resultados'][3]['erros'] == {'turma_id': 'não encontrado'}
+    assert [m for m, _ in falso.chamadas].count('POST') == 1
+
+
+def test_lote_altera_com_um_patch_por_conjunto_de_valores():
+    falso = _falso()
+    corpo, status = gravar_lote('alunos', [{'id': 10, 'ativo': False}, {'id': 11, 'ativo': False},
+                                           {'id': 12, 'nome': 'Caio Souza'}])
+    assert status == 200 and corpo['atualizados'] == 3
+    patches = [url for metodo, url in falso.chamadas if metodo == 'PATCH']
+    assert sorted(patches) == ['alunos?id=in.(10,11)&select=id', 'alunos?id=in.(12)&select=id']
+    assert falso.tabelas['alunos'][12] == {'id': 12, 'nome': 'Caio Souza', 'cpf': '123.456.789-09',
+                                           'turma_id': 1, 'ativo': True}
+
+
+def test_lote_nao_desfaz_edicao_concorrente_nem_recria_apagado():
+    falso = _falso()
+    original = falso.patch
+
+    def patch_concorrente(url, **kwargs):
+        # Entre a conferência dos ids e o PATCH: outro usuário renomeia o 10 e apaga o 11
+        falso.tabelas['alunos'][10]['nome'] = 'Ana Maria'
+        falso.tabelas['alunos'].pop(11, None)
+        return original(url, **kwargs)
+    supabase_client.patch = patch_concorrente
+
+    corpo, status = gravar_lote('alunos', [{'id': 10, 'ativo': False}, {'id': 11, 'ativo': False}])
+    assert status == 207
+    assert falso.tabelas['alunos'][10]['nome'] == 'Ana Maria'
+    assert falso.tabelas['alunos'][10]['ativo'] is False
+    assert 11 not in falso.tabelas['alunos']
+    assert corpo['resultados'][1] == {'indice': 1, 'status': 'erro', 'erros': {'id': 'não encontrado'}}
+
+
+def test_lote_invalido():
+    _falso()
+    assert gravar_lote('alunos', [])[1] == 400
+    assert gravar_lote('alunos', {'nome': 'x'})[1] == 400
+    corpo, status = gravar_lote('alunos', [{'id': 999, 'ativo': False}, {'id': 'x', 'ativo': False}])
+    assert status == 400
+    assert corpo['resultados'][0]['erros'] == {'id': 'não encontrado'}
+    assert 'id' in corpo['resultados'][1]['erros']
+
+
+def test_lote_acima_do_maximo():
+    _falso()
+    maximo = cadastros.Config.LOTE_MAXIMO
+    cadastros.Config.LOTE_MAXIMO = 2
+    try:
+        assert gravar_lote('unidades', [{'nome': 'a'}] * 3)[1] == 400
+    finally:
+        cadastros.Config.LOTE_MAXIMO = maximo
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith('test_'):
+            try:
+                teste()
+            finally:
+                teardown_function()
+            print(f"{nome}: ok")
@@ -0,0 +1,63 @@
+# test_cpf.py
+# Validação de CPF: cpf.py (um por vez) e importacao_alunos (em lote, com NumPy).
+# Roda com pytest ou direto: python test_cpf.py
+from cpf import validar_cpf, formatar_cpf, digitos_verificadores
+from importacao_alunos import normalizar_cpf, validar_cpfs
+
+VALIDO = '52998224725'
+DIGITO_ERRADO = '52998224724'
+REPETIDO = '11111111111'      # passa na conta dos dígitos, mas não é CPF
+COM_ZEROS = '00012345601'     # numa célula numérica vira 12345601
+
+
+def test_digitos_verificadores():
+    assert digitos_verificadores('529982247') == '25'
+    assert digitos_verificadores('000123456') == '01'
+
+
+def test_validar_cpf():
+    assert validar_cpf(VALIDO)
+    assert validar_cpf(formatar_cpf(VALIDO))
+    assert not validar_cpf(DIGITO_ERRADO)
+    assert not validar_cpf(REPETIDO)
+    assert not validar_cpf(VALIDO[:10])
+
+
+def test_formatar_cpf():
+    assert formatar_cpf(VALIDO) == '529.982.247-25'
+
+
+def test_validar_cpfs_em_lote():
+    resultado = validar_cpfs([VALIDO, DIGITO_ERRADO, REPETIDO, COM_ZEROS, '0' * 11])
+    assert resultado.tolist() == [True, False, False, True, False]
+    assert validar_cpfs([]).tolist() == []
+
+
+def test_lote_igual_ao_unitario():
+    cpfs = [f"{base:09d}{digitos_verificadores(f'{base:09d}')}" for base in range(0, 10**9, 7919 * 997)]
+    cpfs += [cpf[:10] + str((int(cpf[10]) + 1) % 10) for cpf in cpfs]
+    assert validar_cpfs(cpfs).tolist() == [validar_cpf(cpf) for cpf in cpfs]
+
+
+def test_normalizar_celula_numerica_sem_zeros():
+    # XLSX guarda o CPF como número: os zeros à esquerda voltam
+    assert normalizar_cpf(int(COM_ZEROS)) == COM_ZEROS
+    assert normalizar_cpf(float(COM_ZEROS)) == COM_ZEROS
+    assert validar_cpfs([normalizar_cpf(int(COM_ZEROS))]).tolist() == [True]
+
+
+def test_normalizar_texto():
+    assert normalizar_cpf('529.982.247-25') == VALIDO
+    assert normalizar_cpf(' 52998224725 ') == VALIDO
+    # Texto com dígitos faltando não é completado com zeros
+    assert normalizar_cpf('12345601') == ''
+    assert normalizar_cpf('123.456-01') == ''
+    assert normalizar_cpf(None) == ''
+    assert normalizar_cpf(True) == ''
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith('test_'):
+            teste()
+            print(f"{nome}: ok")
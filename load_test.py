@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Load Test Harness for Sistema de Chamada - IOS
+Drives the request scenarios of backend_test.py / enhanced_attendance_test.py
+with N concurrent virtual users and reports latency percentiles per endpoint
+
+Each virtual user has its own HTTP session and repeats the teacher journey:
+login, list classes, list the students of a class, save attendance and, every
+--report-every iterations, generate the attendance report.
+
+Usage:
+    python load_test.py --users 20 --duration 60 --output run.json
+    python load_test.py --users 20 --duration 60 --compare run.json
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from backend_test import BASE_URL, VALID_LOGIN, TEST_CLASS_ID, ATTENDANCE_PAYLOAD
+
+
+# Journey steps: (endpoint name, method, path, json body, accepted status codes)
+LOGIN_STEP = ("POST /auth/login", "POST", "/auth/login", VALID_LOGIN, (200,))
+JOURNEY = [
+    ("GET /classes", "GET", "/classes", None, (200,)),
+    ("GET /classes/{id}/students", "GET", f"/classes/{TEST_CLASS_ID}/students", None, (200,)),
+    ("POST /attendance", "POST", "/attendance", ATTENDANCE_PAYLOAD, (200,)),
+]
+REPORT_STEP = ("POST /reports/generate", "POST", "/reports/generate", {}, (200,))
+
+
+def percentile(sorted_values, p):
+    """Percentile with linear interpolation between the closest ranks"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.errors = 0
+        self.status_codes = {}
+
+
+class LoadTester:
+    def __init__(self, base_url, users, duration, ramp_up=0, report_every=5, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.users = users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.report_every = report_every
+        self.timeout = timeout
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.iterations = 0
+
+    def record(self, endpoint, latency_ms, status, ok):
+        with self.lock:
+            stats = self.stats.setdefault(endpoint, EndpointStats())
+            stats.latencies_ms.append(latency_ms)
+            stats.status_codes[status] = stats.status_codes.get(status, 0) + 1
+            if not ok:
+                stats.errors += 1
+
+    def request(self, session, step):
+        """Run one step; returns False when the journey should restart"""
+        endpoint, method, path, body, accepted = step
+        start = time.perf_counter()
+        try:
+            response = session.request(method, f"{self.base_url}{path}", json=body, timeout=self.timeout)
+            # Read the whole body: the report endpoint streams a CSV
+            response.content
+            status = str(response.status_code)
+            ok = response.status_code in accepted
+        except requests.RequestException as e:
+            status = type(e).__name__
+            ok = False
+        self.record(endpoint, (time.perf_counter() - start) * 1000, status, ok)
+        return ok
+
+    def virtual_user(self, index):
+        if self.ramp_up:
+            # Spread the user start times over the ramp-up period
+            if self.stop_event.wait(self.ramp_up * index / self.users):
+                return
+        session = requests.Session()
+        iteration = 0
+        while not self.stop_event.is_set():
+            if not self.request(session, LOGIN_STEP):
+                # Back off instead of hammering a failing login
+                self.stop_event.wait(1)
+                continue
+            for step in JOURNEY:
+                if self.stop_event.is_set() or not self.request(session, step):
+                    break
+            iteration += 1
+            if self.report_every and iteration % self.report_every == 0 and not self.stop_event.is_set():
+                self.request(session, REPORT_STEP)
+            with self.lock:
+                self.iterations += 1
+        session.close()
+
+    def run(self):
+        print("=" * 80)
+        print("LOAD TEST - Sistema de Chamada - IOS")
+        print("=" * 80)
+        print(f"Target: {self.base_url}")
+        print(f"Virtual users: {self.users}, duration: {self.duration}s, ramp-up: {self.ramp_up}s")
+        print(f"Started at: {datetime.now()}")
+        print()
+
+        started_at = datetime.now().isoformat(timespec='seconds')
+        threads = [threading.Thread(target=self.virtual_user, args=(i,), daemon=True)
+                   for i in range(self.users)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            self.stop_event.wait(self.duration)
+        except KeyboardInterrupt:
+            print("Interrupted, collecting results...")
+        self.stop_event.set()
+        for thread in threads:
+            thread.join(self.timeout + 5)
+        elapsed = time.perf_counter() - start
+        return self.results(started_at, elapsed)
+
+    def results(self, started_at, elapsed):
+        endpoints = {}
+        with self.lock:
+            items = list(self.stats.items())
+        total_requests = total_errors = 0
+        for endpoint, stats in items:
+            latencies = sorted(stats.latencies_ms)
+            count = len(latencies)
+            total_requests += count
+            total_errors += stats.errors
+            endpoints[endpoint] = {
+                "requests": count,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / count, 4) if count else 0,
+                "throughput_rps": round(count / elapsed, 2),
+                "latency_ms": {
+                    "min": round(latencies[0], 2),
+                    "mean": round(sum(latencies) / count, 2),
+                    "p50": round(percentile(latencies, 50), 2),
+                    "p95": round(percentile(latencies, 95), 2),
+                    "p99": round(percentile(latencies, 99), 2),
+                    "max": round(latencies[-1], 2),
+                },
+                "status_codes": dict(sorted(stats.status_codes.items())),
+            }
+        return {
+            "target": self.base_url,
+            "started_at": started_at,
+            "duration_s": round(elapsed, 2),
+            "config": {
+                "users": self.users,
+                "duration": self.duration,
+                "ramp_up": self.ramp_up,
+                "report_every": self.report_every,
+            },
+            "iterations": self.iterations,
+            "totals": {
+                "requests": total_requests,
+                "errors": total_errors,
+                "error_rate": round(total_errors / total_requests, 4) if total_requests else 0,
+                "throughput_rps": round(total_requests / elapsed, 2),
+            },
+            "endpoints": endpoints,
+        }
+
+
+def print_results(results):
+    print(f"{'ENDPOINT':<30} {'REQS':>7} {'RPS':>8} {'ERR%':>6} {'P50':>9} {'P95':>9} {'P99':>9}")
+    for endpoint, data in results["endpoints"].items():
+        latency = data["latency_ms"]
+        print(f"{endpoint:<30} {data['requests']:>7} {data['throughput_rps']:>8.1f} "
+              f"{data['error_rate'] * 100:>5.1f}% {latency['p50']:>7.1f}ms {latency['p95']:>7.1f}ms "
+              f"{latency['p99']:>7.1f}ms")
+    totals = results["totals"]
+    print("-" * 80)
+    print(f"Total: {totals['requests']} requests, {totals['throughput_rps']:.1f} req/s, "
+          f"error rate {totals['error_rate'] * 100:.1f}%, {results['iterations']} journeys "
+          f"in {results['duration_s']:.1f}s")
+
+
+def print_comparison(baseline, results):
+    """p95 and throughput of this run against a previous JSON result"""
+    print()
+    print(f"Comparison with run from {baseline.get('started_at')}:")
+    print(f"{'ENDPOINT':<30} {'P95 BEFORE':>11} {'P95 NOW':>10} {'CHANGE':>8} {'RPS BEFORE':>11} {'RPS NOW':>9}")
+    for endpoint, data in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            print(f"{endpoint:<30} {'-':>11} {data['latency_ms']['p95']:>8.1f}ms")
+            continue
+        p95_before, p95_now = before["latency_ms"]["p95"], data["latency_ms"]["p95"]
+        change = (p95_now - p95_before) / p95_before * 100 if p95_before else 0
+        print(f"{endpoint:<30} {p95_before:>9.1f}ms {p95_now:>8.1f}ms {change:>+7.1f}% "
+              f"{before['throughput_rps']:>11.1f} {data['throughput_rps']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the Sistema de Chamada - IOS API")
+    parser.add_argument("--base-url", default=BASE_URL, help="API base URL (default: backend_test.BASE_URL)")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="test duration in seconds")
+    parser.add_argument("--ramp-up", type=float, default=0, help="seconds to start all users")
+    parser.add_argument("--report-every", type=int, default=5,
+                        help="generate a report every N journeys per user (0 = never)")
+    parser.add_argument("--timeout", type=float, default=30, help="request timeout in seconds")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="previous JSON result to compare against")
+    args = parser.parse_args()
+
+    tester = LoadTester(args.base_url, args.users, args.duration, args.ramp_up,
+                        args.report_every, args.timeout)
+    results = tester.run()
+    print_results(results)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    return 0 if results["totals"]["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())